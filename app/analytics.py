@@ -0,0 +1,323 @@
+import math
+import threading
+from typing import List, Dict, Optional, Tuple
+import pandas as pd
+
+from calculations import PokerCalculations
+from tournament_set import TournamentSet
+from metrics import registry
+
+class PokerAnalyticsState:
+    """Estado analítico incremental de um conjunto filtrado de torneios.
+
+    Mantém somas acumuladas, pico e downswing do saldo e variância (Welford),
+    atualizados em O(1) quando um torneio é adicionado ao final da linha do tempo.
+    """
+
+    def __init__(self):
+        self.total_torneios = 0
+        self.total_investido = 0.0
+        self.total_ganhos = 0.0
+        self.itm_count = 0
+
+        # Saldo acumulado, pico e downswing (mesma regra de calculate_variance_and_downswing)
+        self.saldo = 0.0
+        self.pico = 0.0
+        self.maior_downswing = 0.0
+        self.maior_bankroll = 0.0
+        self.menor_bankroll = 0.0
+
+        # Welford para a variância do lucro por torneio
+        self.media_lucro = 0.0
+        self.m2_lucro = 0.0
+
+        # Última posição da linha do tempo (data, id)
+        self.ultima_data = None
+        self.ultimo_id = None
+
+        self.roi_evolution = []
+        self.sessoes = {}
+        self.periodos = {}
+
+    @classmethod
+    def from_torneios(cls, torneios: List[Dict]) -> 'PokerAnalyticsState':
+        """Reconstrói o estado completo a partir do histórico."""
+        estado = cls()
+        if isinstance(torneios, TournamentSet):
+            # Dicionários gerados por lote a partir dos arrays já ordenados
+            linhas = torneios.sort_by_date().iter_dicts()
+        else:
+            linhas = PokerAnalyticsState.ordenar(torneios)
+        for torneio in linhas:
+            estado._aplicar(torneio)
+        return estado
+
+    @staticmethod
+    def ordenar(torneios: List[Dict]) -> List[Dict]:
+        """Ordena torneios pela linha do tempo (data e id)."""
+        return sorted(torneios, key=lambda x: (x['data_torneio'], x.get('id_torneio') or 0))
+
+    def pode_anexar(self, torneio: Dict) -> bool:
+        """Indica se o torneio está no final da linha do tempo."""
+        if self.ultima_data is None:
+            return True
+        if torneio['data_torneio'] != self.ultima_data:
+            return torneio['data_torneio'] > self.ultima_data
+        # Mesmo dia: id ausente significa inserção nova (autoincremento)
+        id_torneio = torneio.get('id_torneio')
+        return id_torneio is None or self.ultimo_id is None or id_torneio > self.ultimo_id
+
+    def anexar(self, torneio: Dict) -> bool:
+        """Aplica um torneio em O(1). Retorna False se ele for retroativo."""
+        if not self.pode_anexar(torneio):
+            return False
+        self._aplicar(torneio)
+        return True
+
+    def _aplicar(self, torneio: Dict):
+        buy_in = torneio['buy_in']
+        ganho_total = torneio['ganho_total']
+        lucro = ganho_total - buy_in
+
+        self.total_torneios += 1
+        self.total_investido += buy_in
+        self.total_ganhos += ganho_total
+        if ganho_total > 0:
+            self.itm_count += 1
+
+        self.saldo += lucro
+        if self.total_torneios == 1 or self.saldo > self.pico:
+            self.pico = self.saldo
+        else:
+            self.maior_downswing = max(self.maior_downswing, self.pico - self.saldo)
+        self.maior_bankroll = max(self.maior_bankroll, self.saldo)
+        self.menor_bankroll = min(self.menor_bankroll, self.saldo)
+
+        delta = lucro - self.media_lucro
+        self.media_lucro += delta / self.total_torneios
+        self.m2_lucro += delta * (lucro - self.media_lucro)
+
+        self.ultima_data = torneio['data_torneio']
+        self.ultimo_id = torneio.get('id_torneio')
+
+        roi_acumulado = ((self.total_ganhos - self.total_investido) / self.total_investido) * 100 if self.total_investido > 0 else 0
+        self.roi_evolution.append({
+            'data': torneio['data_torneio'],
+            'roi_acumulado': roi_acumulado,
+            'lucro_acumulado': self.total_ganhos - self.total_investido,
+            'total_investido': self.total_investido,
+            'total_ganhos': self.total_ganhos
+        })
+
+        # Sessões diárias: [buy_in, ganho_total, lucro_liquido, total_torneios]
+        sessao = self.sessoes.setdefault(torneio['data_torneio'][:10], [0.0, 0.0, 0.0, 0])
+        sessao[0] += buy_in
+        sessao[1] += ganho_total
+        sessao[2] += lucro
+        sessao[3] += 1
+
+        # Períodos mensais: [total_investido, total_torneios, total_ganhos, lucro_liquido, itm_count]
+        periodo = self.periodos.setdefault(torneio['data_torneio'][:7], [0.0, 0, 0.0, 0.0, 0])
+        periodo[0] += buy_in
+        periodo[1] += 1
+        periodo[2] += ganho_total
+        periodo[3] += lucro
+        if ganho_total > 0:
+            periodo[4] += 1
+
+    def get_estatisticas(self) -> Dict:
+        """Estatísticas gerais no formato de PokerDatabase.get_estatisticas_gerais."""
+        if self.total_torneios == 0:
+            return {
+                "total_torneios": 0,
+                "total_investido": 0,
+                "total_ganhos": 0,
+                "lucro_liquido": 0,
+                "roi_geral": 0,
+                "abi": 0,
+                "itm_percentage": 0
+            }
+        lucro_liquido = self.total_ganhos - self.total_investido
+        return {
+            "total_torneios": self.total_torneios,
+            "total_investido": self.total_investido,
+            "total_ganhos": self.total_ganhos,
+            "lucro_liquido": lucro_liquido,
+            "roi_geral": (lucro_liquido / self.total_investido) * 100 if self.total_investido > 0 else 0,
+            "abi": self.total_investido / self.total_torneios,
+            "itm_percentage": (self.itm_count / self.total_torneios) * 100
+        }
+
+    def get_roi_evolution(self) -> List[Dict]:
+        """Evolução do ROI no formato de PokerCalculations.get_roi_evolution."""
+        return self.roi_evolution
+
+    def calculate_variance_and_downswing(self) -> Dict:
+        """Variância e downswings no formato de PokerCalculations."""
+        if self.total_torneios == 0:
+            return {"variancia": 0, "maior_downswing": 0, "downswing_atual": 0}
+        variancia = self.m2_lucro / (self.total_torneios - 1) if self.total_torneios > 1 else 0
+        return {
+            "variancia": variancia,
+            "maior_downswing": self.maior_downswing,
+            "downswing_atual": max(0, self.pico - self.saldo)
+        }
+
+    def calculate_bankroll_management(self, bankroll_inicial: float = 0) -> Dict:
+        """Métricas de bankroll no formato de PokerCalculations."""
+        if self.total_torneios == 0:
+            return {
+                "bankroll_atual": bankroll_inicial,
+                "maior_bankroll": bankroll_inicial,
+                "menor_bankroll": bankroll_inicial,
+                "buy_ins_restantes": 0
+            }
+        bankroll_atual = bankroll_inicial + self.saldo
+        abi = self.total_investido / self.total_torneios
+        return {
+            "bankroll_atual": bankroll_atual,
+            "maior_bankroll": bankroll_inicial + self.maior_bankroll,
+            "menor_bankroll": bankroll_inicial + self.menor_bankroll,
+            "buy_ins_restantes": bankroll_atual / abi if abi > 0 else 0
+        }
+
+    def get_best_and_worst_sessions(self, limit: int = 5) -> Dict:
+        """Melhores e piores sessões diárias no formato de PokerCalculations."""
+        def montar(item):
+            data, (buy_in, ganho_total, lucro, total_torneios) = item
+            roi = ((ganho_total - buy_in) / buy_in) * 100 if buy_in else 0
+            return {
+                'data_torneio': pd.to_datetime(data).date(),
+                'buy_in': buy_in,
+                'ganho_total': ganho_total,
+                'lucro_liquido': lucro,
+                'roi': roi,
+                'total_torneios': total_torneios
+            }
+
+        return PokerCalculations.select_extreme_sessions(
+            (montar(item) for item in self.sessoes.items()), limit
+        )
+
+    def get_performance_by_period(self) -> List[Dict]:
+        """Performance mensal no formato de PokerCalculations.get_performance_by_period."""
+        resultado = []
+        for mes in sorted(self.periodos):
+            total_investido, total_torneios, total_ganhos, lucro_liquido, itm_count = self.periodos[mes]
+            periodo = pd.Period(mes, freq='M')
+            resultado.append({
+                'periodo': periodo,
+                'total_investido': total_investido,
+                'total_torneios': total_torneios,
+                'abi': total_investido / total_torneios,
+                'total_ganhos': total_ganhos,
+                'lucro_liquido': lucro_liquido,
+                'roi': ((total_ganhos - total_investido) / total_investido) * 100 if total_investido > 0 else 0,
+                'itm_count': itm_count,
+                'itm_percentage': (itm_count / total_torneios) * 100,
+                'periodo_str': str(periodo)
+            })
+        return resultado
+
+    def verificar(self, torneios: List[Dict]) -> List[str]:
+        """Compara o estado com um recálculo completo. Retorna as divergências encontradas."""
+        calc = PokerCalculations()
+        if isinstance(torneios, TournamentSet):
+            torneios = torneios.to_dicts()
+        ordenados = PokerAnalyticsState.ordenar(torneios)
+        divergencias = []
+
+        def comparar(nome, esperado, obtido):
+            if isinstance(esperado, float) or isinstance(obtido, float):
+                iguais = math.isclose(float(esperado), float(obtido), rel_tol=1e-9, abs_tol=1e-6)
+            else:
+                iguais = esperado == obtido
+            if not iguais:
+                divergencias.append(f"{nome}: esperado {esperado}, obtido {obtido}")
+
+        for chave, valor in calc.calculate_variance_and_downswing(ordenados).items():
+            comparar(chave, valor, self.calculate_variance_and_downswing()[chave])
+
+        for chave, valor in calc.calculate_bankroll_management(ordenados).items():
+            comparar(chave, valor, self.calculate_bankroll_management()[chave])
+
+        esperado_roi = calc.get_roi_evolution(ordenados)
+        comparar('roi_evolution.len', len(esperado_roi), len(self.roi_evolution))
+        if esperado_roi and self.roi_evolution:
+            for chave in ('roi_acumulado', 'lucro_acumulado', 'total_investido', 'total_ganhos'):
+                comparar(f'roi_evolution.{chave}', esperado_roi[-1][chave], self.roi_evolution[-1][chave])
+
+        esperado_periodos = calc.get_performance_by_period(ordenados, 'monthly')
+        obtido_periodos = self.get_performance_by_period()
+        comparar('periodos.len', len(esperado_periodos), len(obtido_periodos))
+        for esperado, obtido in zip(esperado_periodos, obtido_periodos):
+            comparar('periodo', esperado['periodo_str'], obtido['periodo_str'])
+            for chave in ('total_investido', 'total_torneios', 'total_ganhos', 'lucro_liquido', 'roi', 'itm_percentage'):
+                comparar(f"periodo.{esperado['periodo_str']}.{chave}", esperado[chave], obtido[chave])
+
+        esperado_sessoes = calc.get_best_and_worst_sessions(ordenados, 3)
+        obtido_sessoes = self.get_best_and_worst_sessions(3)
+        for lado in ('melhores', 'piores'):
+            comparar(f'{lado}.lucros', [round(s['lucro_liquido'], 6) for s in esperado_sessoes[lado]],
+                     [round(s['lucro_liquido'], 6) for s in obtido_sessoes[lado]])
+
+        return divergencias
+
+
+class PokerAnalyticsCache:
+    """Estados analíticos por filtro, compartilhados entre as sessões do dashboard."""
+
+    def __init__(self, max_estados: int = 32):
+        self.max_estados = max_estados
+        self._estados = {}
+        self._lock = threading.Lock()
+
+    def obter(self, chave: Tuple, torneios: List[Dict], versao: Optional[int] = None) -> PokerAnalyticsState:
+        """Retorna o estado do filtro, reconstruindo se ausente ou de outra versão dos dados."""
+        with self._lock:
+            versao_estado, estado = self._estados.get(chave, (None, None))
+
+        # Qualquer escrita (inclusive de outro processo) muda versao_dados e força reconstrução
+        hit = estado is not None and estado.total_torneios == len(torneios) and (versao is None or versao == versao_estado)
+        registry.registrar_cache('estado_analitico', hit)
+        if not hit:
+            estado = PokerAnalyticsState.from_torneios(torneios)
+            with self._lock:
+                if len(self._estados) >= self.max_estados and chave not in self._estados:
+                    self._estados.pop(next(iter(self._estados)))
+                self._estados[chave] = (versao, estado)
+
+        return estado
+
+    def registrar_insercao(self, torneio: Dict, id_conta: int, id_tipo_torneio: int, versao: Optional[int] = None):
+        """Aplica uma inserção a todos os estados cujo filtro inclui o torneio.
+
+        `versao` é a versão dos dados logo após a inserção: estados que não vinham
+        da versão imediatamente anterior perderam alguma outra escrita e são
+        descartados. Inserções retroativas também descartam o estado, que será
+        reconstruído na próxima leitura.
+        """
+        with self._lock:
+            for chave in list(self._estados):
+                versao_estado, estado = self._estados[chave]
+                if versao is not None and versao_estado != versao - 1:
+                    del self._estados[chave]
+                    continue
+                self._estados[chave] = (versao, estado)
+
+                filtro_conta, filtro_tipo, data_inicio, data_fim = chave
+                if filtro_conta and filtro_conta != id_conta:
+                    continue
+                if filtro_tipo and filtro_tipo != id_tipo_torneio:
+                    continue
+                if data_inicio and torneio['data_torneio'] < data_inicio:
+                    continue
+                if data_fim and torneio['data_torneio'] > data_fim:
+                    continue
+                if not estado.anexar(torneio):
+                    del self._estados[chave]
+
+    def invalidar(self):
+        """Descarta todos os estados (edições e exclusões)."""
+        with self._lock:
+            self._estados.clear()
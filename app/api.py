@@ -0,0 +1,242 @@
+import gzip
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Tuple
+from flask import Blueprint, Response, request
+
+from change_feed import PokerChangeFeed
+from database import PokerDatabase, DIMENSOES_CUBO
+from sharding import ShardedPokerDatabase
+from metrics import registry
+from scenarios import PokerScenarios
+
+# Mesmo arquivo usado pelo Streamlit, que roda com cwd na pasta app/
+DB_PATH = os.environ.get(
+    'POKER_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'poker_dashboard.db')
+)
+
+# Respostas menores que isso não compensam a compressão
+TAMANHO_MINIMO_GZIP = 512
+
+# Agrupamentos aceitos por /estatisticas/periodos
+PERIODOS = ('weekly', 'monthly', 'yearly')
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+_db = None
+_db_lock = threading.Lock()
+
+def get_db() -> PokerDatabase:
+    """Instância compartilhada do banco para a API."""
+    global _db
+    with _db_lock:
+        if _db is None:
+            replica_memoria = os.environ.get('POKER_REPLICA_MEMORIA') == '1'
+            snapshot_binario = os.environ.get('POKER_SNAPSHOT', '1') == '1'
+            rastrear_sql = os.environ.get('POKER_SQL_TRACE') == '1'
+            chave_natural = os.environ.get('POKER_CHAVE_NATURAL') == '1'
+            if os.environ.get('POKER_SHARDS') == '1':
+                _db = ShardedPokerDatabase(DB_PATH, replica_memoria=replica_memoria, snapshot_binario=snapshot_binario,
+                                           rastrear_sql=rastrear_sql, chave_natural=chave_natural)
+            else:
+                _db = PokerDatabase(DB_PATH, replica_memoria=replica_memoria,
+                                    colunar=os.environ.get('POKER_COLUNAR') == '1',
+                                    snapshot_binario=snapshot_binario, rastrear_sql=rastrear_sql,
+                                    chave_natural=chave_natural)
+        return _db
+
+
+class PokerResponseCache:
+    """Cache LRU de respostas JSON já serializadas e comprimidas, por versão dos dados."""
+
+    def __init__(self, max_itens: int = 256):
+        self.max_itens = max_itens
+        self.hits = 0
+        self.misses = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: Tuple, versao: int, gerar: Callable[[], object]) -> Tuple[bytes, bytes]:
+        """Retorna (corpo, corpo_gzip) da chave na versão informada, gerando se necessário."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item and item[0] == versao:
+                self._itens.move_to_end(chave)
+                self.hits += 1
+                registry.registrar_cache('api_respostas', True)
+                return item[1], item[2]
+            self.misses += 1
+        registry.registrar_cache('api_respostas', False)
+
+        corpo = json.dumps(gerar(), ensure_ascii=False, default=str).encode('utf-8')
+        corpo_gzip = gzip.compress(corpo, compresslevel=6) if len(corpo) >= TAMANHO_MINIMO_GZIP else None
+
+        with self._lock:
+            self._itens[chave] = (versao, corpo, corpo_gzip)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+        return corpo, corpo_gzip
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+
+cache_respostas = PokerResponseCache()
+
+# Feed de alterações: uma thread consulta o banco enquanto houver dashboards conectados
+feed_alteracoes = PokerChangeFeed(get_db)
+
+
+class ParametroInvalido(ValueError):
+    """Parâmetro da query string que não pode ser interpretado (vira 400)."""
+
+
+def _data(valor: str) -> str:
+    date.fromisoformat(valor)
+    return valor
+
+
+def _filtros(*nomes: str) -> dict:
+    """Lê os filtros de PokerDatabase da query string; valores inválidos levantam ParametroInvalido."""
+    conversores = {
+        'id_conta': int,
+        'id_tipo_torneio': int,
+        'data_inicio': _data,
+        'data_fim': _data
+    }
+    filtros = {}
+    for nome in nomes:
+        valor = request.args.get(nome)
+        # Sem o conversor aqui, um valor inválido viraria None e a resposta sairia sem o filtro
+        try:
+            filtros[nome] = conversores[nome](valor) if valor else None
+        except ValueError:
+            raise ParametroInvalido(f"Valor inválido para '{nome}': {valor}")
+    return filtros
+
+
+def _erro(mensagem: str, status: int = 400) -> Response:
+    return Response(json.dumps({"erro": mensagem}, ensure_ascii=False), status=status, mimetype='application/json')
+
+
+@api.errorhandler(ParametroInvalido)
+def parametro_invalido(erro: ParametroInvalido) -> Response:
+    return _erro(str(erro))
+
+
+def _responder(gerar: Callable[[], object]) -> Response:
+    """Responde com ETag pela versão dos dados, 304 condicional, gzip e cache no servidor."""
+    versao = get_db().get_versao_dados()
+    chave = (request.path, tuple(sorted(request.args.items(multi=True))))
+    etag = f"{versao}-{zlib.crc32(repr(chave).encode()):08x}"
+
+    if request.if_none_match.contains_weak(etag):
+        resposta = Response(status=304)
+    else:
+        corpo, corpo_gzip = cache_respostas.obter(chave, versao, gerar)
+        aceita_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+
+        if corpo_gzip is not None and aceita_gzip:
+            resposta = Response(corpo_gzip, mimetype='application/json')
+            resposta.headers['Content-Encoding'] = 'gzip'
+        else:
+            resposta = Response(corpo, mimetype='application/json')
+
+    resposta.set_etag(etag)
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.headers['Vary'] = 'Accept-Encoding'
+    return resposta
+
+
+@api.route('/torneios')
+def torneios():
+    """Lista de torneios com os filtros de get_torneios."""
+    filtros = _filtros('id_conta', 'id_tipo_torneio', 'data_inicio', 'data_fim')
+    return _responder(lambda: get_db().get_torneios(**filtros))
+
+
+@api.route('/estatisticas')
+def estatisticas():
+    """Estatísticas gerais com os filtros de get_estatisticas_gerais."""
+    filtros = _filtros('id_conta', 'data_inicio', 'data_fim')
+    return _responder(lambda: get_db().get_estatisticas_gerais(**filtros))
+
+
+@api.route('/estatisticas/tipos')
+def estatisticas_por_tipo():
+    """Estatísticas por tipo de torneio com os filtros de get_estatisticas_por_tipo."""
+    filtros = _filtros('id_conta', 'data_inicio', 'data_fim')
+    return _responder(lambda: get_db().get_estatisticas_por_tipo(**filtros))
+
+
+@api.route('/estatisticas/periodos')
+def estatisticas_por_periodo():
+    """Performance por período (weekly, monthly, yearly) dos torneios filtrados."""
+    filtros = _filtros('id_conta', 'id_tipo_torneio', 'data_inicio', 'data_fim')
+    periodo = request.args.get('periodo', 'monthly')
+    if periodo not in PERIODOS:
+        raise ParametroInvalido(f"'periodo' deve ser {', '.join(PERIODOS)}")
+
+    def gerar():
+        periodos = get_db().get_performance_por_periodo(periodo, **filtros)
+        # O objeto Period do pandas não é serializável; periodo_str já o representa
+        return [{chave: valor for chave, valor in p.items() if chave != 'periodo'} for p in periodos]
+
+    return _responder(gerar)
+
+
+@api.route('/cubo')
+def cubo():
+    """Totais agrupados pelas dimensões pedidas (?dimensoes=mes,conta,tipo) com os filtros de get_cubo."""
+    filtros = _filtros('id_conta', 'id_tipo_torneio', 'data_inicio', 'data_fim')
+    dimensoes = request.args.get('dimensoes', 'mes,conta,tipo').split(',')
+    desconhecidas = [dimensao for dimensao in dimensoes if dimensao not in DIMENSOES_CUBO]
+    if desconhecidas:
+        raise ParametroInvalido(f"Dimensões desconhecidas: {', '.join(desconhecidas)} (use {', '.join(DIMENSOES_CUBO)})")
+    return _responder(lambda: get_db().get_cubo(dimensoes, **filtros))
+
+
+@api.route('/cenarios', methods=['POST'])
+def cenarios():
+    """Avalia de uma vez os cenários "e se" do corpo JSON ({"cenarios": [...]}) sobre os torneios filtrados.
+
+    Os filtros vêm da query string, como nos demais endpoints; cada cenário
+    segue PokerScenarios (contas, excluir_contas, tipos, excluir_tipos,
+    buy_in_min, buy_in_max, data_inicio, data_fim, multiplicador, multiplicadores).
+    """
+    filtros = _filtros('id_conta', 'id_tipo_torneio', 'data_inicio', 'data_fim')
+    corpo = request.get_json(silent=True) or {}
+    lista = corpo.get('cenarios')
+    if not isinstance(lista, list) or not all(isinstance(cenario, dict) for cenario in lista):
+        return _erro("Envie {\"cenarios\": [{...}, ...]}")
+
+    try:
+        db = get_db()
+        resultados = PokerScenarios(db.get_torneios_set(**filtros), [conta["nome"] for conta in db.get_contas()],
+                                    [tipo["nome"] for tipo in db.get_tipos_torneio()]).avaliar(lista)
+    except (TypeError, ValueError) as e:
+        return _erro(str(e))
+    return Response(json.dumps(resultados, ensure_ascii=False), mimetype='application/json')
+
+
+@api.route('/alteracoes')
+def alteracoes():
+    """Fluxo SSE com o que mudou nos dados ({"marcador", "alteracoes": [{"id_conta", "data_inicio", "data_fim"}]}).
+
+    Na reconexão, o navegador manda o último marcador no Last-Event-ID (ou ?desde=)
+    e recebe primeiro o que mudou nesse meio tempo.
+    """
+    desde = request.headers.get('Last-Event-ID') or request.args.get('desde')
+    resposta = Response(feed_alteracoes.transmitir(desde), mimetype='text/event-stream')
+    resposta.headers['Cache-Control'] = 'no-cache'
+    # Proxies (nginx) não devem acumular o fluxo
+    resposta.headers['X-Accel-Buffering'] = 'no'
+    return resposta
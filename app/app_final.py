@@ -1,14 +1,18 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
 import os
 
 from database import PokerDatabase
-from calculations import PokerCalculations
+from sharding import ShardedPokerDatabase
 from plotting import PokerPlotting
 from export import PokerExport
+from downloads import PokerDownloads
+from tables import PokerTables
+from analytics import PokerAnalyticsCache
+from cache_warmer import PokerViewCache, PokerCacheWarmer
+from profiling import RerunProfiler
 
 # Configuração da página
 st.set_page_config(
@@ -18,6 +22,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Modo de depuração: ?debug=1 (ou POKER_DEBUG=1) mede cada seção; ?debug=profile também grava um cProfile
+modo_debug = (st.query_params.get("debug") or os.environ.get("POKER_DEBUG", "")).lower()
+profiler = RerunProfiler(
+    ativo=modo_debug in ("1", "true", "profile"),
+    cprofile_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles") if modo_debug == "profile" else None
+)
+
 # CSS customizado para melhorar a aparência
 st.markdown("""
 <style>
@@ -83,14 +94,67 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Feed de alterações do Flask: o navegador pede um rerun só quando a alteração cai no filtro da tela
+URL_FEED = os.environ.get("POKER_FEED_URL")
+feed_alteracoes = components.declare_component(
+    "feed_alteracoes",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "componentes", "feed_alteracoes")
+)
+
 # Inicializar banco de dados
 @st.cache_resource
 def init_database():
-    return PokerDatabase()
+    # POKER_REPLICA_MEMORIA=1: consultas numa cópia em memória do banco
+    # POKER_SHARDS=1: um arquivo de torneios por conta (app/shards/)
+    # POKER_COLUNAR=1: estatísticas num snapshot Parquet (app/colunar/), se o pyarrow estiver instalado
+    # POKER_SNAPSHOT=0: desliga o histórico mapeado em memória (app/snapshot/) e volta a consultar o SQL
+    # POKER_SQL_TRACE=1: tempo por formato de consulta e log das lentas (app/logs/sql_lento.log)
+    # POKER_CHAVE_NATURAL=1: torneio sem id externo com os mesmos dados não é inserido de novo
+    replica_memoria = os.environ.get("POKER_REPLICA_MEMORIA") == "1"
+    snapshot_binario = os.environ.get("POKER_SNAPSHOT", "1") == "1"
+    rastrear_sql = os.environ.get("POKER_SQL_TRACE") == "1"
+    chave_natural = os.environ.get("POKER_CHAVE_NATURAL") == "1"
+    if os.environ.get("POKER_SHARDS") == "1":
+        return ShardedPokerDatabase(replica_memoria=replica_memoria, snapshot_binario=snapshot_binario,
+                                    rastrear_sql=rastrear_sql, chave_natural=chave_natural)
+    return PokerDatabase(replica_memoria=replica_memoria, colunar=os.environ.get("POKER_COLUNAR") == "1",
+                         snapshot_binario=snapshot_binario, rastrear_sql=rastrear_sql, chave_natural=chave_natural)
+
+@st.cache_resource
+def init_analytics_cache():
+    return PokerAnalyticsCache()
+
+@st.cache_resource
+def init_view_cache():
+    # POKER_AQUECEDOR=0: sem recálculo em segundo plano da visão padrão após escritas
+    visoes = PokerViewCache(init_database(), init_analytics_cache())
+    if os.environ.get("POKER_AQUECEDOR", "1") == "1":
+        PokerCacheWarmer(visoes).start()
+    return visoes
+
+def botao_download(filepath: str, label: str, mime: str):
+    """Link assinado para a rota de download do Flask; sem ela, envia o arquivo pelo Streamlit."""
+    if downloads.url_base:
+        st.link_button(label, downloads.url(downloads.publicar(filepath), st.context.headers.get("Host")),
+                       use_container_width=True)
+    else:
+        with open(filepath, "rb") as file:
+            st.download_button(
+                label=label,
+                data=file,
+                file_name=os.path.basename(filepath),
+                mime=mime,
+                use_container_width=True
+            )
 
-db = init_database()
-plotting = PokerPlotting()
-export = PokerExport()
+with profiler.secao("Inicialização"):
+    db = init_database()
+    analytics_cache = init_analytics_cache()
+    visoes = init_view_cache()
+    plotting = PokerPlotting()
+    export = PokerExport()
+    tables = PokerTables()
+    downloads = PokerDownloads()
 
 # Título principal
 st.markdown('<h1 class="main-header">♠️ Dashboard Suprema Poker ♠️</h1>', unsafe_allow_html=True)
@@ -99,7 +163,7 @@ st.markdown('<h1 class="main-header">♠️ Dashboard Suprema Poker ♠️</h1>'
 st.sidebar.markdown("## 📊 Controles")
 
 # Seção de inserção de dados
-with st.sidebar.expander("➕ Inserir Novo Torneio", expanded=False):
+with profiler.secao("Sidebar: Inserir Torneio"), st.sidebar.expander("➕ Inserir Novo Torneio", expanded=False):
     st.markdown("### Dados do Torneio")
     
     # Obter contas e tipos de torneio
@@ -145,6 +209,12 @@ with st.sidebar.expander("➕ Inserir Novo Torneio", expanded=False):
                 help="Valor total ganho no torneio"
             )
         
+        hora_inicio = st.time_input(
+            "Horário de Início (opcional)",
+            value=None,
+            help="Usado para agrupar sessões por intervalo entre torneios"
+        )
+        
         submitted = st.form_submit_button("💾 Salvar Torneio", use_container_width=True)
         
         if submitted:
@@ -152,26 +222,41 @@ with st.sidebar.expander("➕ Inserir Novo Torneio", expanded=False):
             id_conta = next(c["id"] for c in contas if c["nome"] == conta_selecionada)
             id_tipo_torneio = next(t["id"] for t in tipos_torneio if t["nome"] == tipo_selecionado)
             
-            # Inserir no banco
-            sucesso = db.insert_torneio(
-                data_torneio.strftime("%Y-%m-%d"),
-                id_conta,
-                id_tipo_torneio,
-                buy_in,
-                ganho_total
-            )
+            # Inserir no banco (None: o mesmo torneio já estava cadastrado, ex. envio duplo do formulário)
+            try:
+                id_novo = db.insert_torneio_async(
+                    data_torneio.strftime("%Y-%m-%d"),
+                    id_conta,
+                    id_tipo_torneio,
+                    buy_in,
+                    ganho_total,
+                    hora_inicio.strftime("%H:%M") if hora_inicio else None
+                ).result()
+                sucesso = True
+            except Exception as e:
+                print(f"Erro ao inserir torneio: {e}")
+                id_novo, sucesso = None, False
             
-            if sucesso:
+            if sucesso and id_novo is None:
+                st.info("ℹ️ Este torneio já estava cadastrado")
+            elif sucesso:
+                # Atualiza os estados analíticos em O(1) em vez de recalcular o histórico
+                analytics_cache.registrar_insercao({
+                    "data_torneio": data_torneio.strftime("%Y-%m-%d"),
+                    "buy_in": buy_in,
+                    "ganho_total": ganho_total
+                }, id_conta, id_tipo_torneio, db.get_versao_dados())
                 st.success("✅ Torneio inserido com sucesso!")
                 st.rerun()
             else:
                 st.error("❌ Erro ao inserir torneio!")
 
 # Seção de exclusão de torneios
-with st.sidebar.expander("🗑️ Excluir Torneio", expanded=False):
+with profiler.secao("Sidebar: Excluir Torneio") as span_excluir, st.sidebar.expander("🗑️ Excluir Torneio", expanded=False):
     st.markdown("### Selecionar Torneio para Excluir")
     
     torneios_para_excluir = db.get_torneios()
+    span_excluir.linhas = len(torneios_para_excluir)
     if torneios_para_excluir:
         df_torneios_excluir = pd.DataFrame(torneios_para_excluir)
         df_torneios_excluir["display"] = df_torneios_excluir.apply(lambda row: f"{row['data_torneio']} - {row['nome_conta']} - {row['nome_tipo']} - R$ {row['buy_in']:.2f}", axis=1)
@@ -187,15 +272,18 @@ with st.sidebar.expander("🗑️ Excluir Torneio", expanded=False):
             sucesso_exclusao = db.delete_torneio(id_torneio_excluir)
             
             if sucesso_exclusao:
+                analytics_cache.invalidar()
                 st.success("✅ Torneio excluído com sucesso!")
                 st.rerun()
+            elif db.get_ano_arquivado(int(id_torneio_excluir)) is not None:
+                st.error("❌ Torneio de ano arquivado, somente leitura: desarquive o ano para excluí-lo")
             else:
                 st.error("❌ Erro ao excluir torneio!")
     else:
         st.info("Nenhum torneio para excluir.")
 
 # Seção de exportação e backup
-with st.sidebar.expander("📤 Exportar & Backup", expanded=False):
+with profiler.secao("Sidebar: Exportar & Backup"), st.sidebar.expander("📤 Exportar & Backup", expanded=False):
     st.markdown("### Exportação de Dados")
     
     col1, col2 = st.columns(2)
@@ -209,14 +297,7 @@ with st.sidebar.expander("📤 Exportar & Backup", expanded=False):
                     st.success(f"✅ CSV exportado!")
                     
                     # Botão de download
-                    with open(filepath, "rb") as file:
-                        st.download_button(
-                            label="⬇️ Download CSV",
-                            data=file,
-                            file_name=os.path.basename(filepath),
-                            mime="text/csv",
-                            use_container_width=True
-                        )
+                    botao_download(filepath, "⬇️ Download CSV", "text/csv")
                 else:
                     st.warning("⚠️ Nenhum dado para exportar")
             except Exception as e:
@@ -234,14 +315,7 @@ with st.sidebar.expander("📤 Exportar & Backup", expanded=False):
                     st.success(f"✅ Excel exportado!")
                     
                     # Botão de download
-                    with open(filepath, "rb") as file:
-                        st.download_button(
-                            label="⬇️ Download Excel",
-                            data=file,
-                            file_name=os.path.basename(filepath),
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True
-                        )
+                    botao_download(filepath, "⬇️ Download Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
                 else:
                     st.warning("⚠️ Nenhum dado para exportar")
             except Exception as e:
@@ -258,36 +332,70 @@ with st.sidebar.expander("📤 Exportar & Backup", expanded=False):
                 st.success(f"✅ PDF gerado!")
                 
                 # Botão de download
-                with open(filepath, "rb") as file:
-                    st.download_button(
-                        label="⬇️ Download PDF",
-                        data=file,
-                        file_name=os.path.basename(filepath),
-                        mime="application/pdf",
-                        use_container_width=True
-                    )
+                botao_download(filepath, "⬇️ Download PDF", "application/pdf")
             else:
                 st.warning("⚠️ Nenhum dado para exportar")
         except Exception as e:
             st.error(f"❌ Erro: {str(e)}")
     
+    if st.button("📚 Histórico Completo (PDF)", use_container_width=True):
+        try:
+            # Lê o banco em blocos: não carrega todos os torneios na memória
+            with st.spinner("Gerando histórico completo..."):
+                filepath = export.export_to_pdf_completo(db)
+            st.success(f"✅ PDF gerado!")
+            
+            # Botão de download
+            botao_download(filepath, "⬇️ Download Histórico", "application/pdf")
+        except Exception as e:
+            st.error(f"❌ Erro: {str(e)}")
+    
     st.markdown("### Backup")
     if st.button("💾 Criar Backup", use_container_width=True):
         try:
-            backup_path = export.create_backup(db.db_path)
+            # Com shards, os torneios estão fora do banco principal: o backup é um .zip com os dois
+            diretorio_shards = db.diretorio_shards if isinstance(db, ShardedPokerDatabase) else None
+            backup_path = export.create_backup(db.db_path, diretorio_shards=diretorio_shards)
             st.success(f"✅ Backup criado!")
             
             # Botão de download do backup
-            with open(backup_path, "rb") as file:
-                st.download_button(
-                    label="⬇️ Download Backup",
-                    data=file,
-                    file_name=os.path.basename(backup_path),
-                    mime="application/octet-stream",
-                    use_container_width=True
-                )
+            botao_download(backup_path, "⬇️ Download Backup",
+                           "application/zip" if diretorio_shards else "application/octet-stream")
         except Exception as e:
             st.error(f"❌ Erro no backup: {str(e)}")
+    
+    st.markdown("### Arquivo Anual")
+    anos_arquivaveis = db.get_anos_arquivaveis()
+    if anos_arquivaveis:
+        ano_arquivo = st.selectbox("Ano encerrado", anos_arquivaveis, key="ano_arquivo")
+        if st.button("🗄️ Arquivar Ano", use_container_width=True):
+            movidos = db.arquivar_ano(ano_arquivo)
+            if movidos:
+                st.success(f"✅ {movidos} torneios de {ano_arquivo} arquivados!")
+                st.rerun()
+            else:
+                st.error("❌ Erro ao arquivar o ano")
+    
+    arquivados = db.get_arquivos_anuais()
+    if arquivados:
+        st.caption("Arquivados: " + ", ".join(f"{a['ano']} ({a['total_torneios']})" for a in arquivados))
+    
+    st.markdown("### Duplicados")
+    if st.button("🔍 Procurar Duplicados", use_container_width=True):
+        st.session_state['duplicados'] = db.get_torneios_duplicados()
+    if 'duplicados' in st.session_state:
+        duplicados = st.session_state['duplicados']
+        if duplicados["excedentes"]:
+            st.caption(f"{duplicados['excedentes']} torneios repetidos em {duplicados['grupos']} grupos "
+                       "(mesma data, conta, tipo, buy-in, ganho e horário)")
+            if st.button("🧹 Mesclar Duplicados", use_container_width=True):
+                removidos = db.mesclar_torneios_duplicados()
+                del st.session_state['duplicados']
+                analytics_cache.invalidar()
+                st.success(f"✅ {removidos} torneios repetidos removidos!")
+                st.rerun()
+        else:
+            st.caption("Nenhum torneio repetido")
 
 # Seção de filtros
 st.sidebar.markdown("### 🔍 Filtros")
@@ -337,25 +445,37 @@ if data_fim and isinstance(data_fim, date):
 id_conta_filtro = None if conta_filtro == "Todas as Contas" else next(c["id"] for c in contas if c["nome"] == conta_filtro)
 id_tipo_filtro = None if tipo_filtro == "Todos os Tipos" else next(t["id"] for t in tipos_torneio if t["nome"] == tipo_filtro)
 
-# Obter dados filtrados
-torneios = db.get_torneios(
-    id_conta=id_conta_filtro,
-    id_tipo_torneio=id_tipo_filtro,
-    data_inicio=data_inicio,
-    data_fim=data_fim
-)
+# Visão do filtro na versão atual dos dados: peças já calculadas (por outro rerun
+# ou pelo aquecedor em segundo plano) são reaproveitadas
+visao = visoes.obter((id_conta_filtro, id_tipo_filtro, data_inicio, data_fim))
 
-estatisticas = db.get_estatisticas_gerais(
-    id_conta=id_conta_filtro,
-    data_inicio=data_inicio,
-    data_fim=data_fim
-)
+# Assinatura do feed: o rerun pedido pelo navegador reaproveita as peças que a alteração não atingiu
+if URL_FEED:
+    with st.sidebar:
+        feed_alteracoes(
+            url=URL_FEED,
+            filtro={
+                "id_conta": id_conta_filtro,
+                "data_inicio": data_inicio,
+                "data_fim": data_fim,
+                "mes_passado": (date.today().replace(day=1) - timedelta(days=1)).replace(day=1).strftime("%Y-%m-%d")
+            },
+            key="feed_alteracoes",
+            default=None
+        )
 
-estatisticas_por_tipo = db.get_estatisticas_por_tipo(
-    id_conta=id_conta_filtro,
-    data_inicio=data_inicio,
-    data_fim=data_fim
-)
+# Obter dados filtrados (arrays tipados; linhas se comportam como dicionários)
+with profiler.secao("Dados: torneios filtrados") as span_torneios:
+    torneios = visao.torneios()
+    span_torneios.linhas = len(torneios)
+
+with profiler.secao("Dados: estatísticas SQL"):
+    estatisticas = visao.estatisticas()
+    estatisticas_por_tipo = visao.estatisticas_por_tipo()
+
+# Estado analítico do filtro atual (incremental entre reruns)
+with profiler.secao("Estado analítico", len(torneios)):
+    estado_analitico = visao.estado()
 
 # Layout principal
 if not torneios:
@@ -395,139 +515,120 @@ if not torneios:
         - **Bounty** - Torneios com sistema de recompensas
         """)
 else:
-    # Métricas principais
-    st.markdown("## 📈 Indicadores Principais")
-    
-    # Comparação temporal (Este mês vs mês passado)
-    from datetime import datetime, timedelta
-    hoje = datetime.now()
-    primeiro_dia_mes_atual = hoje.replace(day=1)
-    primeiro_dia_mes_passado = (primeiro_dia_mes_atual - timedelta(days=1)).replace(day=1)
-    ultimo_dia_mes_passado = primeiro_dia_mes_atual - timedelta(days=1)
-    
-    # Estatísticas do mês atual
-    stats_mes_atual = db.get_estatisticas_gerais(
-        id_conta=id_conta_filtro,
-        data_inicio=primeiro_dia_mes_atual.strftime("%Y-%m-%d"),
-        data_fim=hoje.strftime("%Y-%m-%d")
-    )
-    
-    # Estatísticas do mês passado
-    stats_mes_passado = db.get_estatisticas_gerais(
-        id_conta=id_conta_filtro,
-        data_inicio=primeiro_dia_mes_passado.strftime("%Y-%m-%d"),
-        data_fim=ultimo_dia_mes_passado.strftime("%Y-%m-%d")
-    )
-    
-    # Seção de comparação temporal
-    st.markdown("### 📊 Comparação Temporal (Este Mês vs Mês Passado)")
-    col_temp1, col_temp2, col_temp3, col_temp4 = st.columns(4)
-    
-    with col_temp1:
-        lucro_atual = stats_mes_atual['lucro_liquido']
-        lucro_passado = stats_mes_passado['lucro_liquido']
-        delta_lucro = lucro_atual - lucro_passado
-        st.metric(
-            "💰 Lucro do Mês",
-            f"R$ {lucro_atual:.2f}",
-            delta=f"R$ {delta_lucro:.2f}"
-        )
+    with profiler.secao("Indicadores"):
+        # Métricas principais
+        st.markdown("## 📈 Indicadores Principais")
     
-    with col_temp2:
-        roi_atual = stats_mes_atual['roi_geral']
-        roi_passado = stats_mes_passado['roi_geral']
-        delta_roi = roi_atual - roi_passado
-        st.metric(
-            "📊 ROI do Mês",
-            f"{roi_atual:.1f}%",
-            delta=f"{delta_roi:.1f}%"
-        )
+        # Comparação temporal (Este mês vs mês passado)
+        stats_mes_atual, stats_mes_passado = visao.estatisticas_mes()
     
-    with col_temp3:
-        torneios_atual = stats_mes_atual['total_torneios']
-        torneios_passado = stats_mes_passado['total_torneios']
-        delta_torneios = torneios_atual - torneios_passado
-        st.metric(
-            "🎯 Torneios do Mês",
-            f"{torneios_atual}",
-            delta=f"{delta_torneios}"
-        )
+        # Seção de comparação temporal
+        st.markdown("### 📊 Comparação Temporal (Este Mês vs Mês Passado)")
+        col_temp1, col_temp2, col_temp3, col_temp4 = st.columns(4)
     
-    with col_temp4:
-        itm_atual = stats_mes_atual['itm_percentage']
-        itm_passado = stats_mes_passado['itm_percentage']
-        delta_itm = itm_atual - itm_passado
-        st.metric(
-            "💎 ITM do Mês",
-            f"{itm_atual:.1f}%",
-            delta=f"{delta_itm:.1f}%"
-        )
+        with col_temp1:
+            lucro_atual = stats_mes_atual['lucro_liquido']
+            lucro_passado = stats_mes_passado['lucro_liquido']
+            delta_lucro = lucro_atual - lucro_passado
+            st.metric(
+                "💰 Lucro do Mês",
+                f"R$ {lucro_atual:.2f}",
+                delta=f"R$ {delta_lucro:.2f}"
+            )
     
-    col1, col2, col3, col4 = st.columns(4)
+        with col_temp2:
+            roi_atual = stats_mes_atual['roi_geral']
+            roi_passado = stats_mes_passado['roi_geral']
+            delta_roi = roi_atual - roi_passado
+            st.metric(
+                "📊 ROI do Mês",
+                f"{roi_atual:.1f}%",
+                delta=f"{delta_roi:.1f}%"
+            )
     
-    with col1:
-        lucro_class = "positive" if estatisticas["lucro_liquido"] > 0 else "negative" if estatisticas["lucro_liquido"] < 0 else "neutral"
-        st.metric(
-            "💰 Lucro Líquido",
-            f"R$ {estatisticas['lucro_liquido']:.2f}",
-            delta=None
-        )
+        with col_temp3:
+            torneios_atual = stats_mes_atual['total_torneios']
+            torneios_passado = stats_mes_passado['total_torneios']
+            delta_torneios = torneios_atual - torneios_passado
+            st.metric(
+                "🎯 Torneios do Mês",
+                f"{torneios_atual}",
+                delta=f"{delta_torneios}"
+            )
     
-    with col2:
-        roi_class = "positive" if estatisticas["roi_geral"] > 0 else "negative" if estatisticas["roi_geral"] < 0 else "neutral"
-        st.metric(
-            "📊 ROI Geral",
-            f"{estatisticas['roi_geral']:.1f}%",
-            delta=None
-        )
+        with col_temp4:
+            itm_atual = stats_mes_atual['itm_percentage']
+            itm_passado = stats_mes_passado['itm_percentage']
+            delta_itm = itm_atual - itm_passado
+            st.metric(
+                "💎 ITM do Mês",
+                f"{itm_atual:.1f}%",
+                delta=f"{delta_itm:.1f}%"
+            )
     
-    with col3:
-        st.metric(
-            "🎯 Total de Torneios",
-            f"{estatisticas['total_torneios']}",
-            delta=None
-        )
+        col1, col2, col3, col4 = st.columns(4)
     
-    with col4:
-        st.metric(
-            "💎 ITM",
-            f"{estatisticas['itm_percentage']:.1f}%",
-            delta=None
-        )
+        with col1:
+            lucro_class = "positive" if estatisticas["lucro_liquido"] > 0 else "negative" if estatisticas["lucro_liquido"] < 0 else "neutral"
+            st.metric(
+                "💰 Lucro Líquido",
+                f"R$ {estatisticas['lucro_liquido']:.2f}",
+                delta=None
+            )
     
-    # Segunda linha de métricas
-    col5, col6, col7, col8 = st.columns(4)
+        with col2:
+            roi_class = "positive" if estatisticas["roi_geral"] > 0 else "negative" if estatisticas["roi_geral"] < 0 else "neutral"
+            st.metric(
+                "📊 ROI Geral",
+                f"{estatisticas['roi_geral']:.1f}%",
+                delta=None
+            )
     
-    with col5:
-        st.metric(
-            "💸 Total Investido",
-            f"R$ {estatisticas['total_investido']:.2f}",
-            delta=None
-        )
+        with col3:
+            st.metric(
+                "🎯 Total de Torneios",
+                f"{estatisticas['total_torneios']}",
+                delta=None
+            )
     
-    with col6:
-        st.metric(
-            "💵 Total Ganhos",
-            f"R$ {estatisticas['total_ganhos']:.2f}",
-            delta=None
-        )
+        with col4:
+            st.metric(
+                "💎 ITM",
+                f"{estatisticas['itm_percentage']:.1f}%",
+                delta=None
+            )
     
-    with col7:
-        st.metric(
-            "🎲 ABI",
-            f"R$ {estatisticas['abi']:.2f}",
-            delta=None
-        )
+        # Segunda linha de métricas
+        col5, col6, col7, col8 = st.columns(4)
     
-    with col8:
-        # Calcular variância
-        calc = PokerCalculations()
-        variance_data = calc.calculate_variance_and_downswing(torneios)
-        st.metric(
-            "📉 Maior Downswing",
-            f"R$ {variance_data['maior_downswing']:.2f}",
-            delta=None
-        )
+        with col5:
+            st.metric(
+                "💸 Total Investido",
+                f"R$ {estatisticas['total_investido']:.2f}",
+                delta=None
+            )
+    
+        with col6:
+            st.metric(
+                "💵 Total Ganhos",
+                f"R$ {estatisticas['total_ganhos']:.2f}",
+                delta=None
+            )
+    
+        with col7:
+            st.metric(
+                "🎲 ABI",
+                f"R$ {estatisticas['abi']:.2f}",
+                delta=None
+            )
+    
+        with col8:
+            variance_data = estado_analitico.calculate_variance_and_downswing()
+            st.metric(
+                "📉 Maior Downswing",
+                f"R$ {variance_data['maior_downswing']:.2f}",
+                delta=None
+            )
 
     # Seção de gráficos
     st.markdown("## 📊 Análises Visuais")
@@ -535,108 +636,84 @@ else:
     # Primeira linha de gráficos
     col1, col2 = st.columns(2)
     
-    with col1:
+    with col1, profiler.secao("Gráfico: Evolução do ROI"):
         # Gráfico de evolução do ROI
-        fig_roi = plotting.create_roi_evolution_chart(torneios)
+        fig_roi = visao.figura_roi()
         st.plotly_chart(fig_roi, use_container_width=True)
     
-    with col2:
+    with col2, profiler.secao("Gráfico: Lucro por Tipo"):
         # Gráfico de lucro por tipo de torneio
-        fig_profit = plotting.create_profit_by_tournament_type_chart(estatisticas_por_tipo)
+        fig_profit = visao.figura_lucro_por_tipo()
         st.plotly_chart(fig_profit, use_container_width=True)
     
     # Segunda linha de gráficos
     col3, col4 = st.columns(2)
     
-    with col3:
+    with col3, profiler.secao("Gráfico: Distribuição de Tipos"):
         # Gráfico de distribuição de tipos de torneio
-        fig_pie = plotting.create_tournament_distribution_pie_chart(estatisticas_por_tipo)
+        fig_pie = visao.figura_distribuicao_tipos()
         st.plotly_chart(fig_pie, use_container_width=True)
     
-    with col4:
+    with col4, profiler.secao("Gráfico: Bankroll"):
         # Gráfico de evolução do bankroll (assumindo bankroll inicial de 0)
-        fig_bankroll = plotting.create_bankroll_evolution_chart(torneios, 0)
+        fig_bankroll = visao.figura_bankroll()
         st.plotly_chart(fig_bankroll, use_container_width=True)
     
     # Gráfico de performance mensal (largura completa)
-    fig_monthly = plotting.create_monthly_performance_chart(torneios)
-    st.plotly_chart(fig_monthly, use_container_width=True)
+    with profiler.secao("Gráfico: Performance Mensal"):
+        fig_monthly = visao.figura_mensal()
+        st.plotly_chart(fig_monthly, use_container_width=True)
+    
+    # Métricas em janela móvel (forma recente)
+    with profiler.secao("Gráfico: Janela Móvel", len(torneios)):
+        col_janela1, col_janela2 = st.columns([3, 7])
+        with col_janela1:
+            tipo_janela = st.radio(
+                "Janela móvel por",
+                ["Torneios", "Dias"],
+                horizontal=True,
+                key="tipo_janela_movel"
+            )
+        fig_rolling = visao.figura_janela_movel('dias' if tipo_janela == "Dias" else 'torneios')
+        st.plotly_chart(fig_rolling, use_container_width=True)
     
     # Gráfico de comparação entre contas (se não há filtro de conta específica)
-    if conta_filtro == "Todas as Contas":
-        fig_accounts = plotting.create_account_comparison_chart(db, contas)
-        st.plotly_chart(fig_accounts, use_container_width=True)
+    with profiler.secao("Gráfico: Comparação entre Contas"):
+        if conta_filtro == "Todas as Contas":
+            fig_accounts = visao.figura_contas()
+            st.plotly_chart(fig_accounts, use_container_width=True)
 
 # Tabela de torneios recentes
 if torneios:
-    st.markdown("## 📋 Torneios Recentes")
-    
-    # Preparar dados para exibição
-    df_display = pd.DataFrame(torneios)
-    df_display = df_display[['data_torneio', 'nome_conta', 'nome_tipo', 'buy_in', 'ganho_total', 'lucro_liquido', 'roi']]
-    df_display.columns = ['Data', 'Conta', 'Tipo', 'Buy-in (R$)', 'Ganho (R$)', 'Lucro (R$)', 'ROI (%)']
-    
-    # Formatar valores
-    df_display['Buy-in (R$)'] = df_display['Buy-in (R$)'].apply(lambda x: f"R$ {x:.2f}")
-    df_display['Ganho (R$)'] = df_display['Ganho (R$)'].apply(lambda x: f"R$ {x:.2f}")
-    df_display['Lucro (R$)'] = df_display['Lucro (R$)'].apply(lambda x: f"R$ {x:.2f}")
-    df_display['ROI (%)'] = df_display['ROI (%)'].apply(lambda x: f"{x:.1f}%")
-    
-    # Determinar número de itens por página
-    itens_por_pagina = 20
-    total_torneios = len(df_display)
-    
-    # Paginação
-    if total_torneios > itens_por_pagina:
-        total_paginas = (total_torneios - 1) // itens_por_pagina + 1
-        
-        col_pag1, col_pag2 = st.columns([3, 7])
-        with col_pag1:
-            pagina_atual = st.number_input(
-                f"Página (de {total_paginas})", 
-                min_value=1, 
-                max_value=total_paginas, 
-                value=1, 
-                step=1,
-                key="pagina_torneios"
-            )
+    with profiler.secao("Tabela: Torneios Recentes", len(torneios)):
+        st.markdown("## 📋 Torneios Recentes")
+    
+        # Determinar número de itens por página
+        itens_por_pagina = 20
+        total_torneios = len(torneios)
+        pagina_atual = 1
+    
+        # Paginação
+        if total_torneios > itens_por_pagina:
+            total_paginas = (total_torneios - 1) // itens_por_pagina + 1
         
-        # Calcular slice
-        inicio = (pagina_atual - 1) * itens_por_pagina
-        fim = min(inicio + itens_por_pagina, total_torneios)
-        df_display = df_display.iloc[inicio:fim]
-    else:
-        df_display = df_display.head(20)
+            col_pag1, col_pag2 = st.columns([3, 7])
+            with col_pag1:
+                pagina_atual = st.number_input(
+                    f"Página (de {total_paginas})", 
+                    min_value=1, 
+                    max_value=total_paginas, 
+                    value=1, 
+                    step=1,
+                    key="pagina_torneios"
+                )
     
-    # Aplicar cores consistentes baseadas no lucro
-    def aplicar_cores(val):
-        if 'R$' in str(val) or '%' in str(val):
-            # Extrair valor numérico
-            valor_str = str(val).replace('R$', '').replace('%', '').replace(',', '.').strip()
-            try:
-                valor = float(valor_str)
-                if valor > 0:
-                    return 'background-color: #e8f5e8; color: #2d5a2d; font-weight: bold'  # Verde consistente
-                elif valor < 0:
-                    return 'background-color: #ffeaea; color: #a94442; font-weight: bold'  # Vermelho consistente
-            except ValueError:
-                pass
-        return 'color: #333'  # Cor padrão para valores neutros
-    
-    # Aplicar estilos apenas se há dados
-    if not df_display.empty:
-        styled_df = df_display.style.applymap(
-            aplicar_cores, subset=['Lucro (R$)', 'ROI (%)']
+        # Só a página exibida é convertida, formatada e colorida (valores continuam numéricos)
+        st.dataframe(
+            tables.recent_tournaments_page(torneios, pagina_atual, itens_por_pagina),
+            use_container_width=True,
+            hide_index=True
         )
-    else:
-        styled_df = df_display
-    
-    # Mostrar dataframe com cores
-    st.dataframe(
-        styled_df,
-        use_container_width=True,
-        hide_index=True
-    )
     
     # Seção de ações rápidas para torneios
     st.markdown("### ⚡ Ações Rápidas")
@@ -644,7 +721,7 @@ if torneios:
     # Tabs para ação individual vs ação em lote
     tab1, tab2 = st.tabs(["🎯 Ação Individual", "📦 Ação em Lote"])
     
-    with tab1:
+    with tab1, profiler.secao("Ações: Individual"):
         # Dropdown para seleção de torneio
         torneios_opcoes = []
         inicio_pagina = 0
@@ -697,9 +774,12 @@ if torneios:
                     torneio_dados = torneios[idx_selecionado]
                     sucesso_exclusao = db.delete_torneio(torneio_dados['id_torneio'])
                     if sucesso_exclusao:
+                        analytics_cache.invalidar()
                         st.success("✅ Torneio excluído com sucesso!")
                         del st.session_state['confirmar_exclusao']
                         st.rerun()
+                    elif db.get_ano_arquivado(torneio_dados['id_torneio']) is not None:
+                        st.error("❌ Torneio de ano arquivado, somente leitura: desarquive o ano para excluí-lo")
                     else:
                         st.error("❌ Erro ao excluir torneio!")
             
@@ -708,7 +788,7 @@ if torneios:
                     del st.session_state['confirmar_exclusao']
                     st.rerun()
     
-    with tab2:
+    with tab2, profiler.secao("Ações: Em Lote"):
         st.markdown("**Selecione múltiplos torneios para ações em lote:**")
         
         # Criar checkboxes para seleção múltipla
@@ -759,11 +839,11 @@ if torneios:
             col_sim_lote, col_nao_lote = st.columns(2)
             with col_sim_lote:
                 if st.button("✅ Sim, excluir todos", use_container_width=True):
-                    sucessos = 0
-                    for torneio_id in st.session_state['torneios_selecionados']:
-                        if db.delete_torneio(torneio_id):
-                            sucessos += 1
+                    # Enfileira todas antes de esperar: a fila de escrita grava o lote num único commit
+                    futuros = [db.delete_torneio_async(torneio_id) for torneio_id in st.session_state['torneios_selecionados']]
+                    sucessos = sum(1 for futuro in futuros if futuro.exception() is None)
                     
+                    analytics_cache.invalidar()
                     st.success(f"✅ {sucessos} torneios excluídos com sucesso!")
                     st.session_state['torneios_selecionados'] = []
                     del st.session_state['confirmar_exclusao_lote']
@@ -815,7 +895,7 @@ if torneios:
                     cancelar_lote = st.form_submit_button("❌ Cancelar", use_container_width=True)
                 
                 if salvar_lote:
-                    sucessos = 0
+                    futuros = []
                     for torneio_id in st.session_state['torneios_selecionados']:
                         # Buscar dados atuais do torneio
                         torneio_atual = next((t for t in torneios if t['id_torneio'] == torneio_id), None)
@@ -827,9 +907,10 @@ if torneios:
                             buyin_final = novo_buyin if alterar_buyin else torneio_atual['buy_in']
                             ganho_final = novo_ganho if alterar_ganho else torneio_atual['ganho_total']
                             
-                            if db.update_torneio(torneio_id, data_final, conta_final, tipo_final, buyin_final, ganho_final):
-                                sucessos += 1
+                            futuros.append(db.update_torneio_async(torneio_id, data_final, conta_final, tipo_final, buyin_final, ganho_final))
+                    sucessos = sum(1 for futuro in futuros if futuro.exception() is None)
                     
+                    analytics_cache.invalidar()
                     st.success(f"✅ {sucessos} torneios atualizados com sucesso!")
                     st.session_state['torneios_selecionados'] = []
                     del st.session_state['modo_edicao_lote']
@@ -902,9 +983,12 @@ if torneios:
                 )
                 
                 if sucesso_update:
+                    analytics_cache.invalidar()
                     st.success("✅ Torneio atualizado com sucesso!")
                     del st.session_state['edit_id']
                     st.rerun()
+                elif db.get_ano_arquivado(st.session_state['edit_id']) is not None:
+                    st.error("❌ Torneio de ano arquivado, somente leitura: desarquive o ano para editá-lo")
                 else:
                     st.error("❌ Erro ao atualizar torneio!")
             
@@ -914,34 +998,142 @@ if torneios:
 
 # Seção de estatísticas avançadas
 if torneios:
-    st.markdown("## 🔍 Estatísticas Avançadas")
+    with profiler.secao("Estatísticas Avançadas"):
+        st.markdown("## 🔍 Estatísticas Avançadas")
     
-    col1, col2, col3 = st.columns(3)
+        col_sessao1, col_sessao2 = st.columns(2)
+        with col_sessao1:
+            agrupamento_sessao = st.selectbox(
+                "Agrupar sessões",
+                ["Por dia", "Por conta", "Por tipo"],
+                key="agrupamento_sessao"
+            )
+        with col_sessao2:
+            intervalo_sessao = st.number_input(
+                "Intervalo máximo entre torneios (min, 0 = sessão diária)",
+                min_value=0,
+                value=0,
+                step=30,
+                key="intervalo_sessao"
+            )
     
-    with col1:
-        st.markdown("### 📈 Melhores Sessões")
-        calc = PokerCalculations()
-        best_worst = calc.get_best_and_worst_sessions(torneios, 3)
-        
-        for i, sessao in enumerate(best_worst["melhores"], 1):
-            st.write(f"**{i}º** - {sessao['data_torneio']}: R$ {sessao['lucro_liquido']:.2f}")
+        # Sessões diárias vêm do estado analítico; as demais, do SQL (ORDER BY ... LIMIT)
+        best_worst = visao.sessoes(
+            agrupar_por={"Por conta": "conta", "Por tipo": "tipo"}.get(agrupamento_sessao),
+            intervalo_minutos=intervalo_sessao or None
+        )
     
-    with col2:
-        st.markdown("### 📉 Piores Sessões")
-        for i, sessao in enumerate(best_worst["piores"], 1):
-            st.write(f"**{i}º** - {sessao['data_torneio']}: R$ {sessao['lucro_liquido']:.2f}")
+        def descrever_sessao(sessao):
+            descricao = sessao['inicio'][:16] if 'inicio' in sessao else f"{sessao['data_torneio']}"
+            grupo = sessao.get('nome_conta') or sessao.get('nome_tipo')
+            if grupo:
+                descricao += f" ({grupo})"
+            return f"{descricao}: R$ {sessao['lucro_liquido']:.2f}"
+    
+        col1, col2, col3 = st.columns(3)
     
-    with col3:
-        st.markdown("### 📊 Métricas de Risco")
-        variance_data = calc.calculate_variance_and_downswing(torneios)
-        st.write(f"**Variância:** {variance_data['variancia']:.2f}")
-        st.write(f"**Maior Downswing:** R$ {variance_data['maior_downswing']:.2f}")
-        st.write(f"**Downswing Atual:** R$ {variance_data['downswing_atual']:.2f}")
+        with col1:
+            st.markdown("### 📈 Melhores Sessões")
+            for i, sessao in enumerate(best_worst["melhores"], 1):
+                st.write(f"**{i}º** - {descrever_sessao(sessao)}")
+    
+        with col2:
+            st.markdown("### 📉 Piores Sessões")
+            for i, sessao in enumerate(best_worst["piores"], 1):
+                st.write(f"**{i}º** - {descrever_sessao(sessao)}")
+    
+        with col3:
+            st.markdown("### 📊 Métricas de Risco")
+            variance_data = estado_analitico.calculate_variance_and_downswing()
+            st.write(f"**Variância:** {variance_data['variancia']:.2f}")
+            st.write(f"**Maior Downswing:** R$ {variance_data['maior_downswing']:.2f}")
+            st.write(f"**Downswing Atual:** R$ {variance_data['downswing_atual']:.2f}")
+
+# Cenários "e se": todos avaliados juntos sobre os arrays do filtro atual, sem nova consulta
+if torneios:
+    with profiler.secao("Cenários", len(torneios)):
+        st.markdown("## 🔮 Cenários")
+    
+        nomes_tipos = [t["nome"] for t in tipos_torneio]
+        nomes_contas = [c["nome"] for c in contas]
+    
+        cenarios_prontos = {f"Sem {tipo}": {"excluir_tipos": [tipo]} for tipo in nomes_tipos}
+        cenarios_prontos["Buy-in até R$ 50"] = {"buy_in_max": 50}
+        cenarios_prontos.update({f"{tipo} com stake dobrada": {"multiplicadores": {tipo: 2}} for tipo in nomes_tipos})
+        if id_conta_filtro is None:
+            cenarios_prontos.update({f"Sem {conta}": {"excluir_contas": [conta]} for conta in nomes_contas})
+    
+        escolhidos = st.multiselect(
+            "Comparar o filtro atual com",
+            list(cenarios_prontos),
+            default=[nome for nome in ("Sem Battle", "Buy-in até R$ 50", "Mystery com stake dobrada")
+                     if nome in cenarios_prontos],
+            key="cenarios_prontos"
+        )
+    
+        with st.expander("🛠️ Montar Cenário", expanded=False):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                excluir_tipos = st.multiselect("Sem os tipos", nomes_tipos, key="cenario_excluir_tipos")
+                excluir_contas = st.multiselect("Sem as contas", nomes_contas, key="cenario_excluir_contas")
+            with col2:
+                buy_in_maximo = st.number_input("Buy-in máximo (R$, 0 = sem limite)", min_value=0.0, value=0.0,
+                                                step=5.0, key="cenario_buy_in_max")
+            with col3:
+                tipo_multiplicado = st.selectbox("Multiplicar stake de", ["Todos os Tipos"] + nomes_tipos,
+                                                 key="cenario_tipo_multiplicado")
+                fator_stake = st.number_input("Fator de stake", min_value=0.25, value=1.0, step=0.25,
+                                              key="cenario_fator_stake")
+    
+        cenarios = [{"nome": "Filtro atual"}] + [dict(cenarios_prontos[nome], nome=nome) for nome in escolhidos]
+    
+        personalizado = {"nome": "Personalizado"}
+        if excluir_tipos:
+            personalizado["excluir_tipos"] = excluir_tipos
+        if excluir_contas:
+            personalizado["excluir_contas"] = excluir_contas
+        if buy_in_maximo > 0:
+            personalizado["buy_in_max"] = buy_in_maximo
+        if fator_stake != 1.0:
+            if tipo_multiplicado == "Todos os Tipos":
+                personalizado["multiplicador"] = fator_stake
+            else:
+                personalizado["multiplicadores"] = {tipo_multiplicado: fator_stake}
+        if len(personalizado) > 1:
+            cenarios.append(personalizado)
+    
+        st.dataframe(
+            tables.scenario_comparison(visao.cenarios().avaliar(cenarios)),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption("Stake multiplicada vale para o buy-in e o ganho; as diferenças são em relação ao filtro atual.")
 
 # Rodapé
 st.markdown("---")
 st.markdown("**Dashboard Suprema Poker** - Desenvolvido para controle profissional de resultados")
 
+# Painel de profiling do rerun (modo de depuração)
+if profiler.ativo:
+    caminho_cprofile = profiler.finalizar()
+    spans = profiler.get_spans()
+    with st.sidebar.expander("⏱️ Perfil do Rerun", expanded=True):
+        st.caption(f"Tempo total: {profiler.total() * 1000:.0f} ms")
+        st.plotly_chart(plotting.create_rerun_waterfall_chart(spans), use_container_width=True)
+        st.dataframe(pd.DataFrame(spans), use_container_width=True, hide_index=True)
+        if caminho_cprofile:
+            st.caption(f"cProfile salvo em `{caminho_cprofile}`")
+        # Confere o estado analítico (incremental entre reruns) contra um recálculo completo
+        divergencias = estado_analitico.verificar(torneios)
+        if divergencias:
+            st.warning("Estado analítico divergente do recálculo completo:\n\n" + "\n".join(f"- {d}" for d in divergencias))
+        else:
+            st.caption(f"Estado analítico confere com o recálculo completo ({len(torneios)} torneios)")
+        if db.rastrear_sql:
+            from sql_trace import rastreador
+            st.caption(f"SQL por formato (acima de {rastreador.limite_ms:.0f} ms vai para o log de consultas lentas)")
+            st.dataframe(pd.DataFrame(rastreador.resumo(15)), use_container_width=True, hide_index=True)
+
 if __name__ == "__main__":
     pass
 
@@ -0,0 +1,389 @@
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from analytics import PokerAnalyticsCache
+from metrics import registry
+from plotting import PokerPlotting
+from scenarios import PokerScenarios
+
+_PARAR = object()
+
+# Filtro da visão padrão: todas as contas, todos os tipos, todos os períodos
+FILTRO_PADRAO = (None, None, None, None)
+
+# Marca a thread do aquecedor: o que ela calcula não conta como hit/miss da tela
+_local = threading.local()
+
+
+class PokerDashboardView:
+    """Peças da tela do dashboard (dados, estatísticas, gráficos e sessões) de um filtro.
+
+    Vale para uma versão dos dados e um dia; cada peça é calculada na primeira
+    vez que é pedida, pelo rerun ou pelo aquecedor, e reaproveitada depois.
+    """
+
+    def __init__(self, db, analytics_cache: PokerAnalyticsCache, filtro: Tuple, versao: int, hoje: date):
+        self.db = db
+        self.analytics_cache = analytics_cache
+        self.filtro = filtro
+        self.versao = versao
+        self.hoje = hoje
+        self.id_conta, self.id_tipo_torneio, self.data_inicio, self.data_fim = filtro
+
+        self._pecas = {}
+        self._lock = threading.RLock()
+
+    def _peca(self, nome, gerar: Callable[[], object]):
+        with self._lock:
+            hit = nome in self._pecas
+            if not hit:
+                self._pecas[nome] = gerar()
+        if not getattr(_local, 'aquecendo', False):
+            registry.registrar_cache('visao_dashboard', hit)
+        return self._pecas[nome]
+
+    def torneios(self):
+        return self._peca('torneios', lambda: self.db.get_torneios_set(
+            id_conta=self.id_conta,
+            id_tipo_torneio=self.id_tipo_torneio,
+            data_inicio=self.data_inicio,
+            data_fim=self.data_fim
+        ))
+
+    def estatisticas(self) -> Dict:
+        return self._peca('estatisticas', lambda: self.db.get_estatisticas_gerais(
+            id_conta=self.id_conta,
+            data_inicio=self.data_inicio,
+            data_fim=self.data_fim
+        ))
+
+    def estatisticas_por_tipo(self) -> List[Dict]:
+        return self._peca('estatisticas_por_tipo', lambda: self.db.get_estatisticas_por_tipo(
+            id_conta=self.id_conta,
+            data_inicio=self.data_inicio,
+            data_fim=self.data_fim
+        ))
+
+    def estatisticas_mes(self) -> Tuple[Dict, Dict]:
+        """Estatísticas deste mês (até hoje) e do mês passado inteiro."""
+        def gerar():
+            primeiro_dia_mes_atual = self.hoje.replace(day=1)
+            ultimo_dia_mes_passado = primeiro_dia_mes_atual - timedelta(days=1)
+            primeiro_dia_mes_passado = ultimo_dia_mes_passado.replace(day=1)
+            return (
+                self.db.get_estatisticas_gerais(
+                    id_conta=self.id_conta,
+                    data_inicio=primeiro_dia_mes_atual.strftime("%Y-%m-%d"),
+                    data_fim=self.hoje.strftime("%Y-%m-%d")
+                ),
+                self.db.get_estatisticas_gerais(
+                    id_conta=self.id_conta,
+                    data_inicio=primeiro_dia_mes_passado.strftime("%Y-%m-%d"),
+                    data_fim=ultimo_dia_mes_passado.strftime("%Y-%m-%d")
+                )
+            )
+        return self._peca('estatisticas_mes', gerar)
+
+    def estado(self):
+        return self._peca('estado', lambda: self.analytics_cache.obter(self.filtro, self.torneios(), self.versao))
+
+    def cenarios(self) -> PokerScenarios:
+        """Motor de cenários "e se" sobre os torneios do filtro (arrays já ordenados pela linha do tempo)."""
+        return self._peca('cenarios', lambda: PokerScenarios(
+            self.torneios(),
+            [conta["nome"] for conta in self.db.get_contas()],
+            [tipo["nome"] for tipo in self.db.get_tipos_torneio()]
+        ))
+
+    def figura_roi(self):
+        return self._peca('figura_roi', lambda: PokerPlotting.create_roi_evolution_chart(
+            self.torneios(), self.estado().get_roi_evolution()))
+
+    def figura_lucro_por_tipo(self):
+        return self._peca('figura_lucro_por_tipo', lambda: PokerPlotting.create_profit_by_tournament_type_chart(
+            self.estatisticas_por_tipo()))
+
+    def figura_distribuicao_tipos(self):
+        return self._peca('figura_distribuicao_tipos', lambda: PokerPlotting.create_tournament_distribution_pie_chart(
+            self.estatisticas_por_tipo()))
+
+    def figura_bankroll(self):
+        return self._peca('figura_bankroll', lambda: PokerPlotting.create_bankroll_evolution_chart(
+            self.torneios(), 0, self.estado().get_roi_evolution()))
+
+    def figura_mensal(self):
+        return self._peca('figura_mensal', lambda: PokerPlotting.create_monthly_performance_chart(
+            self.torneios(), self.estado().get_performance_by_period()))
+
+    def figura_janela_movel(self, unidade: str = 'torneios'):
+        janelas = [30, 90, 365] if unidade == 'dias' else [100, 500, 1000]
+        return self._peca(('figura_janela_movel', unidade), lambda: PokerPlotting.create_rolling_metrics_chart(
+            self.torneios(), janelas, unidade))
+
+    def figura_contas(self):
+        return self._peca('figura_contas', lambda: PokerPlotting.create_account_comparison_chart(
+            self.db, self.db.get_contas()))
+
+    def sessoes(self, agrupar_por: Optional[str] = None, intervalo_minutos: Optional[int] = None) -> Dict:
+        """Três melhores e piores sessões; as diárias saem do estado analítico, as demais do SQL."""
+        def gerar():
+            if agrupar_por is None and not intervalo_minutos:
+                return self.estado().get_best_and_worst_sessions(3)
+            return self.db.get_melhores_piores_sessoes(
+                3,
+                id_conta=self.id_conta,
+                id_tipo_torneio=self.id_tipo_torneio,
+                data_inicio=self.data_inicio,
+                data_fim=self.data_fim,
+                agrupar_por=agrupar_por,
+                intervalo_minutos=intervalo_minutos or None
+            )
+        return self._peca(('sessoes', agrupar_por, intervalo_minutos or None), gerar)
+
+    def herdar(self, anterior: 'PokerDashboardView', alteracoes: Optional[List[Dict]]) -> int:
+        """Copia da visão da versão anterior as peças que as alterações entre as duas não atingem."""
+        if alteracoes is None or anterior.hoje != self.hoje:
+            return 0
+        atingidas = self._pecas_atingidas(alteracoes)
+        with anterior._lock:
+            pecas = {nome: peca for nome, peca in anterior._pecas.items()
+                     if (nome[0] if isinstance(nome, tuple) else nome) not in atingidas}
+        with self._lock:
+            for nome, peca in pecas.items():
+                self._pecas.setdefault(nome, peca)
+        return len(pecas)
+
+    def _pecas_atingidas(self, alteracoes: Optional[List[Dict]]) -> set:
+        """Nomes das peças que dependem de algum dia alterado (o tipo não vem no log: conta como atingido)."""
+        do_periodo = {'torneios', 'estatisticas', 'estatisticas_por_tipo', 'estado', 'figura_roi',
+                      'figura_lucro_por_tipo', 'figura_distribuicao_tipos', 'figura_bankroll', 'figura_mensal',
+                      'figura_janela_movel', 'sessoes', 'cenarios'}
+        if alteracoes is None:
+            return do_periodo | {'estatisticas_mes', 'figura_contas'}
+        if not alteracoes:
+            return set()
+
+        # A comparação entre contas usa todas as contas e todos os períodos
+        atingidas = {'figura_contas'}
+        primeiro_dia_mes_passado = (self.hoje.replace(day=1) - timedelta(days=1)).replace(day=1).strftime("%Y-%m-%d")
+        for alteracao in alteracoes:
+            if self.id_conta is not None and alteracao['id_conta'] != self.id_conta:
+                continue
+            if ((self.data_fim is None or alteracao['data_inicio'] <= self.data_fim)
+                    and (self.data_inicio is None or alteracao['data_fim'] >= self.data_inicio)):
+                atingidas |= do_periodo
+            # As estatísticas do mês ignoram o período do filtro
+            if alteracao['data_fim'] >= primeiro_dia_mes_passado:
+                atingidas.add('estatisticas_mes')
+        return atingidas
+
+    def aquecer(self):
+        """Calcula as peças que a tela mostra com as opções padrão."""
+        self.estatisticas()
+        self.estatisticas_por_tipo()
+        self.estado()
+        if not len(self.torneios()):
+            return
+        self.estatisticas_mes()
+        self.figura_roi()
+        self.figura_lucro_por_tipo()
+        self.figura_distribuicao_tipos()
+        self.figura_bankroll()
+        self.figura_mensal()
+        self.figura_janela_movel()
+        if self.id_conta is None:
+            self.figura_contas()
+        self.sessoes()
+
+
+class PokerViewCache:
+    """Visões do dashboard por filtro na versão atual dos dados, compartilhadas entre sessões.
+
+    Conta quantas vezes cada filtro foi aberto, para o aquecedor saber quais
+    combinações valem a pena recalcular depois de uma escrita.
+    """
+
+    def __init__(self, db, analytics_cache: PokerAnalyticsCache, max_visoes: int = 16):
+        self.db = db
+        self.analytics_cache = analytics_cache
+        self.max_visoes = max_visoes
+
+        self.herdadas = 0
+
+        self._visoes = OrderedDict()
+        self._acessos = Counter()
+        self._lock = threading.Lock()
+
+        # Visões da versão anterior, com o que mudou desde ela, para herdar peças não atingidas
+        self._anteriores = {}
+        self._alteracoes = None
+        self._marcador = None
+        self._versao = None
+
+    def obter(self, filtro: Tuple, contar: bool = True) -> PokerDashboardView:
+        """Visão do filtro na versão atual dos dados (criada vazia se ainda não existir)."""
+        versao = self.db.get_versao_dados()
+        hoje = date.today()
+        chave = (filtro, versao, hoje)
+
+        with self._lock:
+            if contar:
+                self._acessos[filtro] += 1
+            visao = self._visoes.get(chave)
+            if visao is not None:
+                self._visoes.move_to_end(chave)
+                return visao
+
+            if versao != self._versao:
+                self._trocar_versao(versao)
+
+            # Visões de versões ou dias anteriores não serão mais pedidas
+            for antiga in [c for c in self._visoes if c[1] != versao or c[2] != hoje]:
+                del self._visoes[antiga]
+            while len(self._visoes) >= self.max_visoes:
+                self._visoes.popitem(last=False)
+
+            visao = self._visoes[chave] = PokerDashboardView(self.db, self.analytics_cache, filtro, versao, hoje)
+            anterior = self._anteriores.pop(filtro, None)
+            if anterior is not None and visao.herdar(anterior, self._alteracoes):
+                self.herdadas += 1
+            return visao
+
+    def _trocar_versao(self, versao: int):
+        """Guarda as visões da versão que acabou e lê do log o que mudou desde ela."""
+        self._anteriores = {c[0]: visao for c, visao in self._visoes.items() if c[1] == self._versao}
+        try:
+            resultado = self.db.get_alteracoes(self._marcador)
+            self._marcador, self._alteracoes = resultado['marcador'], resultado['alteracoes']
+        except Exception as e:
+            print(f"Erro ao ler alterações: {e}")
+            self._marcador, self._alteracoes = None, None
+        if self._versao is None:
+            self._alteracoes = None
+        self._versao = versao
+
+    def populares(self, limite: int) -> List[Tuple]:
+        """Filtros mais abertos, além do padrão."""
+        with self._lock:
+            return [filtro for filtro, _ in self._acessos.most_common(limite + 1) if filtro != FILTRO_PADRAO][:limite]
+
+
+class PokerCacheWarmer:
+    """Recalcula em segundo plano a visão padrão e os filtros mais usados após cada escrita.
+
+    Uma thread acompanha o contador de alterações do banco (versao_dados, que
+    também muda com escritas de outros processos). Quando ele para de mudar
+    por `espera` segundos (ou após `espera_maxima` de mudanças seguidas, numa
+    importação longa), os filtros vão para uma fila limitada consumida por
+    outra thread; o que não cabe na fila é descartado e será calculado pelo
+    próprio rerun. Itens de uma versão que já mudou de novo são pulados.
+    """
+
+    def __init__(self, visoes: PokerViewCache, intervalo: float = 1.0, espera: float = 2.0,
+                 espera_maxima: float = 30.0, max_fila: int = 8, max_populares: int = 3):
+        self.visoes = visoes
+        self.intervalo = intervalo
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+        self.max_populares = max_populares
+
+        self.aquecimentos = 0
+        self.descartados = 0
+        self.obsoletos = 0
+
+        self._fila = queue.Queue(maxsize=max_fila)
+        self._parar = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Inicia as threads de monitoramento e de aquecimento."""
+        if self._threads:
+            return
+        self._threads = [
+            threading.Thread(target=self._monitorar, name='aquecedor-monitor', daemon=True),
+            threading.Thread(target=self._aquecer, name='aquecedor-cache', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def parar(self, timeout: float = 5.0):
+        self._parar.set()
+        try:
+            self._fila.put_nowait(_PARAR)
+        except queue.Full:
+            pass
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def enfileirar(self, versao: int):
+        """Põe na fila a visão padrão e os filtros populares da versão."""
+        # Itens de versões anteriores saem antes, para não ocuparem o lugar dos novos
+        pendentes = []
+        while True:
+            try:
+                item = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if item is _PARAR or item[0] == versao:
+                pendentes.append(item)
+            else:
+                self.obsoletos += 1
+        for item in pendentes:
+            self._fila.put_nowait(item)
+
+        for filtro in [FILTRO_PADRAO] + self.visoes.populares(self.max_populares):
+            try:
+                self._fila.put_nowait((versao, filtro))
+            except queue.Full:
+                self.descartados += 1
+
+    def _monitorar(self):
+        aquecida = None
+        ultima = None
+        mudou_em = inicio_rajada = time.monotonic()
+
+        while not self._parar.is_set():
+            try:
+                versao = self.visoes.db.get_versao_dados()
+            except Exception as e:
+                print(f"Erro ao verificar versão dos dados: {e}")
+                self._parar.wait(self.intervalo)
+                continue
+
+            agora = time.monotonic()
+            if versao != ultima:
+                if ultima == aquecida:
+                    inicio_rajada = agora
+                ultima, mudou_em = versao, agora
+
+            # Na primeira verificação aquece direto; depois só quando as escritas param
+            if versao != aquecida and (aquecida is None or agora - mudou_em >= self.espera
+                                       or agora - inicio_rajada >= self.espera_maxima):
+                self.enfileirar(versao)
+                aquecida = versao
+
+            self._parar.wait(self.intervalo)
+
+    def _aquecer(self):
+        _local.aquecendo = True
+        while True:
+            item = self._fila.get()
+            if item is _PARAR:
+                break
+            versao, filtro = item
+
+            inicio = time.perf_counter()
+            try:
+                if self.visoes.db.get_versao_dados() != versao:
+                    self.obsoletos += 1
+                    continue
+                self.visoes.obter(filtro, contar=False).aquecer()
+                self.aquecimentos += 1
+            except Exception as e:
+                print(f"Erro ao aquecer visão {filtro}: {e}")
+            registry.observar('aquecedor', 'aquecer', time.perf_counter() - inicio)
@@ -1,7 +1,12 @@
-from typing import List, Dict
+import heapq
+from typing import List, Dict, Optional, Iterable
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from tournament_set import TournamentSet, as_dataframe
+from metrics import instrumentar
 
+@instrumentar('calculations')
 class PokerCalculations:
     
     @staticmethod
@@ -69,7 +74,7 @@ class PokerCalculations:
         if not torneios:
             return []
         
-        df = pd.DataFrame(torneios)
+        df = as_dataframe(torneios)
         df['data_torneio'] = pd.to_datetime(df['data_torneio'])
         
         # Definir o agrupamento baseado no período
@@ -108,33 +113,180 @@ class PokerCalculations:
         return grouped.to_dict('records')
     
     @staticmethod
-    def get_best_and_worst_sessions(torneios: List[Dict], limit: int = 5) -> Dict:
-        """Retorna as melhores e piores sessões."""
-        if not torneios:
-            return {"melhores": [], "piores": []}
+    def get_rolling_metrics(torneios: List[Dict], janela: int = 100, por: str = 'torneios',
+                            agrupar_por: Optional[str] = None) -> List[Dict]:
+        """Calcula ROI, ITM e ABI em janela móvel (por quantidade de torneios ou por dias).
+
+        Usa diferença de somas acumuladas, então cada ponto custa O(1) e a série toda O(n).
+        """
+        if not torneios or janela <= 0:
+            return []
         
-        # Agrupar por data para considerar sessões diárias
-        df = pd.DataFrame(torneios)
-        df['data_torneio'] = pd.to_datetime(df['data_torneio']).dt.date
+        # Trabalha direto nos arrays tipados, ordenados por data (id desempata)
+        conjunto = torneios if isinstance(torneios, TournamentSet) else TournamentSet.from_rows(torneios)
+        conjunto = conjunto.sort_by_date()
         
-        sessoes = df.groupby('data_torneio').agg({
-            'buy_in': 'sum',
-            'ganho_total': 'sum',
-            'lucro_liquido': 'sum'
-        }).reset_index()
+        if agrupar_por == 'conta':
+            chave_grupo, codigos, nomes = 'nome_conta', conjunto.codigos_conta, conjunto.nomes_contas
+        elif agrupar_por == 'tipo':
+            chave_grupo, codigos, nomes = 'nome_tipo', conjunto.codigos_tipo, conjunto.nomes_tipos
+        else:
+            chave_grupo, codigos, nomes = None, None, None
         
-        sessoes['roi'] = ((sessoes['ganho_total'] - sessoes['buy_in']) / sessoes['buy_in']) * 100
-        sessoes['roi'] = sessoes['roi'].fillna(0)
+        if chave_grupo:
+            grupos = [(nomes[codigo], conjunto.filter(codigos == codigo)) for codigo in np.unique(codigos)]
+        else:
+            grupos = [(None, conjunto)]
         
-        # Ordenar para pegar melhores e piores
-        melhores = sessoes.nlargest(limit, 'lucro_liquido').to_dict('records')
-        piores = sessoes.nsmallest(limit, 'lucro_liquido').to_dict('records')
+        resultado = []
+        for grupo, conjunto_grupo in grupos:
+            dias = conjunto_grupo.dias
+            buy_ins = conjunto_grupo.buy_in
+            ganhos = conjunto_grupo.ganho_total
+            
+            n = len(conjunto_grupo)
+            fim = np.arange(1, n + 1)
+            
+            # Índice do primeiro torneio de cada janela
+            if por == 'dias':
+                inicio = np.searchsorted(dias, dias - (janela - 1), side='left')
+            else:
+                inicio = np.maximum(fim - janela, 0)
+            
+            # Somas acumuladas com zero à esquerda: soma(i..j) = acum[j] - acum[i]
+            acum_buy_in = np.concatenate(([0.0], np.cumsum(buy_ins)))
+            acum_ganhos = np.concatenate(([0.0], np.cumsum(ganhos)))
+            acum_itm = np.concatenate(([0], np.cumsum(ganhos > 0)))
+            
+            qtd = fim - inicio
+            investido = acum_buy_in[fim] - acum_buy_in[inicio]
+            ganho = acum_ganhos[fim] - acum_ganhos[inicio]
+            itm = acum_itm[fim] - acum_itm[inicio]
+            lucro = ganho - investido
+            
+            roi = np.divide(lucro * 100, investido, out=np.zeros(n), where=investido > 0)
+            itm_percentage = itm / qtd * 100
+            abi = investido / qtd
+            completa = qtd >= janela if por != 'dias' else dias - dias[0] >= janela - 1
+            datas = conjunto_grupo.datas.astype(str).tolist()
+            
+            for i in range(n):
+                ponto = {
+                    'data': datas[i],
+                    'torneios_janela': int(qtd[i]),
+                    'total_investido': float(investido[i]),
+                    'total_ganhos': float(ganho[i]),
+                    'lucro_liquido': float(lucro[i]),
+                    'roi': float(roi[i]),
+                    'itm_percentage': float(itm_percentage[i]),
+                    'abi': float(abi[i]),
+                    'janela_completa': bool(completa[i])
+                }
+                if chave_grupo:
+                    ponto['grupo'] = grupo
+                resultado.append(ponto)
+        
+        return resultado
+    
+    @staticmethod
+    def select_extreme_sessions(sessoes: Iterable[Dict], limit: int = 5) -> Dict:
+        """Seleciona as melhores e piores sessões por lucro em uma única passada com heaps."""
+        melhores = []  # min-heap: raiz é a pior das melhores
+        piores = []    # max-heap (chaves negadas): raiz é a melhor das piores
+        
+        if limit <= 0:
+            return {"melhores": [], "piores": []}
+        
+        for ordem, sessao in enumerate(sessoes):
+            lucro = sessao['lucro_liquido']
+            # Em caso de empate, a sessão mais antiga tem prioridade
+            item_melhor = (lucro, -ordem, sessao)
+            item_pior = (-lucro, -ordem, sessao)
+            if len(melhores) < limit:
+                heapq.heappush(melhores, item_melhor)
+            elif item_melhor[:2] > melhores[0][:2]:
+                heapq.heapreplace(melhores, item_melhor)
+            if len(piores) < limit:
+                heapq.heappush(piores, item_pior)
+            elif (lucro, ordem) < (-piores[0][0], -piores[0][1]):
+                heapq.heapreplace(piores, item_pior)
         
         return {
-            "melhores": melhores,
-            "piores": piores
+            "melhores": [item[2] for item in sorted(melhores, key=lambda i: i[:2], reverse=True)],
+            "piores": [item[2] for item in sorted(piores, key=lambda i: i[:2], reverse=True)]
         }
     
+    @staticmethod
+    def get_best_and_worst_sessions(torneios: List[Dict], limit: int = 5,
+                                    agrupar_por: Optional[str] = None,
+                                    intervalo_minutos: Optional[int] = None) -> Dict:
+        """Retorna as melhores e piores sessões.
+        
+        Sessões são diárias por padrão; com intervalo_minutos, uma nova sessão começa
+        quando o intervalo entre inícios consecutivos excede o limite.
+        """
+        if not torneios:
+            return {"melhores": [], "piores": []}
+        
+        if agrupar_por == 'conta':
+            chave_grupo = 'nome_conta'
+        elif agrupar_por == 'tipo':
+            chave_grupo = 'nome_tipo'
+        else:
+            chave_grupo = None
+        
+        def inicio(torneio):
+            return datetime.strptime(
+                f"{torneio['data_torneio'][:10]} {torneio.get('hora_inicio') or '00:00'}", "%Y-%m-%d %H:%M"
+            )
+        
+        # Agrupar torneios em sessões (por dia ou por intervalo entre inícios)
+        sessoes = {}
+        if intervalo_minutos is None:
+            for torneio in torneios:
+                grupo = torneio[chave_grupo] if chave_grupo else None
+                sessoes.setdefault((torneio['data_torneio'][:10], grupo), []).append(torneio)
+            ordem_sessoes = sorted(sessoes)
+        else:
+            limite = timedelta(minutes=intervalo_minutos)
+            ultimo_por_grupo = {}
+            ordenados = sorted(torneios, key=lambda x: (inicio(x), x.get('id_torneio', 0)))
+            for torneio in ordenados:
+                grupo = torneio[chave_grupo] if chave_grupo else None
+                momento = inicio(torneio)
+                atual = ultimo_por_grupo.get(grupo)
+                if atual is None or momento - atual[1] > limite:
+                    atual = [(momento, grupo), momento]
+                    ultimo_por_grupo[grupo] = atual
+                atual[1] = momento
+                sessoes.setdefault(atual[0], []).append(torneio)
+            ordem_sessoes = sorted(sessoes, key=lambda chave: (chave[0], str(chave[1])))
+        
+        def resumir(chave):
+            torneios_sessao = sessoes[chave]
+            buy_in = sum(t['buy_in'] for t in torneios_sessao)
+            ganho_total = sum(t['ganho_total'] for t in torneios_sessao)
+            lucro = sum(t['lucro_liquido'] for t in torneios_sessao)
+            primeiro = torneios_sessao[0]
+            sessao = {
+                'data_torneio': datetime.strptime(primeiro['data_torneio'][:10], "%Y-%m-%d").date(),
+                'buy_in': buy_in,
+                'ganho_total': ganho_total,
+                'lucro_liquido': lucro,
+                'roi': ((ganho_total - buy_in) / buy_in) * 100 if buy_in else 0,
+                'total_torneios': len(torneios_sessao)
+            }
+            if intervalo_minutos is not None:
+                sessao['inicio'] = inicio(primeiro).strftime("%Y-%m-%d %H:%M:%S")
+                sessao['fim'] = inicio(torneios_sessao[-1]).strftime("%Y-%m-%d %H:%M:%S")
+            if chave_grupo:
+                sessao[chave_grupo] = chave[1]
+            return sessao
+        
+        return PokerCalculations.select_extreme_sessions(
+            (resumir(chave) for chave in ordem_sessoes), limit
+        )
+    
     @staticmethod
     def calculate_variance_and_downswing(torneios: List[Dict]) -> Dict:
         """Calcula variância e maior downswing."""
@@ -0,0 +1,126 @@
+import json
+import queue
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+from metrics import registry
+
+# Evento que manda o assinante atrasado recarregar tudo
+EVENTO_TUDO = {"marcador": None, "alteracoes": None}
+
+
+def formatar_evento(evento: dict) -> str:
+    """Evento no formato text/event-stream, com o marcador como id (volta no Last-Event-ID)."""
+    linhas = []
+    if evento["marcador"] is not None:
+        linhas.append(f"id: {evento['marcador']}")
+    linhas.append("event: alteracao")
+    linhas.append(f"data: {json.dumps(evento, ensure_ascii=False, separators=(',', ':'))}")
+    return "\n".join(linhas) + "\n\n"
+
+
+class PokerChangeFeed:
+    """Distribui aos assinantes o que mudou no banco (conta e intervalo de datas) a cada escrita.
+
+    Uma única thread acompanha o contador de alterações (versao_dados, que
+    também muda com escritas de outros processos) e, quando ele muda, lê o log
+    de alterações desde o último marcador e entrega o mesmo evento a todos os
+    assinantes. A thread só existe enquanto houver assinantes: sem dashboards
+    abertos, o banco não é consultado.
+    """
+
+    def __init__(self, obter_db: Callable, intervalo: float = 0.5, keepalive: float = 15.0, max_fila: int = 32):
+        self.obter_db = obter_db
+        self.intervalo = intervalo
+        self.keepalive = keepalive
+        self.max_fila = max_fila
+
+        self.eventos = 0
+        self.atrasados = 0
+
+        self._assinantes = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def assinar(self) -> queue.Queue:
+        """Fila que passa a receber os eventos; inicia o monitoramento no primeiro assinante."""
+        fila = queue.Queue(maxsize=self.max_fila)
+        with self._lock:
+            self._assinantes.add(fila)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._monitorar, name='feed-alteracoes', daemon=True)
+                self._thread.start()
+        return fila
+
+    def cancelar(self, fila: queue.Queue):
+        with self._lock:
+            self._assinantes.discard(fila)
+
+    def assinantes(self) -> int:
+        with self._lock:
+            return len(self._assinantes)
+
+    def publicar(self, evento: dict):
+        """Entrega o evento a todos os assinantes; quem está com a fila cheia recebe um 'recarregue tudo'."""
+        with self._lock:
+            filas = list(self._assinantes)
+        self.eventos += 1
+        for fila in filas:
+            try:
+                fila.put_nowait(evento)
+            except queue.Full:
+                self.atrasados += 1
+                while True:
+                    try:
+                        fila.get_nowait()
+                    except queue.Empty:
+                        break
+                fila.put_nowait(EVENTO_TUDO)
+
+    def transmitir(self, desde: Optional[str] = None) -> Iterator[str]:
+        """Corpo da resposta SSE: as alterações desde `desde` (reconexão) e depois as novas, com keepalive."""
+        fila = self.assinar()
+        try:
+            yield "retry: 3000\n\n"
+            if desde:
+                evento = self.obter_db().get_alteracoes(desde)
+                if evento["alteracoes"] != []:
+                    yield formatar_evento(evento)
+            while True:
+                try:
+                    evento = fila.get(timeout=self.keepalive)
+                except queue.Empty:
+                    # Comentário SSE: mantém a conexão viva e detecta o cliente que saiu
+                    yield ": keepalive\n\n"
+                    continue
+                yield formatar_evento(evento)
+        finally:
+            self.cancelar(fila)
+
+    def _monitorar(self):
+        db = self.obter_db()
+        marcador = None
+        versao = None
+
+        while True:
+            with self._lock:
+                if not self._assinantes:
+                    self._thread = None
+                    return
+
+            try:
+                atual = db.get_versao_dados()
+                if marcador is None:
+                    marcador, versao = db.get_alteracoes()["marcador"], atual
+                elif atual != versao:
+                    inicio = time.perf_counter()
+                    evento = db.get_alteracoes(marcador)
+                    registry.observar('feed', 'get_alteracoes', time.perf_counter() - inicio)
+                    marcador, versao = evento["marcador"], atual
+                    if evento["alteracoes"] != []:
+                        self.publicar(evento)
+            except Exception as e:
+                print(f"Erro ao verificar alterações: {e}")
+
+            time.sleep(self.intervalo)
@@ -0,0 +1,367 @@
+import json
+import os
+import threading
+from functools import reduce
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from database import DIMENSOES_CUBO, totais_cubo
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # Backend opcional: sem pyarrow, as consultas continuam no SQLite
+    pa = pc = pq = None
+
+COLUNAS_SNAPSHOT = "id_torneio, data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total"
+
+# Máximo de deltas antes de regravar o snapshot inteiro
+MAX_DELTAS = 32
+
+TAMANHO_LOTE = 50000
+
+AGREGADOS = [('id_torneio', 'count'), ('buy_in', 'sum'), ('ganho_total', 'sum'), ('lucro', 'sum'), ('itm', 'sum')]
+
+
+def _esquema():
+    return pa.schema([
+        ('id_torneio', pa.int64()),
+        ('data_torneio', pa.date32()),
+        ('id_conta', pa.int32()),
+        ('id_tipo_torneio', pa.int32()),
+        ('buy_in', pa.float64()),
+        ('ganho_total', pa.float64())
+    ])
+
+
+def _dias(data) -> int:
+    """Data (str ou date) em dias desde 1970-01-01, como o date32 do Arrow."""
+    return int(np.datetime64(str(data)[:10], 'D').astype(np.int64))
+
+
+class PokerColumnarStore:
+    """Snapshot colunar (Parquet) dos torneios para as consultas analíticas.
+
+    O snapshot é torneios.parquet mais deltas só com inserções
+    (delta_<versão>.parquet), gravados quando o contador de alterações do
+    banco muda. Se a mudança não foi só de inserções (update, delete,
+    arquivamento), o snapshot é refeito. As consultas filtram e agregam com
+    pyarrow.compute na tabela em memória e retornam os mesmos formatos das
+    consultas SQL do PokerDatabase. Sem pyarrow, disponivel é False.
+    """
+
+    def __init__(self, db, diretorio: Optional[str] = None):
+        self.db = db
+        self.diretorio = diretorio or os.path.join(os.path.dirname(os.path.abspath(db.db_path)), 'colunar')
+        self.disponivel = pa is not None
+        self.reconstrucoes = 0
+        self.deltas_aplicados = 0
+
+        self._tabela = None
+        self._estado = None  # versao, max_id e deltas do snapshot em memória
+        self._lock = threading.Lock()
+
+    # Sincronização com o banco
+
+    def atualizar(self) -> bool:
+        """Sincroniza o snapshot com o banco. Retorna True se algo mudou."""
+        with self._lock:
+            if self._tabela is None:
+                self._carregar()
+
+            conn = self.db.get_connection()
+            try:
+                # ATTACH dos arquivos anuais não pode acontecer dentro da transação de leitura
+                fonte = self.db._fonte_torneios(conn)
+                conn.execute("BEGIN")
+                versao = conn.execute("SELECT versao FROM versao_dados WHERE id = 1").fetchone()[0]
+                if self._estado is not None and self._estado['versao'] == versao:
+                    return False
+                if self._estado is None or not self._anexar_delta(conn, versao):
+                    self._reconstruir(conn, fonte, versao)
+                return True
+            finally:
+                conn.close()
+
+    def _carregar(self):
+        """Lê o snapshot do disco, se existir e estiver completo."""
+        try:
+            with open(os.path.join(self.diretorio, 'estado.json')) as f:
+                estado = json.load(f)
+            partes = [pq.read_table(os.path.join(self.diretorio, nome), schema=_esquema())
+                      for nome in ['torneios.parquet'] + estado['deltas']]
+        except (OSError, ValueError, KeyError, pa.ArrowInvalid):
+            return  # Sem snapshot utilizável: a próxima atualização reconstrói
+
+        self._tabela = self._derivar(pa.concat_tables(partes))
+        self._estado = estado
+
+    def _anexar_delta(self, conn, versao: int) -> bool:
+        """Grava as linhas novas como delta. Retorna False se houve algo além de inserções."""
+        max_id = self._estado['max_id']
+        novos = conn.execute("SELECT COUNT(*) FROM main.torneios WHERE id_torneio > ?", (max_id,)).fetchone()[0]
+        # Cada inserção soma 1 ao contador; qualquer diferença indica update ou delete
+        if novos != versao - self._estado['versao']:
+            return False
+
+        cursor = conn.execute(
+            f"SELECT {COLUNAS_SNAPSHOT} FROM main.torneios WHERE id_torneio > ? ORDER BY id_torneio", (max_id,)
+        )
+        delta = self._ler(cursor)
+        deltas = self._estado['deltas'] + [f"delta_{versao}.parquet"]
+        self._gravar_parquet(delta, deltas[-1])
+
+        self._tabela = pa.concat_tables([self._tabela, self._derivar(delta)])
+        estado = {
+            'versao': versao,
+            'max_id': max(max_id, pc.max(delta['id_torneio']).as_py() or 0),
+            'deltas': deltas
+        }
+        if len(deltas) > MAX_DELTAS:
+            self._gravar_parquet(self._tabela.select(_esquema().names), 'torneios.parquet')
+            estado['deltas'] = []
+        self._salvar_estado(estado)
+        self._remover_deltas_antigos(estado['deltas'])
+        self.deltas_aplicados += 1
+        return True
+
+    def _reconstruir(self, conn, fonte: str, versao: int):
+        """Refaz o snapshot inteiro (tabela e arquivos anuais) a partir do banco."""
+        tabela = self._ler(conn.execute(f"SELECT {COLUNAS_SNAPSHOT} FROM {fonte} t"))
+        max_id = conn.execute("SELECT COALESCE(MAX(id_torneio), 0) FROM main.torneios").fetchone()[0]
+
+        self._gravar_parquet(tabela, 'torneios.parquet')
+        self._tabela = self._derivar(tabela)
+        self._salvar_estado({'versao': versao, 'max_id': max_id, 'deltas': []})
+        self._remover_deltas_antigos([])
+        self.reconstrucoes += 1
+
+    def _ler(self, cursor) -> 'pa.Table':
+        """Converte o resultado da consulta em tabela Arrow, em lotes."""
+        lotes = []
+        while True:
+            rows = cursor.fetchmany(TAMANHO_LOTE)
+            if not rows:
+                break
+            ids, datas, contas, tipos, buy_ins, ganhos = zip(*rows)
+            lotes.append(pa.record_batch([
+                pa.array(ids, pa.int64()),
+                pa.array(np.array([data[:10] for data in datas], dtype='datetime64[D]'), pa.date32()),
+                pa.array(contas, pa.int32()),
+                pa.array(tipos, pa.int32()),
+                pa.array(buy_ins, pa.float64()),
+                pa.array(ganhos, pa.float64())
+            ], schema=_esquema()))
+        return pa.Table.from_batches(lotes, schema=_esquema())
+
+    @staticmethod
+    def _derivar(tabela: 'pa.Table') -> 'pa.Table':
+        """Acrescenta as colunas usadas nos filtros e agrupamentos (só em memória)."""
+        dias = tabela['data_torneio'].cast(pa.int32()).to_numpy()
+        datas = dias.astype('datetime64[D]')
+        ganho = tabela['ganho_total'].to_numpy()
+        return (tabela
+                .append_column('dia', pa.array(dias, pa.int32()))
+                .append_column('semana', pa.array(dias - (dias + 3) % 7, pa.int32()))  # segunda-feira
+                .append_column('mes', pa.array(datas.astype('datetime64[M]').astype(np.int32)))
+                .append_column('ano', pa.array(datas.astype('datetime64[Y]').astype(np.int32)))
+                .append_column('lucro', pa.array(ganho - tabela['buy_in'].to_numpy()))
+                .append_column('itm', pa.array((ganho > 0).astype(np.int64))))
+
+    def _gravar_parquet(self, tabela: 'pa.Table', nome: str):
+        os.makedirs(self.diretorio, exist_ok=True)
+        temporario = os.path.join(self.diretorio, f".{nome}.{os.getpid()}")
+        pq.write_table(tabela, temporario)
+        os.replace(temporario, os.path.join(self.diretorio, nome))
+
+    def _salvar_estado(self, estado: Dict):
+        temporario = os.path.join(self.diretorio, f".estado.json.{os.getpid()}")
+        with open(temporario, 'w') as f:
+            json.dump(estado, f)
+        os.replace(temporario, os.path.join(self.diretorio, 'estado.json'))
+        self._estado = estado
+
+    def _remover_deltas_antigos(self, manter: List[str]):
+        for nome in os.listdir(self.diretorio):
+            if nome.startswith('delta_') and nome not in manter:
+                try:
+                    os.remove(os.path.join(self.diretorio, nome))
+                except OSError:
+                    pass  # Outro processo pode ter removido antes
+
+    # Consultas
+
+    def _filtrar(self, id_conta: Optional[int] = None, id_tipo_torneio: Optional[int] = None,
+                 data_inicio: Optional[str] = None, data_fim: Optional[str] = None) -> 'pa.Table':
+        self.atualizar()
+        tabela = self._tabela
+        filtros = []
+        if id_conta:
+            filtros.append(pc.equal(tabela['id_conta'], id_conta))
+        if id_tipo_torneio:
+            filtros.append(pc.equal(tabela['id_tipo_torneio'], id_tipo_torneio))
+        if data_inicio:
+            filtros.append(pc.greater_equal(tabela['dia'], _dias(data_inicio)))
+        if data_fim:
+            filtros.append(pc.less_equal(tabela['dia'], _dias(data_fim)))
+        return tabela.filter(reduce(pc.and_, filtros)) if filtros else tabela
+
+    def _nomes(self) -> Dict[str, Dict[int, str]]:
+        return {
+            'conta': {conta['id']: conta['nome'] for conta in self.db.get_contas()},
+            'tipo': {tipo['id']: tipo['nome'] for tipo in self.db.get_tipos_torneio()}
+        }
+
+    @staticmethod
+    def _conhecidos(tabela: 'pa.Table', nomes: Dict[str, Dict[int, str]]) -> 'pa.Table':
+        """Só torneios de contas e tipos cadastrados (o JOIN das consultas SQL)."""
+        return tabela.filter(pc.and_(
+            pc.is_in(tabela['id_conta'], value_set=pa.array(list(nomes['conta']), pa.int32())),
+            pc.is_in(tabela['id_tipo_torneio'], value_set=pa.array(list(nomes['tipo']), pa.int32()))
+        ))
+
+    @staticmethod
+    def _agrupar(tabela: 'pa.Table', chaves: List[str]) -> List[Dict]:
+        """Totais por grupo: chaves, n, buy_in, ganho_total, lucro e itm."""
+        agregado = tabela.group_by(chaves).aggregate(AGREGADOS).to_pydict()
+        grupos = []
+        for i in range(len(agregado['id_torneio_count'])):
+            grupo = {chave: agregado[chave][i] for chave in chaves}
+            grupo.update(
+                n=agregado['id_torneio_count'][i],
+                buy_in=agregado['buy_in_sum'][i],
+                ganho_total=agregado['ganho_total_sum'][i],
+                lucro=agregado['lucro_sum'][i],
+                itm=agregado['itm_sum'][i]
+            )
+            grupos.append(grupo)
+        return grupos
+
+    def get_estatisticas_gerais(self, id_conta: Optional[int] = None,
+                               data_inicio: Optional[str] = None,
+                               data_fim: Optional[str] = None) -> Dict:
+        """Mesmo resultado de PokerDatabase.get_estatisticas_gerais."""
+        tabela = self._filtrar(id_conta, None, data_inicio, data_fim)
+        total = tabela.num_rows
+        if total == 0:
+            return {"total_torneios": 0, "total_investido": 0, "total_ganhos": 0, "lucro_liquido": 0,
+                    "roi_geral": 0, "abi": 0, "itm_percentage": 0}
+
+        investido = pc.sum(tabela['buy_in']).as_py()
+        lucro = pc.sum(tabela['lucro']).as_py()
+        return {
+            "total_torneios": total,
+            "total_investido": investido,
+            "total_ganhos": pc.sum(tabela['ganho_total']).as_py(),
+            "lucro_liquido": lucro,
+            "roi_geral": (lucro / investido) * 100 if investido > 0 else 0,
+            "abi": investido / total,
+            "itm_percentage": (pc.sum(tabela['itm']).as_py() / total) * 100
+        }
+
+    def get_estatisticas_por_tipo(self, id_conta: Optional[int] = None,
+                                 data_inicio: Optional[str] = None,
+                                 data_fim: Optional[str] = None) -> List[Dict]:
+        """Mesmo resultado de PokerDatabase.get_estatisticas_por_tipo."""
+        nomes = self._nomes()
+        tabela = self._conhecidos(self._filtrar(id_conta, None, data_inicio, data_fim), nomes)
+
+        resultado = [{
+            "nome_tipo": nomes['tipo'][grupo['id_tipo_torneio']],
+            "total_torneios": grupo['n'],
+            "total_investido": grupo['buy_in'],
+            "total_ganhos": grupo['ganho_total'],
+            "lucro_liquido": grupo['lucro'],
+            "roi": (grupo['lucro'] / grupo['buy_in']) * 100 if grupo['buy_in'] > 0 else 0
+        } for grupo in self._agrupar(tabela, ['id_tipo_torneio'])]
+        return sorted(resultado, key=lambda tipo: tipo["lucro_liquido"], reverse=True)
+
+    def get_resumo_mensal(self, id_conta: Optional[int] = None,
+                          id_tipo_torneio: Optional[int] = None,
+                          data_inicio: Optional[str] = None,
+                          data_fim: Optional[str] = None) -> List[Dict]:
+        """Mesmo resultado de PokerDatabase.get_resumo_mensal."""
+        tabela = self._filtrar(id_conta, id_tipo_torneio, data_inicio, data_fim)
+
+        resultado = []
+        for grupo in sorted(self._agrupar(tabela, ['mes']), key=lambda g: g['mes']):
+            lucro_liquido = grupo['ganho_total'] - grupo['buy_in']
+            resultado.append({
+                "mes": str(np.datetime64(grupo['mes'], 'M')),
+                "total_torneios": grupo['n'],
+                "total_investido": grupo['buy_in'],
+                "total_ganhos": grupo['ganho_total'],
+                "lucro_liquido": lucro_liquido,
+                "roi": (lucro_liquido / grupo['buy_in']) * 100 if grupo['buy_in'] > 0 else 0,
+                "itm_percentage": (grupo['itm'] / grupo['n']) * 100
+            })
+        return resultado
+
+    def get_performance_por_periodo(self, periodo: str = 'monthly',
+                                  id_conta: Optional[int] = None,
+                                  id_tipo_torneio: Optional[int] = None,
+                                  data_inicio: Optional[str] = None,
+                                  data_fim: Optional[str] = None) -> List[Dict]:
+        """Mesmo resultado de PokerDatabase.get_performance_por_periodo."""
+        chave, frequencia, unidade = {
+            'weekly': ('semana', 'W', 'D'),
+            'yearly': ('ano', 'Y', 'Y'),
+        }.get(periodo, ('mes', 'M', 'M'))
+
+        tabela = self._conhecidos(self._filtrar(id_conta, id_tipo_torneio, data_inicio, data_fim), self._nomes())
+        grupos = sorted(self._agrupar(tabela, [chave]), key=lambda g: g[chave])
+        if not grupos:
+            return []
+
+        # Os Period do pandas são montados a partir do primeiro dia de cada grupo, como no cálculo original
+        inicios = np.array([g[chave] for g in grupos]).astype(f'datetime64[{unidade}]').astype('datetime64[D]')
+        periodos = pd.Series(pd.to_datetime(inicios)).dt.to_period(frequencia)
+
+        resultado = []
+        for grupo, periodo in zip(grupos, periodos):
+            investido, ganhos = grupo['buy_in'], grupo['ganho_total']
+            roi = ((ganhos - investido) / investido) * 100 if investido else (np.inf if ganhos else 0)
+            resultado.append({
+                'periodo': periodo,
+                'total_investido': investido,
+                'total_torneios': grupo['n'],
+                'abi': investido / grupo['n'],
+                'total_ganhos': ganhos,
+                'lucro_liquido': grupo['lucro'],
+                'roi': roi,
+                'itm_count': grupo['itm'],
+                'itm_percentage': (grupo['itm'] / grupo['n']) * 100,
+                'periodo_str': str(periodo)
+            })
+        return resultado
+
+    def get_cubo(self, dimensoes: Sequence[str] = ('mes', 'conta', 'tipo'),
+                 id_conta: Optional[int] = None,
+                 id_tipo_torneio: Optional[int] = None,
+                 data_inicio: Optional[str] = None,
+                 data_fim: Optional[str] = None) -> List[Dict]:
+        """Mesmo resultado de PokerDatabase.get_cubo."""
+        dimensoes = [d for d in DIMENSOES_CUBO if d in dimensoes]
+        nomes = self._nomes()
+        tabela = self._conhecidos(self._filtrar(id_conta, id_tipo_torneio, data_inicio, data_fim), nomes)
+
+        colunas = {'ano': 'ano', 'mes': 'mes', 'conta': 'id_conta', 'tipo': 'id_tipo_torneio'}
+        formatos = {
+            'ano': lambda v: 1970 + v,
+            'mes': lambda v: str(np.datetime64(v, 'M')),
+            'conta': lambda v: nomes['conta'][v],
+            'tipo': lambda v: nomes['tipo'][v]
+        }
+
+        resultado = []
+        for grupo in self._agrupar(tabela, [colunas[d] for d in dimensoes]):
+            if not grupo['n']:
+                continue  # Sem dimensões e sem torneios, como no SQL
+            celula = {d: formatos[d](grupo[colunas[d]]) for d in dimensoes}
+            celula.update(totais_cubo(grupo['n'], grupo['buy_in'], grupo['ganho_total'], grupo['lucro'], grupo['itm']))
+            resultado.append(celula)
+        return sorted(resultado, key=lambda celula: tuple(celula[d] for d in dimensoes))
+
@@ -1,16 +1,149 @@
 import sqlite3
 import os
+import threading
+from concurrent.futures import Future
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from metrics import instrumentar
+from write_queue import SQLiteWriteQueue
+from read_replica import SQLiteReadReplica
 
+COLUNAS_TORNEIO = "id_torneio, data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total, hora_inicio"
+
+# Colunas copiadas entre bancos (arquivo anual, shards): as lidas pelo dashboard mais o id externo
+COLUNAS_COPIA = COLUNAS_TORNEIO + ", id_externo"
+
+# Chave natural de um torneio (horário ausente conta como um valor só)
+CHAVE_NATURAL = "data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total, COALESCE(hora_inicio, '')"
+
+# Inserção idempotente: o mesmo id externo atualiza o torneio (só se algo mudou) e um
+# torneio sem id externo já existente pela chave natural única (se ativa) é ignorado
+INSERIR_TORNEIO = '''
+    INSERT INTO torneios (data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total, hora_inicio, id_externo)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (id_externo) WHERE id_externo IS NOT NULL DO UPDATE SET
+        data_torneio = excluded.data_torneio,
+        id_conta = excluded.id_conta,
+        id_tipo_torneio = excluded.id_tipo_torneio,
+        buy_in = excluded.buy_in,
+        ganho_total = excluded.ganho_total,
+        hora_inicio = excluded.hora_inicio
+    WHERE data_torneio IS NOT excluded.data_torneio
+       OR id_conta IS NOT excluded.id_conta
+       OR id_tipo_torneio IS NOT excluded.id_tipo_torneio
+       OR buy_in IS NOT excluded.buy_in
+       OR ganho_total IS NOT excluded.ganho_total
+       OR hora_inicio IS NOT excluded.hora_inicio
+    ON CONFLICT DO NOTHING
+'''
+
+# Linhas agregadas por mês/conta/tipo: somam como torneios (n = quantidade, itm = premiados)
+RESUMO_ARQUIVO = '''
+    CREATE TABLE IF NOT EXISTS {tabela} (
+        ano INTEGER NOT NULL,
+        mes DATE NOT NULL,
+        id_conta INTEGER NOT NULL,
+        id_tipo_torneio INTEGER NOT NULL,
+        total_torneios INTEGER NOT NULL,
+        total_investido DECIMAL(10,2) NOT NULL,
+        total_ganhos DECIMAL(10,2) NOT NULL,
+        itm_count INTEGER NOT NULL,
+        PRIMARY KEY (ano, mes, id_conta, id_tipo_torneio)
+    )
+'''
+
+def garantir_id_externo(conn):
+    """Migração: coluna id_externo em bancos e arquivos anuais criados antes dela."""
+    colunas = [coluna[1] for coluna in conn.execute("PRAGMA table_info(torneios)")]
+    if 'id_externo' not in colunas:
+        conn.execute("ALTER TABLE torneios ADD COLUMN id_externo TEXT")
+
+
+def erro_arquivado(id_torneio: int, ano: int) -> ValueError:
+    """Erro de quem tenta alterar um torneio de ano arquivado."""
+    return ValueError(f"Torneio {id_torneio} arquivado (ano {ano}), somente leitura: desarquive o ano para alterá-lo")
+
+
+# Dimensões aceitas por get_cubo, na ordem das colunas de saída
+DIMENSOES_CUBO = ('ano', 'mes', 'conta', 'tipo')
+
+EXPRESSOES_CUBO = {
+    'ano': "CAST(strftime('%Y', t.data_torneio) AS INTEGER)",
+    'mes': "strftime('%Y-%m', t.data_torneio)",
+    'conta': "c.nome_conta",
+    'tipo': "tt.nome_tipo"
+}
+
+
+def totais_cubo(total_torneios: int, investido: float, ganhos: float, lucro: float, itm: int) -> Dict:
+    """Métricas de uma célula do cubo a partir das somas."""
+    return {
+        "total_torneios": total_torneios,
+        "total_investido": investido,
+        "total_ganhos": ganhos,
+        "lucro_liquido": lucro,
+        "roi": (lucro / investido) * 100 if investido > 0 else 0,
+        "itm_percentage": (itm / total_torneios) * 100 if total_torneios > 0 else 0
+    }
+
+
+@instrumentar('database')
 class PokerDatabase:
-    def __init__(self, db_path: str = "poker_dashboard.db"):
+    def __init__(self, db_path: str = "poker_dashboard.db", replica_memoria: bool = False,
+                 colunar: bool = False, snapshot_binario: bool = False, rastrear_sql: bool = False,
+                 chave_natural: bool = False):
         self.db_path = db_path
+        self.chave_natural = chave_natural
+        
+        # Tempo de cada comando por formato de consulta, com log das lentas (sql_trace)
+        self.rastrear_sql = rastrear_sql
+        self._fabrica_conexao = sqlite3.Connection
+        if rastrear_sql:
+            from sql_trace import ConexaoRastreada
+            self._fabrica_conexao = ConexaoRastreada
+        
+        self._escrita = None
+        self._escrita_lock = threading.Lock()
         self.init_database()
+        
+        # Leituras em uma cópia em memória, atualizada quando o arquivo muda
+        self.replica = SQLiteReadReplica(db_path, fabrica_conexao=self._fabrica_conexao) if replica_memoria else None
+        
+        # Estatísticas, períodos e cubo num snapshot Parquet (só se o pyarrow estiver instalado)
+        self.colunar = None
+        if colunar:
+            from columnar import PokerColumnarStore  # pyarrow só é importado quando pedido
+            store = PokerColumnarStore(self)
+            self.colunar = store if store.disponivel else None
+        
+        # Histórico completo num arquivo binário mapeado em memória, compartilhado entre processos
+        self.snapshot = None
+        if snapshot_binario:
+            from tournament_snapshot import TournamentSnapshot
+            self.snapshot = TournamentSnapshot(self)
     
     def get_connection(self):
         """Cria uma conexão com o banco de dados."""
-        return sqlite3.connect(self.db_path)
+        return sqlite3.connect(self.db_path, factory=self._fabrica_conexao)
+    
+    def _conexao_leitura(self) -> sqlite3.Connection:
+        """Conexão para consultas: a réplica em memória, se ativa, ou o arquivo."""
+        if self.replica is not None:
+            return self.replica.conectar()
+        return self.get_connection()
+    
+    def _fila_escrita(self) -> SQLiteWriteQueue:
+        """Fila da thread única de escrita, criada na primeira escrita."""
+        with self._escrita_lock:
+            if self._escrita is None:
+                self._escrita = SQLiteWriteQueue(self.db_path, ao_commit=self._apos_escrita,
+                                                 fabrica_conexao=self._fabrica_conexao)
+            return self._escrita
+    
+    def _apos_escrita(self):
+        # Garante que a próxima leitura veja a escrita, mesmo com o arquivo ocupado
+        if self.replica is not None:
+            self.replica.invalidar()
     
     def init_database(self):
         """Inicializa o banco de dados com as tabelas necessárias."""
@@ -48,12 +181,94 @@ class PokerDatabase:
             )
         ''')
         
+        # Migração: horário de início opcional (usado em sessões por intervalo)
+        colunas = [coluna[1] for coluna in cursor.execute("PRAGMA table_info(torneios)")]
+        if 'hora_inicio' not in colunas:
+            cursor.execute("ALTER TABLE torneios ADD COLUMN hora_inicio TEXT")
+        
+        # Id do torneio no site de origem (opcional): reimportações com ele são idempotentes
+        garantir_id_externo(cursor)
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_torneios_id_externo
+            ON torneios (id_externo) WHERE id_externo IS NOT NULL
+        ''')
+        self._indice_chave_natural(cursor)
+        
+        # Contador de alterações, incrementado por triggers em toda escrita de torneios
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS versao_dados (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                versao INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO versao_dados (id, versao) VALUES (1, 0)")
+        
+        # Log de alterações: última versão em que cada dia de cada conta mudou (uma linha por par)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alteracoes (
+                id_conta INTEGER NOT NULL,
+                dia DATE NOT NULL,
+                versao INTEGER NOT NULL,
+                PRIMARY KEY (id_conta, dia)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alteracoes_versao ON alteracoes (versao)")
+        
+        # O log é gravado no mesmo trigger do contador, já com a versão nova;
+        # bancos antigos têm os triggers sem o log e são recriados
+        linhas_alteradas = {"INSERT": ("NEW",), "UPDATE": ("OLD", "NEW"), "DELETE": ("OLD",)}
+        for operacao, linhas in linhas_alteradas.items():
+            nome = f"torneios_versao_{operacao.lower()}"
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (nome,))
+            atual = cursor.fetchone()
+            if atual and 'alteracoes' in atual[0]:
+                continue
+            cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+            registros = "".join(f'''
+                    INSERT INTO alteracoes (id_conta, dia, versao)
+                    SELECT {linha}.id_conta, substr({linha}.data_torneio, 1, 10), versao FROM versao_dados WHERE id = 1
+                    ON CONFLICT (id_conta, dia) DO UPDATE SET versao = excluded.versao;''' for linha in linhas)
+            cursor.execute(f'''
+                CREATE TRIGGER {nome}
+                AFTER {operacao} ON torneios
+                BEGIN
+                    UPDATE versao_dados SET versao = versao + 1 WHERE id = 1;{registros}
+                END
+            ''')
+        
+        # Arquivos anuais: anos fechados movidos para arquivos próprios, com resumo mensal pré-calculado
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS arquivos_anuais (
+                ano INTEGER PRIMARY KEY,
+                caminho TEXT NOT NULL,
+                data_min DATE,
+                data_max DATE,
+                total_torneios INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute(RESUMO_ARQUIVO.format(tabela='resumo_arquivado'))
+        
         conn.commit()
         conn.close()
         
         # Inserir dados iniciais
         self.insert_initial_data()
     
+    def _indice_chave_natural(self, cursor: sqlite3.Cursor):
+        """Índices da chave natural: um comum, para achar duplicados, e com chave_natural=True
+        um único entre os torneios sem id externo (com id externo, é ele que identifica o torneio)."""
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_torneios_chave_natural ON torneios ({CHAVE_NATURAL})")
+        if not self.chave_natural:
+            cursor.execute("DROP INDEX IF EXISTS idx_torneios_chave_natural_unica")
+            return
+        try:
+            cursor.execute(f'''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_torneios_chave_natural_unica
+                ON torneios ({CHAVE_NATURAL}) WHERE id_externo IS NULL
+            ''')
+        except sqlite3.IntegrityError:
+            print("Há torneios duplicados: rode mesclar_torneios_duplicados() para ativar a chave natural única")
+    
     def insert_initial_data(self):
         """Insere dados iniciais de contas e tipos de torneio."""
         conn = self.get_connection()
@@ -87,9 +302,62 @@ class PokerDatabase:
         conn.commit()
         conn.close()
     
+    def get_versao_dados(self) -> int:
+        """Retorna o contador de alterações dos torneios (muda a cada escrita)."""
+        conn = self._conexao_leitura()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT versao FROM versao_dados WHERE id = 1")
+        row = cursor.fetchone()
+        
+        conn.close()
+        
+        return row[0] if row else 0
+    
+    def get_alteracoes(self, desde: Optional[str] = None) -> Dict:
+        """Contas e intervalo de datas alterados depois do marcador `desde`.
+        
+        Retorna {"marcador", "alteracoes"}: o marcador é passado na próxima
+        chamada; cada alteração é {"id_conta", "data_inicio", "data_fim"}.
+        Sem marcador, a lista vem vazia; com um marcador que não vale para
+        este banco, vem None (trate como se tudo tivesse mudado).
+        """
+        # A versão é lida antes do log: o que for gravado entre as duas leituras fica para a próxima chamada
+        versao = self.get_versao_dados()
+        if desde is None:
+            return {"marcador": str(versao), "alteracoes": []}
+        
+        try:
+            anterior = int(desde)
+        except ValueError:
+            anterior = None
+        if anterior is None or anterior > versao:
+            return {"marcador": str(versao), "alteracoes": None}
+        if anterior == versao:
+            return {"marcador": str(versao), "alteracoes": []}
+        
+        conn = self._conexao_leitura()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id_conta, MIN(dia), MAX(dia)
+            FROM alteracoes
+            WHERE versao > ? AND versao <= ?
+            GROUP BY id_conta
+            ORDER BY id_conta
+        ''', (anterior, versao))
+        rows = cursor.fetchall()
+        
+        conn.close()
+        
+        return {
+            "marcador": str(versao),
+            "alteracoes": [{"id_conta": row[0], "data_inicio": row[1], "data_fim": row[2]} for row in rows]
+        }
+    
     def get_contas(self) -> List[Dict]:
         """Retorna todas as contas."""
-        conn = self.get_connection()
+        conn = self._conexao_leitura()
         cursor = conn.cursor()
         
         cursor.execute("SELECT id_conta, nome_conta, email FROM contas ORDER BY nome_conta")
@@ -101,7 +369,7 @@ class PokerDatabase:
     
     def get_tipos_torneio(self) -> List[Dict]:
         """Retorna todos os tipos de torneio."""
-        conn = self.get_connection()
+        conn = self._conexao_leitura()
         cursor = conn.cursor()
         
         cursor.execute("SELECT id_tipo_torneio, nome_tipo FROM tipos_torneio ORDER BY nome_tipo")
@@ -112,41 +380,150 @@ class PokerDatabase:
         return [{"id": row[0], "nome": row[1]} for row in rows]
     
     def insert_torneio(self, data_torneio: str, id_conta: int, id_tipo_torneio: int, 
-                      buy_in: float, ganho_total: float) -> bool:
-        """Insere um novo torneio no banco de dados."""
+                      buy_in: float, ganho_total: float, hora_inicio: Optional[str] = None,
+                      id_externo: Optional[str] = None) -> bool:
+        """Insere um novo torneio no banco de dados (um torneio repetido não é erro)."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO torneios (data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total))
-            
-            conn.commit()
-            conn.close()
+            self.insert_torneio_async(data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total, hora_inicio,
+                                      id_externo).result()
             return True
         except Exception as e:
             print(f"Erro ao inserir torneio: {e}")
             return False
     
+    def insert_torneio_async(self, data_torneio: str, id_conta: int, id_tipo_torneio: int,
+                             buy_in: float, ganho_total: float, hora_inicio: Optional[str] = None,
+                             id_externo: Optional[str] = None) -> Future:
+        """Enfileira a inserção na thread de escrita.
+        
+        O Future resolve com o id do torneio (o existente, se o id externo já estava
+        cadastrado) ou None se ele já existia sem mudanças.
+        """
+        def inserir(cursor):
+            row = cursor.execute(INSERIR_TORNEIO + " RETURNING id_torneio", (
+                data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total, hora_inicio, id_externo
+            )).fetchone()
+            return row[0] if row else None
+        
+        return self._fila_escrita().executar(inserir)
+
+    def insert_torneios_lote(self, torneios: Iterable[Tuple]) -> int:
+        """Insere vários torneios em uma única transação.
+
+        Cada item é (data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total, hora_inicio),
+        opcionalmente seguido do id externo. Torneios já cadastrados (mesmo id externo
+        sem mudanças ou, com a chave natural única, mesmos dados) são ignorados, então
+        reimportar um arquivo não duplica nada. Retorna a quantidade inserida ou
+        atualizada (0 em caso de erro).
+        """
+        # Lista, não gerador: a fila pode repetir a operação se o banco estiver travado
+        linhas = [tuple(torneio) if len(torneio) == 7 else tuple(torneio) + (None,) for torneio in torneios]
+        try:
+            return self._fila_escrita().executar(
+                lambda cursor: cursor.executemany(INSERIR_TORNEIO, linhas).rowcount
+            ).result()
+        except Exception as e:
+            print(f"Erro ao inserir torneios em lote: {e}")
+            return 0
+
     def get_torneios(self, id_conta: Optional[int] = None, 
                     id_tipo_torneio: Optional[int] = None,
                     data_inicio: Optional[str] = None,
                     data_fim: Optional[str] = None) -> List[Dict]:
         """Retorna torneios com filtros opcionais."""
-        conn = self.get_connection()
+        rows = self._consultar_torneios(id_conta, id_tipo_torneio, data_inicio, data_fim)
+        
+        return [{
+            "id_torneio": row[0],
+            "data_torneio": row[1],
+            "nome_conta": row[2],
+            "nome_tipo": row[3],
+            "buy_in": row[4],
+            "ganho_total": row[5],
+            "lucro_liquido": row[6],
+            "roi": row[7],
+            "hora_inicio": row[8]
+        } for row in rows]
+    
+    def get_torneios_set(self, id_conta: Optional[int] = None,
+                         id_tipo_torneio: Optional[int] = None,
+                         data_inicio: Optional[str] = None,
+                         data_fim: Optional[str] = None):
+        """Retorna torneios com filtros opcionais em um TournamentSet (arrays tipados)."""
+        if self.snapshot is not None:
+            return self.snapshot.filtrar(id_conta, id_tipo_torneio, data_inicio, data_fim)
+        
+        from tournament_set import TournamentSet
+        return TournamentSet.from_tuples(
+            self._consultar_torneios(id_conta, id_tipo_torneio, data_inicio, data_fim)
+        )
+    
+    def _consultar_torneios(self, id_conta: Optional[int] = None,
+                            id_tipo_torneio: Optional[int] = None,
+                            data_inicio: Optional[str] = None,
+                            data_fim: Optional[str] = None) -> List[Tuple]:
+        """Executa a consulta de torneios e retorna as linhas cruas."""
+        conn = self._conexao_leitura()
         cursor = conn.cursor()
         
-        query = '''
+        query, params = self._sql_torneios(conn, id_conta, id_tipo_torneio, data_inicio, data_fim)
+        query += " ORDER BY t.data_torneio DESC"
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        
+        conn.close()
+        
+        return rows
+    
+    def iter_torneios(self, id_conta: Optional[int] = None,
+                      id_tipo_torneio: Optional[int] = None,
+                      data_inicio: Optional[str] = None,
+                      data_fim: Optional[str] = None,
+                      tamanho_lote: int = 1000) -> Iterator[Dict]:
+        """Itera os torneios em ordem cronológica, lendo do banco em lotes (memória constante)."""
+        conn = self._conexao_leitura()
+        try:
+            cursor = conn.cursor()
+            query, params = self._sql_torneios(conn, id_conta, id_tipo_torneio, data_inicio, data_fim)
+            cursor.execute(query + " ORDER BY t.data_torneio, t.id_torneio", params)
+            
+            while True:
+                rows = cursor.fetchmany(tamanho_lote)
+                if not rows:
+                    break
+                for row in rows:
+                    yield {
+                        "id_torneio": row[0],
+                        "data_torneio": row[1],
+                        "nome_conta": row[2],
+                        "nome_tipo": row[3],
+                        "buy_in": row[4],
+                        "ganho_total": row[5],
+                        "lucro_liquido": row[6],
+                        "roi": row[7],
+                        "hora_inicio": row[8]
+                    }
+        finally:
+            conn.close()
+    
+    def _sql_torneios(self, conn: sqlite3.Connection,
+                      id_conta: Optional[int] = None,
+                      id_tipo_torneio: Optional[int] = None,
+                      data_inicio: Optional[str] = None,
+                      data_fim: Optional[str] = None) -> Tuple[str, List]:
+        """Monta a consulta de torneios (sem ORDER BY) e seus parâmetros."""
+        fonte = self._fonte_torneios(conn, data_inicio, data_fim)
+        query = f'''
             SELECT t.id_torneio, t.data_torneio, c.nome_conta, tt.nome_tipo,
                    t.buy_in, t.ganho_total, 
                    (t.ganho_total - t.buy_in) as lucro_liquido,
                    CASE 
                        WHEN t.buy_in > 0 THEN ((t.ganho_total - t.buy_in) / t.buy_in) * 100
                        ELSE 0
-                   END as roi
-            FROM torneios t
+                   END as roi,
+                   t.hora_inicio
+            FROM {fonte} t
             JOIN contas c ON t.id_conta = c.id_conta
             JOIN tipos_torneio tt ON t.id_tipo_torneio = tt.id_tipo_torneio
             WHERE 1=1
@@ -170,34 +547,129 @@ class PokerDatabase:
             query += " AND t.data_torneio <= ?"
             params.append(data_fim)
         
-        query += " ORDER BY t.data_torneio DESC"
+        return query, params
+    
+    def _fonte_torneios(self, conn: sqlite3.Connection,
+                        data_inicio: Optional[str] = None,
+                        data_fim: Optional[str] = None,
+                        agregada: bool = False) -> str:
+        """Origem dos torneios para o FROM: a tabela do banco e os arquivos anuais que cruzam o período.
+        
+        Arquivos fora do período nem são anexados. Na versão agregada (colunas n e itm
+        no lugar de id e hora), anos inteiramente dentro do período vêm do resumo
+        pré-calculado, sem anexar o arquivo.
+        """
+        if agregada:
+            colunas = "data_torneio, id_conta, id_tipo_torneio, 1 as n, buy_in, ganho_total, " \
+                      "CASE WHEN ganho_total > 0 THEN 1 ELSE 0 END as itm"
+        else:
+            colunas = COLUNAS_TORNEIO
+        
+        partes = [f"SELECT {colunas} FROM main.torneios"]
+        resumidos = []
+        
+        inicio = str(data_inicio) if data_inicio else None
+        fim = str(data_fim) if data_fim else None
+        arquivos = conn.execute("SELECT ano, caminho, data_min, data_max FROM arquivos_anuais ORDER BY ano").fetchall()
+        
+        for ano, caminho, data_min, data_max in arquivos:
+            # Poda pelo período: o arquivo só entra se tiver torneios dentro dele
+            if (fim and fim < data_min) or (inicio and inicio > data_max):
+                continue
+            
+            if agregada and (not inicio or inicio <= f"{ano}-01-01") and (not fim or fim >= f"{ano}-12-31"):
+                resumidos.append(ano)
+                continue
+            
+            conn.execute(f"ATTACH DATABASE ? AS arquivo_{ano}", (caminho,))
+            partes.append(f"SELECT {colunas} FROM arquivo_{ano}.torneios")
+        
+        if resumidos:
+            partes.append(f'''
+                SELECT mes, id_conta, id_tipo_torneio, total_torneios, total_investido, total_ganhos, itm_count
+                FROM main.resumo_arquivado WHERE ano IN ({", ".join(map(str, resumidos))})
+            ''')
+        
+        if len(partes) == 1 and not agregada:
+            return "torneios"
+        return "(" + " UNION ALL ".join(partes) + ")"
+    
+    def get_resumo_mensal(self, id_conta: Optional[int] = None,
+                          id_tipo_torneio: Optional[int] = None,
+                          data_inicio: Optional[str] = None,
+                          data_fim: Optional[str] = None) -> List[Dict]:
+        """Retorna totais por mês (AAAA-MM), agregados no banco."""
+        if self.colunar is not None:
+            return self.colunar.get_resumo_mensal(id_conta, id_tipo_torneio, data_inicio, data_fim)
+        
+        conn = self._conexao_leitura()
+        cursor = conn.cursor()
+        
+        fonte = self._fonte_torneios(conn, data_inicio, data_fim, agregada=True)
+        query = f'''
+            SELECT strftime('%Y-%m', data_torneio) as mes,
+                   SUM(n) as total_torneios,
+                   SUM(buy_in) as total_investido,
+                   SUM(ganho_total) as total_ganhos,
+                   SUM(itm) as torneios_itm
+            FROM {fonte} t
+            WHERE 1=1
+        '''
+        
+        params = []
+        
+        if id_conta:
+            query += " AND id_conta = ?"
+            params.append(id_conta)
+        
+        if id_tipo_torneio:
+            query += " AND id_tipo_torneio = ?"
+            params.append(id_tipo_torneio)
+        
+        if data_inicio:
+            query += " AND data_torneio >= ?"
+            params.append(data_inicio)
+        
+        if data_fim:
+            query += " AND data_torneio <= ?"
+            params.append(data_fim)
+        
+        query += " GROUP BY mes ORDER BY mes"
         
         cursor.execute(query, params)
         rows = cursor.fetchall()
         
         conn.close()
         
-        return [{
-            "id_torneio": row[0],
-            "data_torneio": row[1],
-            "nome_conta": row[2],
-            "nome_tipo": row[3],
-            "buy_in": row[4],
-            "ganho_total": row[5],
-            "lucro_liquido": row[6],
-            "roi": row[7]
-        } for row in rows]
+        resultado = []
+        for mes, total_torneios, total_investido, total_ganhos, torneios_itm in rows:
+            lucro_liquido = total_ganhos - total_investido
+            resultado.append({
+                "mes": mes,
+                "total_torneios": total_torneios,
+                "total_investido": total_investido,
+                "total_ganhos": total_ganhos,
+                "lucro_liquido": lucro_liquido,
+                "roi": (lucro_liquido / total_investido) * 100 if total_investido > 0 else 0,
+                "itm_percentage": (torneios_itm / total_torneios) * 100 if total_torneios > 0 else 0
+            })
+        
+        return resultado
     
     def get_estatisticas_gerais(self, id_conta: Optional[int] = None,
                                data_inicio: Optional[str] = None,
                                data_fim: Optional[str] = None) -> Dict:
         """Retorna estatísticas gerais dos torneios."""
-        conn = self.get_connection()
+        if self.colunar is not None:
+            return self.colunar.get_estatisticas_gerais(id_conta, data_inicio, data_fim)
+        
+        conn = self._conexao_leitura()
         cursor = conn.cursor()
         
-        query = '''
+        fonte = self._fonte_torneios(conn, data_inicio, data_fim, agregada=True)
+        query = f'''
             SELECT 
-                COUNT(*) as total_torneios,
+                COALESCE(SUM(n), 0) as total_torneios,
                 SUM(buy_in) as total_investido,
                 SUM(ganho_total) as total_ganhos,
                 SUM(ganho_total - buy_in) as lucro_liquido,
@@ -205,9 +677,9 @@ class PokerDatabase:
                     WHEN SUM(buy_in) > 0 THEN (SUM(ganho_total - buy_in) / SUM(buy_in)) * 100
                     ELSE 0
                 END as roi_geral,
-                AVG(buy_in) as abi,
-                COUNT(CASE WHEN ganho_total > 0 THEN 1 END) as itm_count
-            FROM torneios t
+                CAST(SUM(buy_in) AS REAL) / SUM(n) as abi,
+                SUM(itm) as itm_count
+            FROM {fonte} t
             WHERE 1=1
         '''
         
@@ -256,13 +728,17 @@ class PokerDatabase:
                                  data_inicio: Optional[str] = None,
                                  data_fim: Optional[str] = None) -> List[Dict]:
         """Retorna estatísticas agrupadas por tipo de torneio."""
-        conn = self.get_connection()
+        if self.colunar is not None:
+            return self.colunar.get_estatisticas_por_tipo(id_conta, data_inicio, data_fim)
+        
+        conn = self._conexao_leitura()
         cursor = conn.cursor()
         
-        query = '''
+        fonte = self._fonte_torneios(conn, data_inicio, data_fim, agregada=True)
+        query = f'''
             SELECT 
                 tt.nome_tipo,
-                COUNT(*) as total_torneios,
+                SUM(t.n) as total_torneios,
                 SUM(t.buy_in) as total_investido,
                 SUM(t.ganho_total) as total_ganhos,
                 SUM(t.ganho_total - t.buy_in) as lucro_liquido,
@@ -270,7 +746,7 @@ class PokerDatabase:
                     WHEN SUM(t.buy_in) > 0 THEN (SUM(t.ganho_total - t.buy_in) / SUM(t.buy_in)) * 100
                     ELSE 0
                 END as roi
-            FROM torneios t
+            FROM {fonte} t
             JOIN tipos_torneio tt ON t.id_tipo_torneio = tt.id_tipo_torneio
             WHERE 1=1
         '''
@@ -305,6 +781,188 @@ class PokerDatabase:
             "roi": row[5] or 0
         } for row in rows]
     
+    def get_performance_por_periodo(self, periodo: str = 'monthly',
+                                    id_conta: Optional[int] = None,
+                                    id_tipo_torneio: Optional[int] = None,
+                                    data_inicio: Optional[str] = None,
+                                    data_fim: Optional[str] = None) -> List[Dict]:
+        """Performance por período (weekly, monthly, yearly) no formato de PokerCalculations.get_performance_by_period."""
+        if self.colunar is not None:
+            return self.colunar.get_performance_por_periodo(periodo, id_conta, id_tipo_torneio, data_inicio, data_fim)
+        
+        from calculations import PokerCalculations
+        return PokerCalculations.get_performance_by_period(
+            self.get_torneios_set(id_conta, id_tipo_torneio, data_inicio, data_fim), periodo
+        )
+    
+    def get_cubo(self, dimensoes: Iterable[str] = ('mes', 'conta', 'tipo'),
+                 id_conta: Optional[int] = None,
+                 id_tipo_torneio: Optional[int] = None,
+                 data_inicio: Optional[str] = None,
+                 data_fim: Optional[str] = None) -> List[Dict]:
+        """Totais agrupados pelas dimensões pedidas (ano, mes, conta, tipo), ordenados por elas."""
+        if self.colunar is not None:
+            return self.colunar.get_cubo(dimensoes, id_conta, id_tipo_torneio, data_inicio, data_fim)
+        
+        dimensoes = [d for d in DIMENSOES_CUBO if d in dimensoes]
+        conn = self._conexao_leitura()
+        cursor = conn.cursor()
+        
+        fonte = self._fonte_torneios(conn, data_inicio, data_fim, agregada=True)
+        selecao = "".join(f"{EXPRESSOES_CUBO[d]} as {d}, " for d in dimensoes)
+        query = f'''
+            SELECT {selecao}SUM(t.n), SUM(t.buy_in), SUM(t.ganho_total), SUM(t.ganho_total - t.buy_in), SUM(t.itm)
+            FROM {fonte} t
+            JOIN contas c ON t.id_conta = c.id_conta
+            JOIN tipos_torneio tt ON t.id_tipo_torneio = tt.id_tipo_torneio
+            WHERE 1=1
+        '''
+        
+        params = []
+        
+        if id_conta:
+            query += " AND t.id_conta = ?"
+            params.append(id_conta)
+        
+        if id_tipo_torneio:
+            query += " AND t.id_tipo_torneio = ?"
+            params.append(id_tipo_torneio)
+        
+        if data_inicio:
+            query += " AND t.data_torneio >= ?"
+            params.append(data_inicio)
+        
+        if data_fim:
+            query += " AND t.data_torneio <= ?"
+            params.append(data_fim)
+        
+        if dimensoes:
+            query += f" GROUP BY {', '.join(dimensoes)} ORDER BY {', '.join(dimensoes)}"
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        
+        conn.close()
+        
+        resultado = []
+        for row in rows:
+            if not row[len(dimensoes)]:
+                continue  # Sem dimensões e sem torneios: SUM devolve NULL
+            celula = dict(zip(dimensoes, row))
+            celula.update(totais_cubo(*row[len(dimensoes):]))
+            resultado.append(celula)
+        
+        return resultado
+    
+    def get_melhores_piores_sessoes(self, limit: int = 5,
+                                    id_conta: Optional[int] = None,
+                                    id_tipo_torneio: Optional[int] = None,
+                                    data_inicio: Optional[str] = None,
+                                    data_fim: Optional[str] = None,
+                                    agrupar_por: Optional[str] = None,
+                                    intervalo_minutos: Optional[int] = None) -> Dict:
+        """Retorna as melhores e piores sessões, agregadas e ordenadas no próprio SQL.
+        
+        Sessões são diárias por padrão; com intervalo_minutos, uma nova sessão começa
+        quando o intervalo entre inícios consecutivos excede o limite. agrupar_por
+        ('conta' ou 'tipo') separa as sessões por conta ou tipo de torneio.
+        """
+        conn = self._conexao_leitura()
+        cursor = conn.cursor()
+        
+        if agrupar_por == 'conta':
+            coluna_grupo = 'c.nome_conta'
+        elif agrupar_por == 'tipo':
+            coluna_grupo = 'tt.nome_tipo'
+        else:
+            coluna_grupo = "''"
+        
+        fonte = self._fonte_torneios(conn, data_inicio, data_fim)
+        base = f'''
+            SELECT {coluna_grupo} as grupo, t.id_torneio, t.data_torneio, t.buy_in, t.ganho_total,
+                   datetime(t.data_torneio || ' ' || COALESCE(t.hora_inicio, '00:00')) as inicio
+            FROM {fonte} t
+            JOIN contas c ON t.id_conta = c.id_conta
+            JOIN tipos_torneio tt ON t.id_tipo_torneio = tt.id_tipo_torneio
+            WHERE 1=1
+        '''
+        
+        params = []
+        
+        if id_conta:
+            base += " AND t.id_conta = ?"
+            params.append(id_conta)
+        
+        if id_tipo_torneio:
+            base += " AND t.id_tipo_torneio = ?"
+            params.append(id_tipo_torneio)
+        
+        if data_inicio:
+            base += " AND t.data_torneio >= ?"
+            params.append(data_inicio)
+        
+        if data_fim:
+            base += " AND t.data_torneio <= ?"
+            params.append(data_fim)
+        
+        agregados = '''
+            SELECT grupo, MIN(data_torneio), MIN(inicio), MAX(inicio), COUNT(*),
+                   SUM(buy_in), SUM(ganho_total), SUM(ganho_total - buy_in) as lucro_liquido
+        '''
+        
+        if intervalo_minutos is None:
+            query = f"{agregados} FROM ({base}) GROUP BY grupo, data_torneio"
+        else:
+            # Marca o início de cada sessão e numera com soma acumulada
+            query = f'''
+                WITH base AS ({base}),
+                marcados AS (
+                    SELECT *,
+                           CASE WHEN LAG(inicio) OVER w IS NULL
+                                  OR ROUND((julianday(inicio) - julianday(LAG(inicio) OVER w)) * 1440) > ?
+                                THEN 1 ELSE 0
+                           END as nova_sessao
+                    FROM base
+                    WINDOW w AS (PARTITION BY grupo ORDER BY inicio, id_torneio)
+                ),
+                numerados AS (
+                    SELECT *,
+                           SUM(nova_sessao) OVER (PARTITION BY grupo ORDER BY inicio, id_torneio
+                                                  ROWS UNBOUNDED PRECEDING) as sessao
+                    FROM marcados
+                )
+                {agregados} FROM numerados GROUP BY grupo, sessao
+            '''
+            params.append(intervalo_minutos)
+        
+        resultado = {}
+        for chave, ordem in (("melhores", "DESC"), ("piores", "ASC")):
+            cursor.execute(f"{query} ORDER BY lucro_liquido {ordem}, MIN(inicio) LIMIT ?", params + [limit])
+            
+            sessoes = []
+            for row in cursor.fetchall():
+                sessao = {
+                    "data_torneio": datetime.strptime(row[1][:10], "%Y-%m-%d").date(),
+                    "buy_in": row[5] or 0,
+                    "ganho_total": row[6] or 0,
+                    "lucro_liquido": row[7] or 0,
+                    "roi": ((row[7] or 0) / row[5]) * 100 if row[5] else 0,
+                    "total_torneios": row[4]
+                }
+                if intervalo_minutos is not None:
+                    sessao["inicio"] = row[2]
+                    sessao["fim"] = row[3]
+                if agrupar_por == 'conta':
+                    sessao["nome_conta"] = row[0]
+                elif agrupar_por == 'tipo':
+                    sessao["nome_tipo"] = row[0]
+                sessoes.append(sessao)
+            resultado[chave] = sessoes
+        
+        conn.close()
+        
+        return resultado
+    
     def backup_database(self, backup_path: str) -> bool:
         """Cria um backup do banco de dados."""
         try:
@@ -317,36 +975,280 @@ class PokerDatabase:
 
 
 
-    def delete_torneio(self, id_torneio: int) -> bool:
-        """Deleta um torneio do banco de dados."""
+    def get_arquivos_anuais(self) -> List[Dict]:
+        """Retorna os anos arquivados, com caminho do arquivo e período coberto."""
+        conn = self._conexao_leitura()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT ano, caminho, data_min, data_max, total_torneios FROM arquivos_anuais ORDER BY ano")
+        rows = cursor.fetchall()
+        
+        conn.close()
+        
+        return [{
+            "ano": row[0],
+            "caminho": row[1],
+            "data_min": row[2],
+            "data_max": row[3],
+            "total_torneios": row[4]
+        } for row in rows]
+    
+    def get_anos_arquivaveis(self) -> List[int]:
+        """Retorna os anos já encerrados que ainda têm torneios no banco principal."""
+        conn = self._conexao_leitura()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT DISTINCT CAST(strftime('%Y', data_torneio) AS INTEGER) as ano
+            FROM torneios
+            WHERE data_torneio < ?
+            ORDER BY ano
+        ''', (f"{datetime.now().year}-01-01",))
+        rows = cursor.fetchall()
+        
+        conn.close()
+        
+        return [row[0] for row in rows]
+    
+    def arquivar_ano(self, ano: int, diretorio: Optional[str] = None) -> int:
+        """Move os torneios de um ano encerrado para um arquivo SQLite próprio, com resumo mensal.
+        
+        O arquivo (torneios_<ano>.db, por padrão na pasta arquivo/ ao lado do banco) é
+        anexado sob demanda pelas consultas cujo período o inclui. Torneios arquivados
+        ficam somente leitura; desarquivar_ano os traz de volta. Arquivar de novo um
+        ano já arquivado acrescenta ao arquivo existente. Retorna quantos torneios
+        foram movidos (0 em caso de erro).
+        """
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+            if ano >= datetime.now().year:
+                raise ValueError(f"{ano} ainda não foi encerrado")
             
-            cursor.execute("DELETE FROM torneios WHERE id_torneio = ?", (id_torneio,))
+            if diretorio is None:
+                diretorio = os.path.join(os.path.dirname(os.path.abspath(self.db_path)), 'arquivo')
+            os.makedirs(diretorio, exist_ok=True)
+            caminho = os.path.abspath(os.path.join(diretorio, f"torneios_{ano}.db"))
             
-            conn.commit()
-            conn.close()
+            return self._fila_escrita().executar(lambda cursor: self._mover_para_arquivo(cursor, ano, caminho)).result()
+        except Exception as e:
+            print(f"Erro ao arquivar o ano {ano}: {e}")
+            return 0
+    
+    def _mover_para_arquivo(self, cursor: sqlite3.Cursor, ano: int, caminho: str) -> int:
+        """Copia o ano para o arquivo e só então o remove do banco principal (na transação da fila)."""
+        periodo = (f"{ano}-01-01", f"{ano + 1}-01-01")
+        cursor.execute('''
+            SELECT caminho FROM arquivos_anuais WHERE ano = ?
+        ''', (ano,))
+        registrado = cursor.fetchone()
+        if registrado:
+            caminho = registrado[0]
+        
+        arquivo = sqlite3.connect(caminho)
+        try:
+            arquivo.execute('''
+                CREATE TABLE IF NOT EXISTS torneios (
+                    id_torneio INTEGER PRIMARY KEY,
+                    data_torneio DATE NOT NULL,
+                    id_conta INTEGER NOT NULL,
+                    id_tipo_torneio INTEGER NOT NULL,
+                    buy_in DECIMAL(10,2) NOT NULL,
+                    ganho_total DECIMAL(10,2) NOT NULL DEFAULT 0,
+                    hora_inicio TEXT,
+                    id_externo TEXT
+                )
+            ''')
+            garantir_id_externo(arquivo)
+            arquivo.execute(RESUMO_ARQUIVO.format(tabela='resumo'))
+            
+            # Cópia em lotes; INSERT OR REPLACE torna a operação repetível (novas tentativas da fila)
+            origem = cursor.connection.execute(
+                f"SELECT {COLUNAS_COPIA} FROM torneios WHERE data_torneio >= ? AND data_torneio < ?", periodo
+            )
+            movidos = 0
+            while True:
+                rows = origem.fetchmany(10000)
+                if not rows:
+                    break
+                arquivo.executemany(f"INSERT OR REPLACE INTO torneios ({COLUNAS_COPIA}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                movidos += len(rows)
+            
+            arquivo.execute("DELETE FROM resumo")
+            arquivo.execute('''
+                INSERT INTO resumo
+                SELECT ?, strftime('%Y-%m-01', data_torneio), id_conta, id_tipo_torneio,
+                       COUNT(*), SUM(buy_in), SUM(ganho_total),
+                       SUM(CASE WHEN ganho_total > 0 THEN 1 ELSE 0 END)
+                FROM torneios
+                GROUP BY 2, 3, 4
+            ''', (ano,))
+            arquivo.commit()
+            
+            resumo = arquivo.execute("SELECT * FROM resumo").fetchall()
+            data_min, data_max, total = arquivo.execute(
+                "SELECT MIN(data_torneio), MAX(data_torneio), COUNT(*) FROM torneios"
+            ).fetchone()
+        finally:
+            arquivo.close()
+        
+        if not total:
+            os.remove(caminho)
+            return 0
+        
+        cursor.execute("DELETE FROM torneios WHERE data_torneio >= ? AND data_torneio < ?", periodo)
+        cursor.execute("DELETE FROM resumo_arquivado WHERE ano = ?", (ano,))
+        cursor.executemany("INSERT INTO resumo_arquivado VALUES (?, ?, ?, ?, ?, ?, ?, ?)", resumo)
+        cursor.execute('''
+            INSERT OR REPLACE INTO arquivos_anuais (ano, caminho, data_min, data_max, total_torneios)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (ano, caminho, data_min, data_max, total))
+        
+        return movidos
+    
+    def desarquivar_ano(self, ano: int) -> int:
+        """Traz os torneios de um ano arquivado de volta ao banco principal e apaga o arquivo.
+        
+        Retorna quantos torneios voltaram (0 em caso de erro).
+        """
+        try:
+            arquivos = {arquivo["ano"]: arquivo["caminho"] for arquivo in self.get_arquivos_anuais()}
+            if ano not in arquivos:
+                raise ValueError(f"{ano} não está arquivado")
+            caminho = arquivos[ano]
+            
+            def restaurar(cursor):
+                arquivo = sqlite3.connect(caminho)
+                try:
+                    garantir_id_externo(arquivo)
+                    rows = arquivo.execute(f"SELECT {COLUNAS_COPIA} FROM torneios").fetchall()
+                finally:
+                    arquivo.close()
+                cursor.executemany(f"INSERT OR REPLACE INTO torneios ({COLUNAS_COPIA}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                cursor.execute("DELETE FROM resumo_arquivado WHERE ano = ?", (ano,))
+                cursor.execute("DELETE FROM arquivos_anuais WHERE ano = ?", (ano,))
+                return len(rows)
+            
+            restaurados = self._fila_escrita().executar(restaurar).result()
+            
+            # O arquivo só é apagado depois que o commit devolveu os torneios ao banco
+            os.remove(caminho)
+            return restaurados
+        except Exception as e:
+            print(f"Erro ao desarquivar o ano {ano}: {e}")
+            return 0
+    
+    def _duplicados_sql(self) -> str:
+        # Em cada grupo da chave natural fica o torneio com id externo (o primeiro) ou o de menor id;
+        # torneios com id externo nunca são excedentes (ids diferentes são torneios diferentes)
+        return f'''
+            SELECT id_torneio, manter FROM (
+                SELECT id_torneio, id_externo,
+                       COALESCE(MIN(CASE WHEN id_externo IS NOT NULL THEN id_torneio END) OVER grupo,
+                                MIN(id_torneio) OVER grupo) as manter
+                FROM torneios
+                WINDOW grupo AS (PARTITION BY {CHAVE_NATURAL})
+            )
+            WHERE id_externo IS NULL AND id_torneio <> manter
+        '''
+    
+    def get_torneios_duplicados(self) -> Dict:
+        """Conta torneios repetidos pela chave natural (uma passada pelo índice da chave)."""
+        conn = self._conexao_leitura()
+        cursor = conn.cursor()
+        
+        cursor.execute(f"SELECT COUNT(DISTINCT manter), COUNT(*) FROM ({self._duplicados_sql()})")
+        grupos, excedentes = cursor.fetchone()
+        
+        conn.close()
+        
+        return {"grupos": grupos, "excedentes": excedentes}
+    
+    def mesclar_torneios_duplicados(self) -> int:
+        """Remove os torneios repetidos pela chave natural, mantendo um de cada grupo.
+        
+        Com chave_natural=True, cria em seguida o índice único. Retorna quantos
+        torneios foram removidos (0 em caso de erro).
+        """
+        def mesclar(cursor):
+            cursor.execute(f'''
+                DELETE FROM torneios WHERE id_torneio IN (SELECT id_torneio FROM ({self._duplicados_sql()}))
+            ''')
+            removidos = cursor.rowcount
+            self._indice_chave_natural(cursor)
+            return removidos
+        
+        try:
+            return self._fila_escrita().executar(mesclar).result()
+        except Exception as e:
+            print(f"Erro ao mesclar torneios duplicados: {e}")
+            return 0
+    
+    def delete_torneio(self, id_torneio: int) -> bool:
+        """Deleta um torneio do banco de dados."""
+        try:
+            self.delete_torneio_async(id_torneio).result()
             return True
         except Exception as e:
             print(f"Erro ao deletar torneio: {e}")
             return False
 
-    def update_torneio(self, id_torneio: int, data_torneio: str, id_conta: int, id_tipo_torneio: int, buy_in: float, ganho_total: float) -> bool:
-        """Atualiza os dados de um torneio existente."""
+    def delete_torneio_async(self, id_torneio: int) -> Future:
+        """Enfileira a exclusão na thread de escrita. O Future resolve com as linhas excluídas
+        (ou falha com ValueError se o torneio estiver arquivado)."""
+        return self._fila_escrita().executar(lambda cursor: self._alterar_torneio(
+            cursor, id_torneio, "DELETE FROM torneios WHERE id_torneio = ?", (id_torneio,)
+        ))
+
+    def update_torneio(self, id_torneio: int, data_torneio: str, id_conta: int, id_tipo_torneio: int, buy_in: float, ganho_total: float,
+                       hora_inicio: Optional[str] = None) -> bool:
+        """Atualiza os dados de um torneio existente (hora_inicio só é alterada se informada)."""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE torneios
-                SET data_torneio = ?, id_conta = ?, id_tipo_torneio = ?, buy_in = ?, ganho_total = ?
-                WHERE id_torneio = ?
-            ''', (data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total, id_torneio))
-            conn.commit()
-            conn.close()
+            self.update_torneio_async(id_torneio, data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total,
+                                      hora_inicio).result()
             return True
         except Exception as e:
             print(f"Erro ao atualizar torneio: {e}")
             return False
 
+    def update_torneio_async(self, id_torneio: int, data_torneio: str, id_conta: int, id_tipo_torneio: int,
+                             buy_in: float, ganho_total: float, hora_inicio: Optional[str] = None) -> Future:
+        """Enfileira a atualização na thread de escrita. O Future resolve com as linhas alteradas
+        (ou falha com ValueError se o torneio estiver arquivado)."""
+        return self._fila_escrita().executar(lambda cursor: self._alterar_torneio(cursor, id_torneio, '''
+            UPDATE torneios
+            SET data_torneio = ?, id_conta = ?, id_tipo_torneio = ?, buy_in = ?, ganho_total = ?,
+                hora_inicio = COALESCE(?, hora_inicio)
+            WHERE id_torneio = ?
+        ''', (data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total, hora_inicio, id_torneio)))
+
+    def _alterar_torneio(self, cursor: sqlite3.Cursor, id_torneio: int, sql: str, parametros: Tuple) -> int:
+        """Altera um torneio do banco principal; os arquivados aparecem nas consultas
+        mas não são alterados aqui, então o comando é recusado em vez de afetar 0 linhas."""
+        linhas = cursor.execute(sql, parametros).rowcount
+        if linhas == 0:
+            ano = self._ano_arquivado(cursor, id_torneio)
+            if ano is not None:
+                raise erro_arquivado(id_torneio, ano)
+        return linhas
+
+    @staticmethod
+    def _ano_arquivado(conn, id_torneio: int) -> Optional[int]:
+        for ano, caminho in conn.execute("SELECT ano, caminho FROM arquivos_anuais ORDER BY ano").fetchall():
+            if not os.path.exists(caminho):
+                continue
+            arquivo = sqlite3.connect(caminho)
+            try:
+                encontrado = arquivo.execute("SELECT 1 FROM torneios WHERE id_torneio = ?", (id_torneio,)).fetchone()
+            finally:
+                arquivo.close()
+            if encontrado is not None:
+                return ano
+        return None
+
+    def get_ano_arquivado(self, id_torneio: int) -> Optional[int]:
+        """Ano arquivado que guarda o torneio (somente leitura), ou None se ele está no banco."""
+        conn = self._conexao_leitura()
+        ano = self._ano_arquivado(conn, id_torneio)
+        conn.close()
+        return ano
+
 
@@ -0,0 +1,148 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import shutil
+import time
+import uuid
+from typing import BinaryIO, Optional, Tuple, Union
+
+# Arquivos publicados a partir de buffers e a chave de assinatura ficam aqui
+DIR_DOWNLOADS = os.environ.get(
+    'POKER_DOWNLOADS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads')
+)
+
+# Definida pelo main.py ao iniciar o Streamlit; sem ela não há rota de download.
+# Só porta e caminho (":5000/download") usa o host pelo qual o navegador abriu o dashboard
+URL_DOWNLOADS = os.environ.get('POKER_DOWNLOADS_URL')
+
+TAMANHO_BLOCO = 64 * 1024
+
+
+def nome_host(host: Optional[str]) -> str:
+    """Host de um cabeçalho Host sem a porta ("192.168.0.10:8501" -> "192.168.0.10"); localhost se ausente."""
+    if not host:
+        return 'localhost'
+    if host.startswith('['):
+        return host[:host.index(']') + 1]
+    return host.rsplit(':', 1)[0]
+
+
+def _b64(dados: bytes) -> str:
+    return base64.urlsafe_b64encode(dados).rstrip(b'=').decode('ascii')
+
+
+def _de_b64(texto: str) -> bytes:
+    return base64.urlsafe_b64decode(texto + '=' * (-len(texto) % 4))
+
+
+class PokerDownloads:
+    """Links de download assinados e de curta duração para arquivos exportados.
+
+    O token leva o caminho do arquivo, o nome de download e a expiração,
+    assinados com HMAC-SHA256. A chave vem de POKER_DOWNLOADS_SEGREDO ou de um
+    arquivo no diretório de downloads, criado uma única vez e compartilhado
+    entre o Streamlit (que gera os links) e o Flask (que serve os arquivos).
+    """
+
+    def __init__(self, diretorio: str = DIR_DOWNLOADS, validade: int = 300,
+                 url_base: Optional[str] = URL_DOWNLOADS, segredo: Optional[bytes] = None):
+        self.diretorio = diretorio
+        self.validade = validade
+        self.url_base = url_base
+        self._segredo = segredo
+
+    def publicar(self, origem: Union[str, BinaryIO], nome: Optional[str] = None,
+                 validade: Optional[int] = None) -> str:
+        """Gera o token de um arquivo em disco ou de um buffer (copiado em blocos para o disco)."""
+        if isinstance(origem, str):
+            caminho = os.path.abspath(origem)
+        else:
+            # O Flask roda em outro processo: buffers (BytesIO, SpooledTemporaryFile) vão para o disco
+            self.limpar_expirados()
+            os.makedirs(self.diretorio, exist_ok=True)
+            caminho = os.path.join(self.diretorio, f"{uuid.uuid4().hex}.bin")
+            origem.seek(0)
+            with open(caminho, 'wb') as destino:
+                shutil.copyfileobj(origem, destino, TAMANHO_BLOCO)
+
+        carga = {
+            'c': caminho,
+            'n': nome or os.path.basename(caminho),
+            'e': int(time.time()) + (validade or self.validade)
+        }
+        corpo = _b64(json.dumps(carga, separators=(',', ':')).encode('utf-8'))
+        return f"{corpo}.{self._assinar(corpo)}"
+
+    def url(self, token: str, host: Optional[str] = None) -> Optional[str]:
+        """URL da rota de download para o token (None se a rota não estiver configurada).
+
+        Com url_base só com porta e caminho, o host vem de `host` (o cabeçalho
+        Host do pedido do navegador), para o link funcionar fora do servidor.
+        """
+        if not self.url_base:
+            return None
+        base = self.url_base
+        if base.startswith(':'):
+            base = f"http://{nome_host(host)}{base}"
+        return f"{base.rstrip('/')}/{token}"
+
+    def verificar(self, token: str) -> Optional[Tuple[str, str]]:
+        """Retorna (caminho, nome de download) se o token for válido e não tiver expirado."""
+        try:
+            corpo, assinatura = token.split('.', 1)
+            if not hmac.compare_digest(assinatura, self._assinar(corpo)):
+                return None
+            carga = json.loads(_de_b64(corpo))
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+        if carga['e'] < time.time():
+            return None
+        return carga['c'], carga['n']
+
+    def limpar_expirados(self):
+        """Remove buffers publicados cujo link já expirou."""
+        if not os.path.isdir(self.diretorio):
+            return
+
+        limite = time.time() - self.validade
+        for nome in os.listdir(self.diretorio):
+            caminho = os.path.join(self.diretorio, nome)
+            if nome.endswith('.bin') and os.path.getmtime(caminho) < limite:
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass  # Pode estar sendo baixado ou já ter sido removido por outro processo
+
+    def _assinar(self, corpo: str) -> str:
+        return _b64(hmac.new(self._chave(), corpo.encode('ascii'), hashlib.sha256).digest())
+
+    def _chave(self) -> bytes:
+        if self._segredo is None:
+            segredo = os.environ.get('POKER_DOWNLOADS_SEGREDO')
+            self._segredo = segredo.encode('utf-8') if segredo else self._chave_em_arquivo()
+        return self._segredo
+
+    def _chave_em_arquivo(self) -> bytes:
+        """Lê a chave do diretório de downloads, criando-a atomicamente na primeira vez."""
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho = os.path.join(self.diretorio, '.segredo')
+        if not os.path.exists(caminho):
+            temporario = f"{caminho}.{os.getpid()}"
+            descritor = os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descritor, 'wb') as f:
+                f.write(secrets.token_bytes(32))
+            try:
+                # link falha se outro processo criou a chave antes: vale a dele
+                os.link(temporario, caminho)
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(temporario)
+
+        with open(caminho, 'rb') as f:
+            return f.read()
@@ -1,16 +1,46 @@
 import pandas as pd
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from typing import List, Dict, Iterator, Optional
 import io
 import base64
 
+from tournament_set import as_dataframe
+from metrics import instrumentar
+from downloads import PokerDownloads
+
+class _FlowablesSobDemanda(list):
+    """Lista de flowables preenchida por um gerador à medida que o build do reportlab a consome.
+    
+    O build só acessa o início da lista (len, [0], del [0] e reinserções de
+    pedaços de tabelas quebradas entre páginas), então basta manter alguns
+    itens à frente: o documento inteiro nunca fica em memória.
+    """
+    
+    def __init__(self, gerador: Iterator, folga: int = 8):
+        super().__init__()
+        self._gerador = gerador
+        self._folga = folga
+    
+    def _abastecer(self):
+        while self._gerador is not None and list.__len__(self) < self._folga:
+            try:
+                self.append(next(self._gerador))
+            except StopIteration:
+                self._gerador = None
+    
+    def __len__(self):
+        self._abastecer()
+        return list.__len__(self)
+    
+    def __getitem__(self, indice):
+        self._abastecer()
+        return list.__getitem__(self, indice)
+    
+    def __bool__(self):
+        return len(self) > 0
+
+@instrumentar('export')
 class PokerExport:
     
     @staticmethod
@@ -21,7 +51,7 @@ class PokerExport:
             filename = f"torneios_poker_{timestamp}.csv"
         
         # Converter para DataFrame
-        df = pd.DataFrame(torneios)
+        df = as_dataframe(torneios)
         
         # Reordenar e renomear colunas
         if not df.empty:
@@ -46,7 +76,7 @@ class PokerExport:
         with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
             # Aba 1: Torneios detalhados
             if torneios:
-                df_torneios = pd.DataFrame(torneios)
+                df_torneios = as_dataframe(torneios)
                 df_torneios = df_torneios[['data_torneio', 'nome_conta', 'nome_tipo', 'buy_in', 'ganho_total', 'lucro_liquido', 'roi']]
                 df_torneios.columns = ['Data', 'Conta', 'Tipo de Torneio', 'Buy-in (R$)', 'Ganho Total (R$)', 'Lucro Líquido (R$)', 'ROI (%)']
                 df_torneios.to_excel(writer, sheet_name='Torneios', index=False)
@@ -75,11 +105,84 @@ class PokerExport:
         
         filepath = os.path.join("/home/ubuntu/poker_dashboard", filename)
         
+        # reportlab só é carregado quando um PDF é gerado (pesa ~100 ms na inicialização)
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import inch
+        
         # Criar documento PDF
         doc = SimpleDocTemplate(filepath, pagesize=A4)
-        story = []
+        styles, title_style, heading_style = PokerExport._pdf_estilos()
+        
+        # Título, estatísticas gerais e por tipo
+        story = PokerExport._pdf_cabecalho(estatisticas, estatisticas_por_tipo, title_style, heading_style)
+        
+        # Torneios recentes (últimos 20)
+        if torneios:
+            story.append(Paragraph("📋 Torneios Recentes (Últimos 20)", heading_style))
+            
+            torneios_data = [['Data', 'Conta', 'Tipo', 'Buy-in', 'Ganho', 'Lucro', 'ROI']]
+            
+            for torneio in torneios[:20]:  # Últimos 20
+                torneios_data.append([
+                    torneio['data_torneio'],
+                    torneio['nome_conta'][:10] + '...' if len(torneio['nome_conta']) > 10 else torneio['nome_conta'],
+                    torneio['nome_tipo'][:8] + '...' if len(torneio['nome_tipo']) > 8 else torneio['nome_tipo'],
+                    f"R$ {torneio['buy_in']:.0f}",
+                    f"R$ {torneio['ganho_total']:.0f}",
+                    f"R$ {torneio['lucro_liquido']:.0f}",
+                    f"{torneio['roi']:.0f}%"
+                ])
+            
+            torneios_table = Table(torneios_data, colWidths=[0.8*inch, 1*inch, 0.8*inch, 0.7*inch, 0.7*inch, 0.7*inch, 0.6*inch])
+            torneios_table.setStyle(PokerExport._pdf_estilo_tabela(9, 8))
+            
+            story.append(torneios_table)
+        
+        # Rodapé
+        story.append(Spacer(1, 30))
+        story.append(Paragraph("Dashboard Suprema Poker - Relatório gerado automaticamente", styles['Normal']))
+        
+        # Construir PDF
+        doc.build(story)
+        
+        return filepath
+    
+    @staticmethod
+    def export_to_pdf_completo(db, filename: str = None, id_conta: Optional[int] = None,
+                               id_tipo_torneio: Optional[int] = None, data_inicio: Optional[str] = None,
+                               data_fim: Optional[str] = None, linhas_por_tabela: int = 500) -> str:
+        """Exporta o histórico completo para PDF, com subtotais mensais, lendo o banco em lotes."""
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"historico_poker_{timestamp}.pdf"
+        
+        filepath = os.path.join("/home/ubuntu/poker_dashboard", filename)
+        
+        from reportlab.platypus import SimpleDocTemplate
+        from reportlab.lib.pagesizes import A4
+        
+        filtros = dict(id_conta=id_conta, id_tipo_torneio=id_tipo_torneio, data_inicio=data_inicio, data_fim=data_fim)
+        
+        # Agregados vêm prontos do banco; as linhas são lidas só quando o build chega nelas
+        doc = SimpleDocTemplate(filepath, pagesize=A4)
+        doc.build(_FlowablesSobDemanda(PokerExport._pdf_historico(
+            db.iter_torneios(**filtros),
+            db.get_estatisticas_gerais(id_conta, data_inicio, data_fim) if not id_tipo_torneio else None,
+            db.get_estatisticas_por_tipo(id_conta, data_inicio, data_fim) if not id_tipo_torneio else [],
+            db.get_resumo_mensal(**filtros),
+            linhas_por_tabela
+        )))
+        
+        return filepath
+    
+    @staticmethod
+    def _pdf_estilos():
+        """Folha de estilos base, estilo de título e de seção dos relatórios."""
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER
         
-        # Estilos
         styles = getSampleStyleSheet()
         title_style = ParagraphStyle(
             'CustomTitle',
@@ -98,44 +201,69 @@ class PokerExport:
             textColor=colors.darkblue
         )
         
-        # Título
-        story.append(Paragraph("♠️ Relatório Dashboard Suprema Poker ♠️", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Data do relatório
-        data_relatorio = datetime.now().strftime("%d/%m/%Y às %H:%M")
-        story.append(Paragraph(f"Relatório gerado em: {data_relatorio}", styles['Normal']))
-        story.append(Spacer(1, 20))
-        
-        # Estatísticas gerais
-        story.append(Paragraph("📈 Estatísticas Gerais", heading_style))
-        
-        stats_data = [
-            ['Métrica', 'Valor'],
-            ['Total de Torneios', f"{estatisticas['total_torneios']}"],
-            ['Total Investido', f"R$ {estatisticas['total_investido']:.2f}"],
-            ['Total Ganhos', f"R$ {estatisticas['total_ganhos']:.2f}"],
-            ['Lucro Líquido', f"R$ {estatisticas['lucro_liquido']:.2f}"],
-            ['ROI Geral', f"{estatisticas['roi_geral']:.1f}%"],
-            ['ABI (Average Buy-in)', f"R$ {estatisticas['abi']:.2f}"],
-            ['ITM (In The Money)', f"{estatisticas['itm_percentage']:.1f}%"]
-        ]
+        return styles, title_style, heading_style
+    
+    @staticmethod
+    def _pdf_estilo_tabela(fonte_cabecalho: int, fonte_corpo: Optional[int] = None):
+        """Estilo padrão das tabelas: cabeçalho azul, corpo bege e grade."""
+        from reportlab.platypus import TableStyle
+        from reportlab.lib import colors
         
-        stats_table = Table(stats_data, colWidths=[3*inch, 2*inch])
-        stats_table.setStyle(TableStyle([
+        comandos = [
             ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
             ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('FONTSIZE', (0, 0), (-1, 0), fonte_cabecalho),
             ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
             ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
             ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        ]
+        if fonte_corpo:
+            comandos.append(('FONTSIZE', (0, 1), (-1, -1), fonte_corpo))
+        return TableStyle(comandos)
+    
+    @staticmethod
+    def _pdf_cabecalho(estatisticas: Optional[Dict], estatisticas_por_tipo: List[Dict], title_style, heading_style,
+                       titulo: str = "♠️ Relatório Dashboard Suprema Poker ♠️") -> List:
+        """Título, data e as tabelas de estatísticas gerais e por tipo."""
+        from reportlab.platypus import Table, Paragraph, Spacer, PageBreak
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import inch
         
-        story.append(stats_table)
+        styles = getSampleStyleSheet()
+        story = []
+        
+        # Título
+        story.append(Paragraph(titulo, title_style))
         story.append(Spacer(1, 20))
         
+        # Data do relatório
+        data_relatorio = datetime.now().strftime("%d/%m/%Y às %H:%M")
+        story.append(Paragraph(f"Relatório gerado em: {data_relatorio}", styles['Normal']))
+        story.append(Spacer(1, 20))
+        
+        # Estatísticas gerais
+        if estatisticas:
+            story.append(Paragraph("📈 Estatísticas Gerais", heading_style))
+            
+            stats_data = [
+                ['Métrica', 'Valor'],
+                ['Total de Torneios', f"{estatisticas['total_torneios']}"],
+                ['Total Investido', f"R$ {estatisticas['total_investido']:.2f}"],
+                ['Total Ganhos', f"R$ {estatisticas['total_ganhos']:.2f}"],
+                ['Lucro Líquido', f"R$ {estatisticas['lucro_liquido']:.2f}"],
+                ['ROI Geral', f"{estatisticas['roi_geral']:.1f}%"],
+                ['ABI (Average Buy-in)', f"R$ {estatisticas['abi']:.2f}"],
+                ['ITM (In The Money)', f"{estatisticas['itm_percentage']:.1f}%"]
+            ]
+            
+            stats_table = Table(stats_data, colWidths=[3*inch, 2*inch])
+            stats_table.setStyle(PokerExport._pdf_estilo_tabela(12))
+            
+            story.append(stats_table)
+            story.append(Spacer(1, 20))
+        
         # Estatísticas por tipo de torneio
         if estatisticas_por_tipo:
             story.append(Paragraph("🎯 Performance por Tipo de Torneio", heading_style))
@@ -153,72 +281,125 @@ class PokerExport:
                 ])
             
             tipo_table = Table(tipo_data, colWidths=[1.2*inch, 0.8*inch, 1*inch, 1*inch, 1*inch, 0.8*inch])
-            tipo_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTSIZE', (0, 1), (-1, -1), 9)
-            ]))
+            tipo_table.setStyle(PokerExport._pdf_estilo_tabela(10, 9))
             
             story.append(tipo_table)
             story.append(PageBreak())
         
-        # Torneios recentes (últimos 20)
-        if torneios:
-            story.append(Paragraph("📋 Torneios Recentes (Últimos 20)", heading_style))
-            
-            torneios_data = [['Data', 'Conta', 'Tipo', 'Buy-in', 'Ganho', 'Lucro', 'ROI']]
+        return story
+    
+    @staticmethod
+    def _pdf_historico(torneios: Iterator[Dict], estatisticas: Optional[Dict], estatisticas_por_tipo: List[Dict],
+                       resumo_mensal: List[Dict], linhas_por_tabela: int) -> Iterator:
+        """Gera os flowables do histórico completo, um bloco de tabela por vez."""
+        from reportlab.platypus import Table, LongTable, Paragraph, Spacer, PageBreak
+        from reportlab.lib.units import inch
+        
+        styles, title_style, heading_style = PokerExport._pdf_estilos()
+        
+        yield from PokerExport._pdf_cabecalho(estatisticas, estatisticas_por_tipo, title_style, heading_style,
+                                              titulo="♠️ Histórico Completo Suprema Poker ♠️")
+        
+        # Resumo mensal
+        if resumo_mensal:
+            yield Paragraph("📅 Resumo Mensal", heading_style)
             
-            for torneio in torneios[:20]:  # Últimos 20
-                torneios_data.append([
-                    torneio['data_torneio'],
-                    torneio['nome_conta'][:10] + '...' if len(torneio['nome_conta']) > 10 else torneio['nome_conta'],
-                    torneio['nome_tipo'][:8] + '...' if len(torneio['nome_tipo']) > 8 else torneio['nome_tipo'],
-                    f"R$ {torneio['buy_in']:.0f}",
-                    f"R$ {torneio['ganho_total']:.0f}",
-                    f"R$ {torneio['lucro_liquido']:.0f}",
-                    f"{torneio['roi']:.0f}%"
-                ])
+            mensal_data = [['Mês', 'Torneios', 'Investido (R$)', 'Ganhos (R$)', 'Lucro (R$)', 'ROI (%)', 'ITM (%)']]
+            for mes in resumo_mensal:
+                mensal_data.append(PokerExport._pdf_linha_mes(mes))
             
-            torneios_table = Table(torneios_data, colWidths=[0.8*inch, 1*inch, 0.8*inch, 0.7*inch, 0.7*inch, 0.7*inch, 0.6*inch])
-            torneios_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTSIZE', (0, 1), (-1, -1), 8)
-            ]))
+            mensal_table = LongTable(mensal_data, repeatRows=1,
+                                     colWidths=[0.8*inch, 0.8*inch, 1*inch, 1*inch, 1*inch, 0.7*inch, 0.7*inch])
+            mensal_table.setStyle(PokerExport._pdf_estilo_tabela(10, 9))
+            yield mensal_table
+            yield PageBreak()
+        
+        # Torneios mês a mês: subtotal do mês e as linhas em blocos de tamanho fixo
+        resumo_por_mes = {mes['mes']: mes for mes in resumo_mensal}
+        cabecalho = ['Data', 'Hora', 'Conta', 'Tipo', 'Buy-in', 'Ganho', 'Lucro', 'ROI']
+        larguras = [0.8*inch, 0.5*inch, 1*inch, 0.9*inch, 0.7*inch, 0.7*inch, 0.7*inch, 0.6*inch]
+        estilo_linhas = PokerExport._pdf_estilo_tabela(9, 8)
+        estilo_subtotal = PokerExport._pdf_estilo_tabela(9, 9)
+        
+        def bloco(linhas):
+            return LongTable([cabecalho] + linhas, colWidths=larguras, repeatRows=1, style=estilo_linhas)
+        
+        mes_atual = None
+        linhas = []
+        for torneio in torneios:
+            mes = torneio['data_torneio'][:7]
+            if mes != mes_atual:
+                if linhas:
+                    yield bloco(linhas)
+                    linhas = []
+                mes_atual = mes
+                yield Paragraph(f"📋 {mes[5:7]}/{mes[:4]}", heading_style)
+                if mes in resumo_por_mes:
+                    yield Table([['Mês', 'Torneios', 'Investido (R$)', 'Ganhos (R$)', 'Lucro (R$)', 'ROI (%)', 'ITM (%)'],
+                                 PokerExport._pdf_linha_mes(resumo_por_mes[mes])],
+                                colWidths=[0.8*inch, 0.8*inch, 1*inch, 1*inch, 1*inch, 0.7*inch, 0.7*inch],
+                                style=estilo_subtotal)
+                    yield Spacer(1, 10)
             
-            story.append(torneios_table)
+            linhas.append([
+                torneio['data_torneio'],
+                torneio['hora_inicio'] or '-',
+                torneio['nome_conta'][:12] + '...' if len(torneio['nome_conta']) > 12 else torneio['nome_conta'],
+                torneio['nome_tipo'][:10] + '...' if len(torneio['nome_tipo']) > 10 else torneio['nome_tipo'],
+                f"R$ {torneio['buy_in']:.2f}",
+                f"R$ {torneio['ganho_total']:.2f}",
+                f"R$ {torneio['lucro_liquido']:.2f}",
+                f"{torneio['roi']:.0f}%"
+            ])
+            if len(linhas) == linhas_por_tabela:
+                yield bloco(linhas)
+                linhas = []
+        
+        if linhas:
+            yield bloco(linhas)
         
         # Rodapé
-        story.append(Spacer(1, 30))
-        story.append(Paragraph("Dashboard Suprema Poker - Relatório gerado automaticamente", styles['Normal']))
-        
-        # Construir PDF
-        doc.build(story)
-        
-        return filepath
+        yield Spacer(1, 30)
+        yield Paragraph("Dashboard Suprema Poker - Relatório gerado automaticamente", styles['Normal'])
+    
+    @staticmethod
+    def _pdf_linha_mes(mes: Dict) -> List[str]:
+        return [
+            f"{mes['mes'][5:7]}/{mes['mes'][:4]}",
+            str(mes['total_torneios']),
+            f"R$ {mes['total_investido']:.2f}",
+            f"R$ {mes['total_ganhos']:.2f}",
+            f"R$ {mes['lucro_liquido']:.2f}",
+            f"{mes['roi']:.1f}%",
+            f"{mes['itm_percentage']:.1f}%"
+        ]
     
     @staticmethod
-    def create_backup(db_path: str, backup_dir: str = "/home/ubuntu/poker_dashboard/backups") -> str:
-        """Cria backup do banco de dados."""
+    def create_backup(db_path: str, backup_dir: str = "/home/ubuntu/poker_dashboard/backups",
+                      diretorio_shards: Optional[str] = None) -> str:
+        """Cria backup do banco de dados.
+        
+        Com `diretorio_shards` (ShardedPokerDatabase), os torneios estão nos
+        shards: o backup é um .zip com o banco principal e shards/conta_<id>.db.
+        """
         import shutil
+        import zipfile
         
         # Criar diretório de backup se não existir
         os.makedirs(backup_dir, exist_ok=True)
         
         # Nome do arquivo de backup com timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        if diretorio_shards:
+            backup_path = os.path.join(backup_dir, f"poker_dashboard_backup_{timestamp}.zip")
+            with zipfile.ZipFile(backup_path, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+                arquivo_zip.write(db_path, os.path.basename(db_path))
+                for nome in sorted(os.listdir(diretorio_shards)):
+                    if nome.endswith('.db'):
+                        arquivo_zip.write(os.path.join(diretorio_shards, nome), f"shards/{nome}")
+            return backup_path
+        
         backup_filename = f"poker_dashboard_backup_{timestamp}.db"
         backup_path = os.path.join(backup_dir, backup_filename)
         
@@ -228,13 +409,20 @@ class PokerExport:
         return backup_path
     
     @staticmethod
-    def get_download_link(filepath: str, link_text: str = "Download") -> str:
-        """Cria link de download para Streamlit."""
+    def get_download_link(filepath: str, link_text: str = "Download", host: Optional[str] = None) -> str:
+        """Cria link de download para Streamlit (`host`: cabeçalho Host do pedido, para o link assinado)."""
+        filename = os.path.basename(filepath)
+        
+        # Com a rota de download do Flask, o link é assinado e o arquivo não passa pela memória
+        downloads = PokerDownloads()
+        if downloads.url_base:
+            url = downloads.url(downloads.publicar(filepath), host)
+            return f'<a href="{url}" download="{filename}">{link_text}</a>'
+        
         with open(filepath, "rb") as f:
             bytes_data = f.read()
         
         b64 = base64.b64encode(bytes_data).decode()
-        filename = os.path.basename(filepath)
         
         # Determinar tipo MIME baseado na extensão
         if filepath.endswith('.csv'):
@@ -1,38 +1,37 @@
+import atexit
 import os
 import sys
-import subprocess
-import threading
-import time
-from flask import Flask, redirect
+from flask import Flask, Response, redirect, send_file
 from flask_cors import CORS
 
+from api import api
+from supervisor import StreamlitSupervisor
+from metrics import registry
+from downloads import PokerDownloads
+
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 app = Flask(__name__)
 CORS(app)
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+app.register_blueprint(api)
+
+# Links assinados gerados pelo Streamlit apontam para a rota /download deste processo, no
+# host pelo qual o navegador abriu o dashboard (atrás de um proxy, defina a URL completa)
+os.environ.setdefault('POKER_DOWNLOADS_URL', ':5000/download')
+downloads = PokerDownloads(url_base=os.environ['POKER_DOWNLOADS_URL'])
 
-# Variável global para controlar o processo do Streamlit
-streamlit_process = None
-
-def start_streamlit():
-    """Inicia o Streamlit em uma thread separada"""
-    global streamlit_process
-    try:
-        # Caminho para o arquivo do Streamlit
-        streamlit_file = os.path.join(os.path.dirname(__file__), 'app_final.py')
-        
-        # Comando para executar o Streamlit
-        cmd = [sys.executable, '-m', 'streamlit', 'run', streamlit_file, '--server.port=8501', '--server.address=0.0.0.0']
-        
-        # Inicia o processo do Streamlit
-        streamlit_process = subprocess.Popen(cmd, cwd=os.path.dirname(__file__))
-        
-        print("Streamlit iniciado com sucesso!")
-        
-    except Exception as e:
-        print(f"Erro ao iniciar Streamlit: {e}")
+# O dashboard assina o feed de alterações deste processo para saber quando recarregar; o
+# navegador completa o host (o mesmo do dashboard). Atrás de um proxy, defina a URL completa
+os.environ.setdefault('POKER_FEED_URL', ':5000/api/alteracoes')
+
+# Supervisor do processo do Streamlit (health check e reinício automático)
+streamlit_file = os.path.join(os.path.dirname(__file__), 'app_final.py')
+supervisor = StreamlitSupervisor(
+    [sys.executable, '-m', 'streamlit', 'run', streamlit_file, '--server.port=8501', '--server.address=0.0.0.0'],
+    cwd=os.path.dirname(__file__)
+)
 
 @app.route('/')
 def index():
@@ -41,8 +40,30 @@ def index():
 
 @app.route('/health')
 def health():
-    """Endpoint de saúde"""
-    return {'status': 'ok', 'message': 'Dashboard Suprema Poker está funcionando'}
+    """Endpoint de saúde, com o estado real do processo do Streamlit"""
+    streamlit = supervisor.status()
+    if streamlit['pronto']:
+        return {'status': 'ok', 'message': 'Dashboard Suprema Poker está funcionando', 'streamlit': streamlit}
+    return {'status': 'degraded', 'message': 'Streamlit indisponível', 'streamlit': streamlit}, 503
+
+@app.route('/metrics')
+def metrics():
+    """Métricas no formato de texto do Prometheus (Flask e Streamlit)"""
+    return Response(registry.exportar_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/download/<token>')
+def download(token):
+    """Entrega um arquivo exportado por link assinado, em blocos e com suporte a Range"""
+    artefato = downloads.verificar(token)
+    if artefato is None:
+        return {'status': 'error', 'message': 'Link de download inválido ou expirado'}, 403
+
+    caminho, nome = artefato
+    if not os.path.isfile(caminho):
+        return {'status': 'error', 'message': 'Arquivo não encontrado'}, 404
+
+    # conditional=True: ETag, If-Range e respostas 206 para Range; o corpo é lido do disco em blocos
+    return send_file(caminho, as_attachment=True, download_name=nome, conditional=True, max_age=0)
 
 @app.route('/dashboard')
 def dashboard():
@@ -50,13 +71,13 @@ def dashboard():
     return redirect('http://localhost:8501')
 
 if __name__ == '__main__':
-    # Inicia o Streamlit em uma thread separada
-    streamlit_thread = threading.Thread(target=start_streamlit)
-    streamlit_thread.daemon = True
-    streamlit_thread.start()
+    # Inicia o Streamlit sob supervisão e encerra junto com o Flask
+    supervisor.start()
+    atexit.register(supervisor.stop)
     
-    # Aguarda um pouco para o Streamlit iniciar
-    time.sleep(3)
+    # Aguarda o health check do Streamlit em vez de um tempo fixo
+    if not supervisor.aguardar_pronto(timeout=60):
+        print("Streamlit ainda não respondeu; iniciando o Flask mesmo assim")
     
     # Inicia o Flask
     app.run(host='0.0.0.0', port=5000, debug=False)
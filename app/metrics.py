@@ -0,0 +1,260 @@
+import atexit
+import bisect
+import functools
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+# Limites superiores dos buckets de latência, em segundos
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS_DIR = os.environ.get(
+    'POKER_METRICS_DIR',
+    os.path.join(tempfile.gettempdir(), 'poker_dashboard_metrics')
+)
+
+class MetricsRegistry:
+    """Histogramas de latência, contagem de linhas e hits/misses de cache.
+
+    Cada processo (Flask e Streamlit) grava periodicamente um snapshot em
+    METRICS_DIR; o /metrics do Flask soma os snapshots de todos os processos vivos.
+    """
+
+    def __init__(self, diretorio: Optional[str] = METRICS_DIR, intervalo_flush: float = 5.0):
+        self.diretorio = diretorio
+        self.intervalo_flush = intervalo_flush
+        self._histogramas = {}
+        self._linhas = {}
+        self._erros = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._ultimo_flush = time.monotonic()
+
+    def observar(self, camada: str, metodo: str, duracao: float):
+        """Registra a latência de uma chamada."""
+        chave = (camada, metodo)
+        indice = bisect.bisect_left(BUCKETS, duracao)
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                # [contagem por bucket..., +Inf, soma]
+                histograma = self._histogramas[chave] = [0] * (len(BUCKETS) + 1) + [0.0]
+            histograma[indice] += 1
+            histograma[-1] += duracao
+        self._talvez_flush()
+
+    def contar_linhas(self, camada: str, metodo: str, linhas: int):
+        """Acumula a quantidade de linhas retornadas por um método."""
+        chave = (camada, metodo)
+        with self._lock:
+            self._linhas[chave] = self._linhas.get(chave, 0) + linhas
+
+    def contar_erro(self, camada: str, metodo: str):
+        """Conta uma exceção propagada por um método."""
+        chave = (camada, metodo)
+        with self._lock:
+            self._erros[chave] = self._erros.get(chave, 0) + 1
+
+    def registrar_cache(self, cache: str, hit: bool):
+        """Conta um hit ou miss de cache."""
+        chave = (cache, 'hit' if hit else 'miss')
+        with self._lock:
+            self._cache[chave] = self._cache.get(chave, 0) + 1
+        self._talvez_flush()
+
+    def snapshot(self) -> Dict:
+        """Cópia serializável dos valores atuais."""
+        with self._lock:
+            return {
+                'histogramas': {'|'.join(k): list(v) for k, v in self._histogramas.items()},
+                'linhas': {'|'.join(k): v for k, v in self._linhas.items()},
+                'erros': {'|'.join(k): v for k, v in self._erros.items()},
+                'cache': {'|'.join(k): v for k, v in self._cache.items()}
+            }
+
+    def _talvez_flush(self):
+        if self.diretorio and time.monotonic() - self._ultimo_flush >= self.intervalo_flush:
+            self.flush()
+
+    def flush(self):
+        """Grava o snapshot deste processo em METRICS_DIR (escrita atômica)."""
+        if not self.diretorio:
+            return
+        self._ultimo_flush = time.monotonic()
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            destino = os.path.join(self.diretorio, f"{os.getpid()}.json")
+            temporario = f"{destino}.tmp"
+            with open(temporario, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temporario, destino)
+        except OSError:
+            pass  # Métricas nunca devem derrubar a aplicação
+
+    def _snapshots_de_outros_processos(self) -> List[Dict]:
+        snapshots = []
+        if not self.diretorio or not os.path.isdir(self.diretorio):
+            return snapshots
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith('.json'):
+                continue
+            pid = int(nome[:-5]) if nome[:-5].isdigit() else None
+            if pid is None or pid == os.getpid():
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                # Processo morto: o snapshot não será mais atualizado
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
+                continue
+            except PermissionError:
+                pass
+            try:
+                with open(caminho) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def exportar_prometheus(self, incluir_outros_processos: bool = True) -> str:
+        """Formato texto de exposição do Prometheus, somando todos os processos."""
+        snapshots = [self.snapshot()]
+        if incluir_outros_processos:
+            snapshots += self._snapshots_de_outros_processos()
+
+        total = {'histogramas': {}, 'linhas': {}, 'erros': {}, 'cache': {}}
+        for snapshot in snapshots:
+            for chave, valores in snapshot.get('histogramas', {}).items():
+                atual = total['histogramas'].setdefault(chave, [0] * len(valores))
+                for i, valor in enumerate(valores):
+                    atual[i] += valor
+            for grupo in ('linhas', 'erros', 'cache'):
+                for chave, valor in snapshot.get(grupo, {}).items():
+                    total[grupo][chave] = total[grupo].get(chave, 0) + valor
+
+        linhas = [
+            '# HELP poker_latencia_segundos Latência das chamadas por camada e método.',
+            '# TYPE poker_latencia_segundos histogram'
+        ]
+        for chave in sorted(total['histogramas']):
+            camada, metodo = chave.split('|', 1)
+            rotulos = f'camada="{camada}",metodo="{metodo}"'
+            valores = total['histogramas'][chave]
+            acumulado = 0
+            for limite, contagem in zip(BUCKETS, valores):
+                acumulado += contagem
+                linhas.append(f'poker_latencia_segundos_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+            acumulado += valores[len(BUCKETS)]
+            linhas.append(f'poker_latencia_segundos_bucket{{{rotulos},le="+Inf"}} {acumulado}')
+            linhas.append(f'poker_latencia_segundos_sum{{{rotulos}}} {valores[-1]}')
+            linhas.append(f'poker_latencia_segundos_count{{{rotulos}}} {acumulado}')
+
+        linhas += [
+            '# HELP poker_linhas_total Linhas retornadas por camada e método.',
+            '# TYPE poker_linhas_total counter'
+        ]
+        for chave in sorted(total['linhas']):
+            camada, metodo = chave.split('|', 1)
+            linhas.append(f'poker_linhas_total{{camada="{camada}",metodo="{metodo}"}} {total["linhas"][chave]}')
+
+        linhas += [
+            '# HELP poker_erros_total Exceções propagadas por camada e método.',
+            '# TYPE poker_erros_total counter'
+        ]
+        for chave in sorted(total['erros']):
+            camada, metodo = chave.split('|', 1)
+            linhas.append(f'poker_erros_total{{camada="{camada}",metodo="{metodo}"}} {total["erros"][chave]}')
+
+        linhas += [
+            '# HELP poker_cache_total Consultas a caches por resultado (hit ou miss).',
+            '# TYPE poker_cache_total counter'
+        ]
+        for chave in sorted(total['cache']):
+            cache, resultado = chave.split('|', 1)
+            linhas.append(f'poker_cache_total{{cache="{cache}",resultado="{resultado}"}} {total["cache"][chave]}')
+
+        return '\n'.join(linhas) + '\n'
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+
+
+def _medir(camada: str, metodo: str, funcao):
+    @functools.wraps(funcao)
+    def medido(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            resultado = funcao(*args, **kwargs)
+        except Exception:
+            registry.contar_erro(camada, metodo)
+            registry.observar(camada, metodo, time.perf_counter() - inicio)
+            raise
+        # Métodos *_async são medidos até o Future concluir; geradores, até o fim da iteração
+        if isinstance(resultado, Future):
+            resultado.add_done_callback(lambda futuro: _concluir(camada, metodo, futuro, inicio))
+            return resultado
+        if inspect.isgenerator(resultado):
+            return _percorrer(camada, metodo, resultado, time.perf_counter() - inicio)
+        registry.observar(camada, metodo, time.perf_counter() - inicio)
+        if isinstance(resultado, Sequence) and not isinstance(resultado, str):
+            registry.contar_linhas(camada, metodo, len(resultado))
+        return resultado
+    return medido
+
+
+def _concluir(camada: str, metodo: str, futuro: Future, inicio: float):
+    registry.observar(camada, metodo, time.perf_counter() - inicio)
+    if futuro.cancelled() or futuro.exception() is not None:
+        registry.contar_erro(camada, metodo)
+    elif isinstance(futuro.result(), Sequence) and not isinstance(futuro.result(), str):
+        registry.contar_linhas(camada, metodo, len(futuro.result()))
+
+
+def _percorrer(camada: str, metodo: str, gerador, duracao: float):
+    """Repassa os itens do gerador somando o tempo gasto dentro dele; registra ao terminar ou ser fechado."""
+    linhas = 0
+    try:
+        while True:
+            inicio = time.perf_counter()
+            try:
+                item = next(gerador)
+            except StopIteration:
+                return
+            except Exception:
+                registry.contar_erro(camada, metodo)
+                raise
+            finally:
+                duracao += time.perf_counter() - inicio
+            linhas += 1
+            yield item
+    finally:
+        gerador.close()
+        registry.observar(camada, metodo, duracao)
+        registry.contar_linhas(camada, metodo, linhas)
+
+
+def instrumentar(camada: str):
+    """Decorador de classe: mede latência e linhas de todos os métodos públicos."""
+    def decorar(cls):
+        for nome, atributo in list(vars(cls).items()):
+            if nome.startswith('_'):
+                continue
+            if isinstance(atributo, staticmethod):
+                setattr(cls, nome, staticmethod(_medir(camada, nome, atributo.__func__)))
+            elif isinstance(atributo, classmethod):
+                setattr(cls, nome, classmethod(_medir(camada, nome, atributo.__func__)))
+            elif callable(atributo):
+                setattr(cls, nome, _medir(camada, nome, atributo))
+        return cls
+    return decorar
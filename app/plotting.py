@@ -1,14 +1,15 @@
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
 from calculations import PokerCalculations
+from metrics import instrumentar
 
+@instrumentar('plotting')
 class PokerPlotting:
     
     @staticmethod
-    def create_roi_evolution_chart(torneios: List[Dict]) -> go.Figure:
+    def create_roi_evolution_chart(torneios: List[Dict], roi_evolution: Optional[List[Dict]] = None) -> go.Figure:
         """Cria gráfico de evolução do ROI ao longo do tempo."""
         if not torneios:
             fig = go.Figure()
@@ -20,8 +21,9 @@ class PokerPlotting:
             )
             return fig
         
-        calc = PokerCalculations()
-        roi_evolution = calc.get_roi_evolution(torneios)
+        if roi_evolution is None:
+            calc = PokerCalculations()
+            roi_evolution = calc.get_roi_evolution(torneios)
         
         df = pd.DataFrame(roi_evolution)
         df['data'] = pd.to_datetime(df['data'])
@@ -166,7 +168,7 @@ class PokerPlotting:
         return fig
     
     @staticmethod
-    def create_monthly_performance_chart(torneios: List[Dict]) -> go.Figure:
+    def create_monthly_performance_chart(torneios: List[Dict], monthly_data: Optional[List[Dict]] = None) -> go.Figure:
         """Cria gráfico de performance mensal."""
         if not torneios:
             fig = go.Figure()
@@ -178,8 +180,9 @@ class PokerPlotting:
             )
             return fig
         
-        calc = PokerCalculations()
-        monthly_data = calc.get_performance_by_period(torneios, 'monthly')
+        if monthly_data is None:
+            calc = PokerCalculations()
+            monthly_data = calc.get_performance_by_period(torneios, 'monthly')
         
         if not monthly_data:
             fig = go.Figure()
@@ -337,7 +340,8 @@ class PokerPlotting:
         return fig
     
     @staticmethod
-    def create_bankroll_evolution_chart(torneios: List[Dict], bankroll_inicial: float = 0) -> go.Figure:
+    def create_bankroll_evolution_chart(torneios: List[Dict], bankroll_inicial: float = 0,
+                                        roi_evolution: Optional[List[Dict]] = None) -> go.Figure:
         """Cria gráfico de evolução do bankroll."""
         if not torneios:
             fig = go.Figure()
@@ -349,18 +353,23 @@ class PokerPlotting:
             )
             return fig
         
-        # Ordenar por data
-        torneios_sorted = sorted(torneios, key=lambda x: x['data_torneio'])
-        
-        # Calcular evolução do bankroll
-        datas = []
-        bankroll_values = []
-        bankroll_atual = bankroll_inicial
-        
-        for torneio in torneios_sorted:
-            bankroll_atual += torneio['lucro_liquido']
-            datas.append(pd.to_datetime(torneio['data_torneio']))
-            bankroll_values.append(bankroll_atual)
+        if roi_evolution is not None:
+            # Evolução já calculada: bankroll = inicial + lucro acumulado
+            datas = pd.to_datetime([p['data'] for p in roi_evolution])
+            bankroll_values = [bankroll_inicial + p['lucro_acumulado'] for p in roi_evolution]
+        else:
+            # Ordenar por data
+            torneios_sorted = sorted(torneios, key=lambda x: x['data_torneio'])
+            
+            # Calcular evolução do bankroll
+            datas = []
+            bankroll_values = []
+            bankroll_atual = bankroll_inicial
+            
+            for torneio in torneios_sorted:
+                bankroll_atual += torneio['lucro_liquido']
+                datas.append(pd.to_datetime(torneio['data_torneio']))
+                bankroll_values.append(bankroll_atual)
         
         fig = go.Figure()
         
@@ -401,3 +410,129 @@ class PokerPlotting:
         
         return fig
 
+    
+    @staticmethod
+    def create_rolling_metrics_chart(torneios: List[Dict], janelas: Optional[List[int]] = None,
+                                     por: str = 'torneios') -> go.Figure:
+        """Cria gráfico de ROI, ITM e ABI em janelas móveis."""
+        if not torneios:
+            fig = go.Figure()
+            fig.add_annotation(
+                text="Nenhum dado disponível",
+                xref="paper", yref="paper",
+                x=0.5, y=0.5, xanchor='center', yanchor='middle',
+                showarrow=False, font=dict(size=16)
+            )
+            return fig
+        
+        janelas = janelas or [100, 500, 1000]
+        calc = PokerCalculations()
+        cores = ['#3b82f6', '#8b5cf6', '#10b981', '#f59e0b', '#ef4444']
+        sufixo = 'dias' if por == 'dias' else 'torneios'
+        
+        fig = make_subplots(
+            rows=3, cols=1,
+            subplot_titles=('ROI Móvel (%)', 'ITM Móvel (%)', 'ABI Móvel (R$)'),
+            vertical_spacing=0.08,
+            shared_xaxes=True
+        )
+        
+        possui_dados = False
+        for i, janela in enumerate(janelas):
+            df = pd.DataFrame(calc.get_rolling_metrics(torneios, janela, por))
+            # Mostrar apenas pontos com a janela completa
+            df = df[df['janela_completa']]
+            if df.empty:
+                continue
+            
+            possui_dados = True
+            cor = cores[i % len(cores)]
+            # Por quantidade o eixo é o número do torneio; por dias, a data
+            eixo_x = pd.to_datetime(df['data']) if por == 'dias' else df.index + 1
+            
+            for linha, coluna in enumerate(['roi', 'itm_percentage', 'abi'], 1):
+                fig.add_trace(
+                    go.Scatter(
+                        x=eixo_x,
+                        y=df[coluna],
+                        mode='lines',
+                        name=f'Últimos {janela} {sufixo}',
+                        legendgroup=str(janela),
+                        showlegend=linha == 1,
+                        line=dict(color=cor, width=2)
+                    ),
+                    row=linha, col=1
+                )
+        
+        if not possui_dados:
+            fig = go.Figure()
+            fig.add_annotation(
+                text="Dados insuficientes para as janelas selecionadas",
+                xref="paper", yref="paper",
+                x=0.5, y=0.5, xanchor='center', yanchor='middle',
+                showarrow=False, font=dict(size=16)
+            )
+            return fig
+        
+        fig.update_layout(
+            title={
+                'text': '🔄 Métricas em Janela Móvel',
+                'x': 0.5,
+                'xanchor': 'center',
+                'font': {'size': 20}
+            },
+            template='plotly_white',
+            height=700,
+            hovermode='x unified',
+            showlegend=True
+        )
+        
+        # Linha de referência no zero para o ROI
+        fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5, row=1, col=1)
+        fig.update_xaxes(title_text='Data' if por == 'dias' else 'Torneio nº', row=3, col=1)
+        
+        return fig
+    
+    @staticmethod
+    def create_rerun_waterfall_chart(spans: List[Dict]) -> go.Figure:
+        """Cria gráfico em cascata com o tempo de cada seção de um rerun."""
+        if not spans:
+            fig = go.Figure()
+            fig.add_annotation(
+                text="Nenhuma seção medida",
+                xref="paper", yref="paper",
+                x=0.5, y=0.5, xanchor='center', yanchor='middle',
+                showarrow=False, font=dict(size=16)
+            )
+            return fig
+        
+        df = pd.DataFrame(spans)
+        
+        fig = go.Figure(data=[
+            go.Bar(
+                y=df['secao'],
+                x=df['duracao_ms'],
+                base=df['inicio_ms'],
+                orientation='h',
+                marker_color='#3b82f6',
+                text=[f'{x:.0f} ms' for x in df['duracao_ms']],
+                textposition='auto',
+                customdata=['-' if pd.isna(v) else int(v) for v in df['linhas']],
+                hovertemplate='<b>%{y}</b><br>' +
+                             'Início: %{base:.0f} ms<br>' +
+                             'Duração: %{x:.1f} ms<br>' +
+                             'Linhas: %{customdata}<br>' +
+                             '<extra></extra>'
+            )
+        ])
+        
+        fig.update_layout(
+            xaxis_title='Tempo desde o início do rerun (ms)',
+            yaxis=dict(autorange='reversed'),
+            template='plotly_white',
+            height=max(250, 28 * len(df)),
+            margin=dict(l=10, r=10, t=10, b=10),
+            showlegend=False
+        )
+        
+        return fig
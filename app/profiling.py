@@ -0,0 +1,98 @@
+import cProfile
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Optional
+
+class _Span:
+    __slots__ = ('nome', 'inicio', 'duracao', 'linhas')
+
+    def __init__(self, nome: str, inicio: float, linhas: Optional[int] = None):
+        self.nome = nome
+        self.inicio = inicio
+        self.duracao = 0.0
+        self.linhas = linhas
+
+
+# Profilers com cProfile ligado que ainda não passaram por finalizar()
+_pendentes = set()
+_pendentes_lock = threading.Lock()
+
+
+class RerunProfiler:
+    """Mede o tempo de cada seção de um rerun do dashboard (modo de depuração).
+
+    Desativado, secao() não mede nada e custa apenas um yield.
+
+    Um rerun interrompido (st.rerun, st.stop ou uma nova interação) não chega
+    ao finalizar() do fim do script. O próximo profiler criado na mesma thread,
+    ou depois que a thread do interrompido terminou, encerra o cProfile que
+    ficou ligado e grava o que ele mediu.
+    """
+
+    def __init__(self, ativo: bool = False, cprofile_dir: Optional[str] = None):
+        self.ativo = ativo
+        self.cprofile_dir = cprofile_dir if ativo else None
+        self.spans = []
+        self._inicio = time.perf_counter()
+        self._profile = None
+
+        if self.cprofile_dir:
+            self._encerrar_interrompidos()
+            self._thread = threading.current_thread()
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            with _pendentes_lock:
+                _pendentes.add(self)
+
+    @staticmethod
+    def _encerrar_interrompidos():
+        atual = threading.current_thread()
+        with _pendentes_lock:
+            interrompidos = [p for p in _pendentes if p._thread is atual or not p._thread.is_alive()]
+        for profiler in interrompidos:
+            profiler.finalizar()
+
+    @contextmanager
+    def secao(self, nome: str, linhas: Optional[int] = None):
+        """Span de tempo de uma seção; o span permite informar `linhas` processadas."""
+        if not self.ativo:
+            yield _Span(nome, 0.0)
+            return
+        span = _Span(nome, time.perf_counter() - self._inicio, linhas)
+        try:
+            yield span
+        finally:
+            span.duracao = time.perf_counter() - self._inicio - span.inicio
+            self.spans.append(span)
+
+    def total(self) -> float:
+        """Tempo decorrido desde o início do rerun, em segundos."""
+        return time.perf_counter() - self._inicio
+
+    def get_spans(self) -> List[Dict]:
+        """Spans do rerun em ordem de início, com tempos em milissegundos."""
+        return [{
+            'secao': span.nome,
+            'inicio_ms': span.inicio * 1000,
+            'duracao_ms': span.duracao * 1000,
+            'linhas': span.linhas
+        } for span in sorted(self.spans, key=lambda s: s.inicio)]
+
+    def finalizar(self) -> Optional[str]:
+        """Encerra o cProfile (se ativo) e grava o arquivo .prof. Retorna o caminho."""
+        with _pendentes_lock:
+            _pendentes.discard(self)
+            profile, self._profile = self._profile, None
+        if profile is None:
+            return None
+        profile.disable()
+        os.makedirs(self.cprofile_dir, exist_ok=True)
+        caminho = os.path.join(
+            self.cprofile_dir,
+            f"rerun_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.prof"
+        )
+        profile.dump_stats(caminho)
+        return caminho
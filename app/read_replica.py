@@ -0,0 +1,87 @@
+import itertools
+import sqlite3
+import threading
+from typing import Optional
+
+_geracoes = itertools.count()
+
+class SQLiteReadReplica:
+    """Réplica em memória do banco em disco, para leituras.
+
+    A cópia é feita com a API de backup do sqlite3 e refeita quando o
+    PRAGMA data_version do arquivo muda (escrita de outra conexão ou processo).
+    Cada cópia é um banco em memória novo (shared cache com nome próprio):
+    conexões abertas na cópia anterior continuam lendo dela até serem
+    fechadas, então uma atualização nunca bloqueia leitores em andamento.
+    Se o arquivo estiver travado por uma escrita, a verificação não espera e
+    a leitura usa a cópia atual; invalidar() força a cópia na próxima leitura.
+    """
+
+    def __init__(self, db_path: str, timeout_verificacao: float = 0.0,
+                 fabrica_conexao: type = sqlite3.Connection):
+        self.db_path = db_path
+        self.fabrica_conexao = fabrica_conexao
+        self.timeout_verificacao = timeout_verificacao
+        self.atualizacoes = 0
+
+        self._uri = None
+        self._ancora = None  # mantém viva a cópia atual
+        self._versao = None
+        self._pendente = False
+        self._monitor = None
+        self._lock = threading.Lock()
+
+        self.atualizar()
+
+    def conectar(self) -> sqlite3.Connection:
+        """Conexão de leitura na cópia mais recente (atualiza antes, se o disco mudou)."""
+        with self._lock:
+            if self._pendente or self._versao_disco() != self._versao:
+                self._copiar()
+            uri = self._uri
+        return sqlite3.connect(uri, uri=True, factory=self.fabrica_conexao)
+
+    def invalidar(self):
+        """Marca a cópia como desatualizada (chamado após escritas deste processo)."""
+        self._pendente = True
+
+    def atualizar(self):
+        """Refaz a cópia a partir do disco."""
+        with self._lock:
+            self._copiar()
+
+    def fechar(self):
+        with self._lock:
+            for conexao in (self._ancora, self._monitor):
+                if conexao is not None:
+                    conexao.close()
+            self._ancora = self._monitor = None
+
+    def _versao_disco(self) -> Optional[int]:
+        # data_version só muda com escritas de outras conexões; o monitor nunca escreve
+        if self._monitor is None:
+            self._monitor = sqlite3.connect(self.db_path, timeout=self.timeout_verificacao, check_same_thread=False)
+        try:
+            return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.OperationalError:
+            # Disco ocupado além do timeout: segue com a cópia atual
+            return self._versao
+
+    def _copiar(self):
+        uri = f"file:poker_replica_{next(_geracoes)}?mode=memory&cache=shared"
+        ancora = sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+        # Versão e pendência são lidas antes da cópia: uma escrita durante o backup força nova cópia
+        self._pendente = False
+        versao = self._versao_disco()
+        origem = sqlite3.connect(self.db_path)
+        try:
+            origem.backup(ancora)
+        finally:
+            origem.close()
+
+        anterior = self._ancora
+        self._uri, self._ancora, self._versao = uri, ancora, versao
+        self.atualizacoes += 1
+        if anterior is not None:
+            anterior.close()
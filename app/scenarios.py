@@ -0,0 +1,159 @@
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from metrics import registry
+from tournament_set import TournamentSet
+
+# Chaves aceitas na definição de um cenário
+CHAVES_CENARIO = ('nome', 'contas', 'excluir_contas', 'tipos', 'excluir_tipos', 'buy_in_min', 'buy_in_max',
+                  'data_inicio', 'data_fim', 'multiplicador', 'multiplicadores')
+
+# Elementos (cenários x torneios) por bloco: limita a memória das matrizes intermediárias
+MAX_ELEMENTOS_BLOCO = 2_000_000
+
+
+def _dias(data: str) -> int:
+    return int(np.datetime64(str(data)[:10], 'D').astype(np.int64))
+
+
+class PokerScenarios:
+    """Cenários "e se" avaliados juntos sobre os arrays de um TournamentSet.
+
+    Cada cenário é um dicionário com filtros (contas, tipos, faixa de buy-in,
+    período), contas ou tipos excluídos e multiplicadores de stake (global ou
+    por tipo, aplicados ao buy-in e ao ganho). Os cenários viram uma máscara
+    (quem está no cenário) e uma matriz de pesos (cenários x torneios, com o
+    multiplicador de stake) e lucro, investido, ITM e maior downswing de todos
+    saem de produtos matriciais e de uma soma acumulada na linha do tempo, sem
+    refazer a consulta nem o cálculo torneio a torneio para cada cenário.
+
+    `contas` e `tipos` são os nomes cadastrados (aceitos nos cenários mesmo sem
+    torneios no filtro); por padrão, só os que aparecem nos torneios.
+    """
+
+    def __init__(self, torneios: TournamentSet, contas: Optional[Iterable[str]] = None,
+                 tipos: Optional[Iterable[str]] = None):
+        # Linha do tempo (data e id), na mesma ordem do estado analítico
+        self.torneios = torneios.sort_by_date()
+        self.lucro = self.torneios.lucro_liquido
+        self.itm = (self.torneios.ganho_total > 0).astype(np.float64)
+        self.contas = set(self.torneios.nomes_contas).union(contas or ())
+        self.tipos = set(self.torneios.nomes_tipos).union(tipos or ())
+
+    def validar(self, cenario: Dict) -> Dict:
+        """Confere as chaves, os nomes e os valores de um cenário; erros viram ValueError."""
+        desconhecidas = set(cenario) - set(CHAVES_CENARIO)
+        if desconhecidas:
+            raise ValueError(f"Chaves desconhecidas no cenário: {', '.join(sorted(desconhecidas))}")
+        for chave in ('contas', 'excluir_contas', 'tipos', 'excluir_tipos'):
+            if cenario.get(chave) is not None and (isinstance(cenario[chave], str)
+                                                   or not isinstance(cenario[chave], (list, tuple, set))
+                                                   or not all(isinstance(nome, str) for nome in cenario[chave])):
+                raise ValueError(f"'{chave}' deve ser uma lista de nomes")
+        if not isinstance(cenario.get('multiplicadores') or {}, dict):
+            raise ValueError("'multiplicadores' deve mapear tipo de torneio para fator")
+        for chave, conhecidos in (('contas', self.contas), ('excluir_contas', self.contas), ('tipos', self.tipos),
+                                  ('excluir_tipos', self.tipos), ('multiplicadores', self.tipos)):
+            desconhecidos = set(cenario.get(chave) or ()) - conhecidos
+            if desconhecidos:
+                raise ValueError(f"Nomes desconhecidos em '{chave}': {', '.join(sorted(map(str, desconhecidos)))}")
+        for chave in ('buy_in_min', 'buy_in_max'):
+            if cenario.get(chave) is not None:
+                float(cenario[chave])
+        fatores = [self._multiplicador(cenario)] + list((cenario.get('multiplicadores') or {}).values())
+        if any(float(fator) < 0 for fator in fatores):
+            raise ValueError("Multiplicador de stake negativo")
+        for chave in ('data_inicio', 'data_fim'):
+            if cenario.get(chave):
+                _dias(cenario[chave])
+        return cenario
+
+    def _tabela(self, nomes: List[str], incluir: Optional[Iterable[str]], excluir: Optional[Iterable[str]]) -> np.ndarray:
+        """Tabela por código (conta ou tipo) dizendo quem entra no cenário."""
+        permitidos = np.ones(len(nomes), dtype=bool)
+        if incluir is not None:
+            incluir = set(incluir)
+            permitidos = np.array([nome in incluir for nome in nomes], dtype=bool)
+        if excluir:
+            excluir = set(excluir)
+            permitidos &= np.array([nome not in excluir for nome in nomes], dtype=bool)
+        return permitidos
+
+    @staticmethod
+    def _multiplicador(cenario: Dict) -> float:
+        # Multiplicador 0 é válido (stake zerada): só a ausência vale 1
+        return 1.0 if cenario.get('multiplicador') is None else float(cenario['multiplicador'])
+
+    def mascara(self, cenario: Dict) -> np.ndarray:
+        """Torneios que entram no cenário (filtros e exclusões, independente da stake)."""
+        t = self.torneios
+        mascara = self._tabela(t.nomes_contas, cenario.get('contas'), cenario.get('excluir_contas'))[t.codigos_conta]
+        mascara &= self._tabela(t.nomes_tipos, cenario.get('tipos'), cenario.get('excluir_tipos'))[t.codigos_tipo]
+        if cenario.get('buy_in_min') is not None:
+            mascara &= t.buy_in >= float(cenario['buy_in_min'])
+        if cenario.get('buy_in_max') is not None:
+            mascara &= t.buy_in <= float(cenario['buy_in_max'])
+        if cenario.get('data_inicio'):
+            mascara &= t.dias >= _dias(cenario['data_inicio'])
+        if cenario.get('data_fim'):
+            mascara &= t.dias <= _dias(cenario['data_fim'])
+        return mascara
+
+    def pesos(self, cenario: Dict, mascara: Optional[np.ndarray] = None) -> np.ndarray:
+        """Peso de cada torneio no cenário: 0 fora dele, senão o multiplicador de stake (que também pode ser 0)."""
+        t = self.torneios
+        fatores = np.full(len(t.nomes_tipos), self._multiplicador(cenario))
+        for nome, fator in (cenario.get('multiplicadores') or {}).items():
+            codigo = t.codigo_tipo(nome)
+            # Tipo cadastrado sem torneios no filtro: não há o que multiplicar
+            if codigo is not None:
+                fatores[codigo] *= float(fator)
+        return np.where(self.mascara(cenario) if mascara is None else mascara, fatores[t.codigos_tipo], 0.0)
+
+    def avaliar(self, cenarios: List[Dict]) -> List[Dict]:
+        """Torneios, investido, ganhos, lucro, ROI, ITM e maior downswing de cada cenário."""
+        inicio = time.perf_counter()
+        cenarios = [dict(self.validar(cenario), nome=cenario.get('nome') or f"Cenário {i + 1}")
+                    for i, cenario in enumerate(cenarios)]
+        n = len(self.torneios)
+        tamanho_bloco = max(1, MAX_ELEMENTOS_BLOCO // max(n, 1))
+
+        resultados = []
+        for inicio_bloco in range(0, len(cenarios), tamanho_bloco):
+            bloco = cenarios[inicio_bloco:inicio_bloco + tamanho_bloco]
+            dentro = np.array([self.mascara(cenario) for cenario in bloco]).reshape(len(bloco), n)
+            pesos = np.array([self.pesos(cenario, mascara) for cenario, mascara in zip(bloco, dentro)]).reshape(len(bloco), n)
+            resultados.extend(self._avaliar_bloco(bloco, dentro, pesos))
+
+        registry.observar('cenarios', 'avaliar', time.perf_counter() - inicio)
+        return resultados
+
+    def _avaliar_bloco(self, bloco: List[Dict], dentro: np.ndarray, pesos: np.ndarray) -> List[Dict]:
+        total_torneios = dentro.sum(axis=1)
+        investido = pesos @ self.torneios.buy_in
+        lucro = pesos @ self.lucro
+        itm = dentro @ self.itm
+
+        # Saldo acumulado só nos torneios do cenário; o pico começa no primeiro deles
+        saldo = np.cumsum(pesos * self.lucro, axis=1)
+        saldo[~dentro] = np.nan
+        pico = np.fmax.accumulate(saldo, axis=1)
+        quedas = pico - saldo
+        quedas[~dentro] = 0.0
+        maior_downswing = quedas.max(axis=1) if quedas.shape[1] else np.zeros(len(bloco))
+
+        return [
+            {
+                "nome": cenario['nome'],
+                "total_torneios": int(total_torneios[i]),
+                "total_investido": float(investido[i]),
+                "total_ganhos": float(investido[i] + lucro[i]),
+                "lucro_liquido": float(lucro[i]),
+                "roi": float(lucro[i] / investido[i] * 100) if investido[i] > 0 else 0,
+                "itm_percentage": float(itm[i] / total_torneios[i] * 100) if total_torneios[i] else 0,
+                "maior_downswing": float(maior_downswing[i])
+            }
+            for i, cenario in enumerate(bloco)
+        ]
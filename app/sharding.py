@@ -0,0 +1,554 @@
+import heapq
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from database import PokerDatabase, COLUNAS_COPIA, DIMENSOES_CUBO, erro_arquivado, totais_cubo
+from calculations import PokerCalculations
+from metrics import instrumentar
+
+# Os ids de cada shard começam em id_conta * FAIXA_IDS: o id identifica a conta (e o arquivo)
+FAIXA_IDS = 10 ** 12
+
+@instrumentar('database')
+class ShardedPokerDatabase(PokerDatabase):
+    """PokerDatabase com um arquivo (shard) por conta, com a mesma API.
+
+    O banco principal guarda contas e tipos de torneio. Cada shard
+    (shards/conta_<id>.db) é um PokerDatabase completo com os torneios de uma
+    conta e sua própria fila de escrita, então escritas em contas diferentes
+    não disputam o mesmo lock. Consultas com id_conta vão direto ao shard; sem
+    id_conta rodam em paralelo em todos os shards (o sqlite3 libera o GIL
+    durante a consulta) e os agregados parciais são combinados.
+    """
+
+    def __init__(self, db_path: str = "poker_dashboard.db", replica_memoria: bool = False,
+                 diretorio_shards: Optional[str] = None, max_threads: Optional[int] = None,
+                 snapshot_binario: bool = False, rastrear_sql: bool = False, chave_natural: bool = False):
+        super().__init__(db_path, replica_memoria, snapshot_binario=snapshot_binario, rastrear_sql=rastrear_sql,
+                         chave_natural=chave_natural)
+        self.replica_memoria = replica_memoria
+        self.diretorio_shards = diretorio_shards or os.path.join(
+            os.path.dirname(os.path.abspath(db_path)), 'shards'
+        )
+        os.makedirs(self.diretorio_shards, exist_ok=True)
+
+        self._shards = {}
+        self._shards_lock = threading.Lock()
+        # Contas e tipos copiados por último para os shards, e o data_version do banco
+        # principal em que foram lidos (só muda quando outra conexão grava nele)
+        self._cadastros = None
+        self._versao_cadastros = None
+        self._conexao_cadastros = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._cadastros_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_threads or min(32, (os.cpu_count() or 1) + 4),
+                                        thread_name_prefix='shard')
+
+        self._migrar_torneios()
+
+    # Shards
+
+    def _shard(self, id_conta: int, conferir: bool = True) -> PokerDatabase:
+        """Shard da conta, criado na primeira vez com contas e tipos copiados do banco principal."""
+        cadastros = self._conferir_cadastros() if conferir else self._cadastros
+        with self._shards_lock:
+            shard = self._shards.get(id_conta)
+            if shard is None:
+                caminho = os.path.join(self.diretorio_shards, f"conta_{id_conta}.db")
+                shard = PokerDatabase(caminho, self.replica_memoria, rastrear_sql=self.rastrear_sql,
+                                      chave_natural=self.chave_natural)
+                self._sincronizar(shard, id_conta, cadastros)
+                if shard.replica is not None:
+                    shard.replica.atualizar()
+                self._shards[id_conta] = shard
+            return shard
+
+    def _conferir_cadastros(self) -> Tuple[List, List]:
+        """Contas e tipos do banco principal; se mudaram desde a última cópia, copia de novo
+        para os shards abertos (um tipo novo sumiria do JOIN com tipos_torneio do shard).
+
+        Com os torneios nos shards, o banco principal só muda com contas e tipos: o
+        PRAGMA data_version de uma conexão mantida aberta diz se é preciso reler.
+        """
+        with self._cadastros_lock:
+            versao = self._conexao_cadastros.execute("PRAGMA data_version").fetchone()[0]
+            if versao == self._versao_cadastros:
+                return self._cadastros
+            cadastros = (
+                self._conexao_cadastros.execute(
+                    "SELECT id_conta, nome_conta, email FROM contas ORDER BY nome_conta").fetchall(),
+                self._conexao_cadastros.execute(
+                    "SELECT id_tipo_torneio, nome_tipo FROM tipos_torneio ORDER BY id_tipo_torneio").fetchall()
+            )
+
+            with self._shards_lock:
+                if cadastros != self._cadastros:
+                    for shard in self._shards.values():
+                        self._copiar_cadastros(shard, cadastros)
+                        if shard.replica is not None:
+                            shard.replica.atualizar()
+                    self._cadastros = cadastros
+            self._versao_cadastros = versao
+            return cadastros
+
+    @staticmethod
+    def _copiar_cadastros(shard: PokerDatabase, cadastros: Tuple[List, List]):
+        contas, tipos = cadastros
+        conn = shard.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany("INSERT OR REPLACE INTO contas (id_conta, nome_conta, email) VALUES (?, ?, ?)", contas)
+        cursor.executemany("INSERT OR REPLACE INTO tipos_torneio (id_tipo_torneio, nome_tipo) VALUES (?, ?)", tipos)
+        conn.commit()
+        conn.close()
+
+    def _sincronizar(self, shard: PokerDatabase, id_conta: int, cadastros: Tuple[List, List]):
+        """Espelha contas e tipos do banco principal e posiciona a sequência de ids da conta."""
+        self._copiar_cadastros(shard, cadastros)
+
+        conn = shard.get_connection()
+        cursor = conn.cursor()
+        base = id_conta * FAIXA_IDS
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'torneios'")
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('torneios', ?)", (base,))
+        elif row[0] < base:
+            cursor.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'torneios'", (base,))
+
+        conn.commit()
+        conn.close()
+
+    def _todos_shards(self) -> List[Tuple[int, PokerDatabase]]:
+        contas, _ = self._conferir_cadastros()
+        return [(row[0], self._shard(row[0], conferir=False)) for row in contas]
+
+    def _em_paralelo(self, consulta: Callable[[PokerDatabase], object]) -> List:
+        """Executa a consulta em todos os shards pelo pool de threads."""
+        futuros = [self._pool.submit(consulta, shard) for _, shard in self._todos_shards()]
+        return [futuro.result() for futuro in futuros]
+
+    def _shard_do_torneio(self, id_torneio: int) -> Optional[PokerDatabase]:
+        """Shard que guarda o torneio: o da faixa do id e, se não estiver lá
+        (torneio anterior aos shards ou que trocou de conta), procura em todos."""
+        def contem(shard):
+            conn = shard.get_connection()
+            row = conn.execute("SELECT 1 FROM torneios WHERE id_torneio = ?", (id_torneio,)).fetchone()
+            conn.close()
+            return row is not None
+
+        if id_torneio >= FAIXA_IDS:
+            shard = self._shard(id_torneio // FAIXA_IDS)
+            if contem(shard):
+                return shard
+
+        for (_, shard), encontrado in zip(self._todos_shards(), self._em_paralelo(contem)):
+            if encontrado:
+                return shard
+        return None
+
+    def _migrar_torneios(self):
+        """Move para os shards os torneios que ainda estão no banco principal (mantendo os ids)."""
+        conn = self.get_connection()
+        contas = [row[0] for row in conn.execute("SELECT DISTINCT id_conta FROM torneios")]
+        conn.close()
+
+        for id_conta in contas:
+            shard = self._shard(id_conta)
+            conn = self.get_connection()
+            rows = conn.execute(f"SELECT {COLUNAS_COPIA} FROM torneios WHERE id_conta = ?", (id_conta,)).fetchall()
+            conn.close()
+
+            # OR IGNORE: repetir a migração não duplica; com a chave natural única, os repetidos
+            # ficam de fora (fica o de menor id, como em mesclar_torneios_duplicados)
+            shard._fila_escrita().executar(lambda cursor, rows=rows: cursor.executemany(
+                f"INSERT OR IGNORE INTO torneios ({COLUNAS_COPIA}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )).result()
+            self._fila_escrita().executar(lambda cursor, id_conta=id_conta: cursor.execute(
+                "DELETE FROM torneios WHERE id_conta = ?", (id_conta,)
+            )).result()
+            print(f"{len(rows)} torneios da conta {id_conta} movidos para o shard")
+
+    # Leituras
+
+    def get_versao_dados(self) -> int:
+        """Soma dos contadores de alterações do banco principal e dos shards."""
+        return super().get_versao_dados() + sum(self._em_paralelo(lambda shard: shard.get_versao_dados()))
+
+    def get_alteracoes(self, desde: Optional[str] = None) -> Dict:
+        """Une o log de alterações dos shards; o marcador guarda a versão de cada um ("conta:versao,...")."""
+        anteriores = {}
+        if desde is not None:
+            try:
+                pares = dict(parte.split(':') for parte in desde.split(',') if parte)
+                anteriores = {int(conta): versao for conta, versao in pares.items()}
+            except ValueError:
+                anteriores = None
+
+        def consultar(id_conta, shard):
+            if desde is None:
+                return shard.get_alteracoes()
+            # Shard criado depois do marcador: tudo o que ele tem é novo
+            return shard.get_alteracoes(anteriores.get(id_conta, '0') if anteriores is not None else 'invalido')
+
+        shards = self._todos_shards()
+        partes = [futuro.result() for futuro in
+                  [self._pool.submit(consultar, id_conta, shard) for id_conta, shard in shards]]
+
+        alteracoes = []
+        for parte in partes:
+            if parte["alteracoes"] is None:
+                alteracoes = None
+            elif alteracoes is not None:
+                alteracoes.extend(parte["alteracoes"])
+        return {
+            "marcador": ",".join(f"{id_conta}:{parte['marcador']}" for (id_conta, _), parte in zip(shards, partes)),
+            "alteracoes": alteracoes
+        }
+
+    def _consultar_torneios(self, id_conta: Optional[int] = None,
+                            id_tipo_torneio: Optional[int] = None,
+                            data_inicio: Optional[str] = None,
+                            data_fim: Optional[str] = None) -> List[Tuple]:
+        if id_conta:
+            return self._shard(id_conta)._consultar_torneios(id_conta, id_tipo_torneio, data_inicio, data_fim)
+
+        partes = self._em_paralelo(
+            lambda shard: shard._consultar_torneios(None, id_tipo_torneio, data_inicio, data_fim)
+        )
+        # Cada parte já vem ordenada por data decrescente
+        return list(heapq.merge(*partes, key=lambda row: row[1], reverse=True))
+
+    def iter_torneios(self, id_conta: Optional[int] = None,
+                      id_tipo_torneio: Optional[int] = None,
+                      data_inicio: Optional[str] = None,
+                      data_fim: Optional[str] = None,
+                      tamanho_lote: int = 1000) -> Iterator[Dict]:
+        """Itera os torneios em ordem cronológica, intercalando os shards."""
+        if id_conta:
+            return self._shard(id_conta).iter_torneios(id_conta, id_tipo_torneio, data_inicio, data_fim, tamanho_lote)
+
+        return heapq.merge(
+            *(shard.iter_torneios(None, id_tipo_torneio, data_inicio, data_fim, tamanho_lote)
+              for _, shard in self._todos_shards()),
+            key=lambda torneio: (torneio['data_torneio'], torneio['id_torneio'])
+        )
+
+    def get_estatisticas_gerais(self, id_conta: Optional[int] = None,
+                               data_inicio: Optional[str] = None,
+                               data_fim: Optional[str] = None) -> Dict:
+        """Estatísticas gerais; sem conta, soma os parciais de cada shard."""
+        if id_conta:
+            return self._shard(id_conta).get_estatisticas_gerais(id_conta, data_inicio, data_fim)
+
+        partes = self._em_paralelo(lambda shard: shard.get_estatisticas_gerais(None, data_inicio, data_fim))
+        total = sum(p["total_torneios"] for p in partes)
+        investido = sum(p["total_investido"] for p in partes)
+        lucro = sum(p["lucro_liquido"] for p in partes)
+        itm = sum(round(p["itm_percentage"] * p["total_torneios"] / 100) for p in partes)
+
+        return {
+            "total_torneios": total,
+            "total_investido": investido,
+            "total_ganhos": sum(p["total_ganhos"] for p in partes),
+            "lucro_liquido": lucro,
+            "roi_geral": (lucro / investido) * 100 if investido > 0 else 0,
+            "abi": investido / total if total > 0 else 0,
+            "itm_percentage": (itm / total) * 100 if total > 0 else 0
+        }
+
+    def get_estatisticas_por_tipo(self, id_conta: Optional[int] = None,
+                                 data_inicio: Optional[str] = None,
+                                 data_fim: Optional[str] = None) -> List[Dict]:
+        """Estatísticas por tipo; sem conta, soma os parciais de cada shard por tipo."""
+        if id_conta:
+            return self._shard(id_conta).get_estatisticas_por_tipo(id_conta, data_inicio, data_fim)
+
+        por_tipo = defaultdict(lambda: {"total_torneios": 0, "total_investido": 0, "total_ganhos": 0, "lucro_liquido": 0})
+        for parte in self._em_paralelo(lambda shard: shard.get_estatisticas_por_tipo(None, data_inicio, data_fim)):
+            for tipo in parte:
+                soma = por_tipo[tipo["nome_tipo"]]
+                for chave in soma:
+                    soma[chave] += tipo[chave]
+
+        resultado = [{
+            "nome_tipo": nome_tipo,
+            **soma,
+            "roi": (soma["lucro_liquido"] / soma["total_investido"]) * 100 if soma["total_investido"] > 0 else 0
+        } for nome_tipo, soma in por_tipo.items()]
+        return sorted(resultado, key=lambda tipo: tipo["lucro_liquido"], reverse=True)
+
+    def get_resumo_mensal(self, id_conta: Optional[int] = None,
+                          id_tipo_torneio: Optional[int] = None,
+                          data_inicio: Optional[str] = None,
+                          data_fim: Optional[str] = None) -> List[Dict]:
+        """Totais por mês; sem conta, soma os parciais de cada shard por mês."""
+        if id_conta:
+            return self._shard(id_conta).get_resumo_mensal(id_conta, id_tipo_torneio, data_inicio, data_fim)
+
+        por_mes = defaultdict(lambda: {"total_torneios": 0, "total_investido": 0, "total_ganhos": 0, "itm": 0})
+        for parte in self._em_paralelo(lambda shard: shard.get_resumo_mensal(None, id_tipo_torneio, data_inicio, data_fim)):
+            for mes in parte:
+                soma = por_mes[mes["mes"]]
+                soma["total_torneios"] += mes["total_torneios"]
+                soma["total_investido"] += mes["total_investido"]
+                soma["total_ganhos"] += mes["total_ganhos"]
+                soma["itm"] += round(mes["itm_percentage"] * mes["total_torneios"] / 100)
+
+        resultado = []
+        for mes, soma in sorted(por_mes.items()):
+            lucro_liquido = soma["total_ganhos"] - soma["total_investido"]
+            resultado.append({
+                "mes": mes,
+                "total_torneios": soma["total_torneios"],
+                "total_investido": soma["total_investido"],
+                "total_ganhos": soma["total_ganhos"],
+                "lucro_liquido": lucro_liquido,
+                "roi": (lucro_liquido / soma["total_investido"]) * 100 if soma["total_investido"] > 0 else 0,
+                "itm_percentage": (soma["itm"] / soma["total_torneios"]) * 100 if soma["total_torneios"] > 0 else 0
+            })
+        return resultado
+
+    def get_cubo(self, dimensoes: Iterable[str] = ('mes', 'conta', 'tipo'),
+                 id_conta: Optional[int] = None,
+                 id_tipo_torneio: Optional[int] = None,
+                 data_inicio: Optional[str] = None,
+                 data_fim: Optional[str] = None) -> List[Dict]:
+        """Cubo de totais; sem conta, soma as células de cada shard."""
+        if id_conta:
+            return self._shard(id_conta).get_cubo(dimensoes, id_conta, id_tipo_torneio, data_inicio, data_fim)
+
+        dimensoes = [d for d in DIMENSOES_CUBO if d in dimensoes]
+        somas = defaultdict(lambda: [0, 0, 0, 0, 0])
+        for parte in self._em_paralelo(lambda shard: shard.get_cubo(dimensoes, None, id_tipo_torneio,
+                                                                     data_inicio, data_fim)):
+            for celula in parte:
+                soma = somas[tuple(celula[d] for d in dimensoes)]
+                soma[0] += celula["total_torneios"]
+                soma[1] += celula["total_investido"]
+                soma[2] += celula["total_ganhos"]
+                soma[3] += celula["lucro_liquido"]
+                soma[4] += round(celula["itm_percentage"] * celula["total_torneios"] / 100)
+
+        return [{**dict(zip(dimensoes, chave)), **totais_cubo(*soma)} for chave, soma in sorted(somas.items())]
+
+    def get_melhores_piores_sessoes(self, limit: int = 5,
+                                    id_conta: Optional[int] = None,
+                                    id_tipo_torneio: Optional[int] = None,
+                                    data_inicio: Optional[str] = None,
+                                    data_fim: Optional[str] = None,
+                                    agrupar_por: Optional[str] = None,
+                                    intervalo_minutos: Optional[int] = None) -> Dict:
+        """Melhores e piores sessões; sessões que misturam contas são montadas a partir das linhas."""
+        filtros = (id_tipo_torneio, data_inicio, data_fim, agrupar_por, intervalo_minutos)
+        if id_conta:
+            return self._shard(id_conta).get_melhores_piores_sessoes(limit, id_conta, *filtros)
+
+        if agrupar_por == 'conta':
+            # Sessões por conta nunca cruzam shards: o top de cada shard basta
+            partes = self._em_paralelo(lambda shard: shard.get_melhores_piores_sessoes(limit, None, *filtros))
+            melhores = [s for p in partes for s in p["melhores"]]
+            piores = [s for p in partes for s in p["piores"]]
+        elif intervalo_minutos is None:
+            # Sessões diárias de várias contas: soma os totais por dia de todos os shards
+            por_dia = defaultdict(lambda: [0, 0, 0, 0])
+            for parte in self._em_paralelo(lambda shard: self._totais_diarios(shard, id_tipo_torneio, data_inicio,
+                                                                               data_fim, agrupar_por)):
+                for grupo, dia, *totais in parte:
+                    soma = por_dia[(grupo, dia)]
+                    for i, valor in enumerate(totais):
+                        soma[i] += valor or 0
+            melhores = piores = [self._sessao_diaria(grupo, dia, totais, agrupar_por)
+                                 for (grupo, dia), totais in por_dia.items()]
+        else:
+            # Sessões por intervalo podem juntar torneios de várias contas: monta a partir das linhas
+            return PokerCalculations.get_best_and_worst_sessions(
+                self.get_torneios_set(None, id_tipo_torneio, data_inicio, data_fim),
+                limit, agrupar_por, intervalo_minutos
+            )
+
+        def inicio(sessao):
+            return str(sessao.get("inicio", sessao["data_torneio"]))
+
+        return {
+            "melhores": sorted(melhores, key=lambda s: (-s["lucro_liquido"], inicio(s)))[:limit],
+            "piores": sorted(piores, key=lambda s: (s["lucro_liquido"], inicio(s)))[:limit]
+        }
+
+    def _totais_diarios(self, shard: PokerDatabase, id_tipo_torneio: Optional[int], data_inicio: Optional[str],
+                        data_fim: Optional[str], agrupar_por: Optional[str]) -> List[Tuple]:
+        """(grupo, dia, torneios, buy-in, ganhos, lucro) de um shard, sem ordenar nem limitar."""
+        conn = shard._conexao_leitura()
+        fonte = shard._fonte_torneios(conn, data_inicio, data_fim)
+        coluna_grupo = 'tt.nome_tipo' if agrupar_por == 'tipo' else "''"
+        query = f'''
+            SELECT {coluna_grupo}, substr(t.data_torneio, 1, 10), COUNT(*),
+                   SUM(t.buy_in), SUM(t.ganho_total), SUM(t.ganho_total - t.buy_in)
+            FROM {fonte} t
+            JOIN tipos_torneio tt ON t.id_tipo_torneio = tt.id_tipo_torneio
+            WHERE 1=1
+        '''
+        params = []
+
+        if id_tipo_torneio:
+            query += " AND t.id_tipo_torneio = ?"
+            params.append(id_tipo_torneio)
+
+        if data_inicio:
+            query += " AND t.data_torneio >= ?"
+            params.append(data_inicio)
+
+        if data_fim:
+            query += " AND t.data_torneio <= ?"
+            params.append(data_fim)
+
+        rows = conn.execute(f"{query} GROUP BY 1, t.data_torneio", params).fetchall()
+        conn.close()
+        return rows
+
+    @staticmethod
+    def _sessao_diaria(grupo: str, dia: str, totais: List, agrupar_por: Optional[str]) -> Dict:
+        """Sessão no formato de get_melhores_piores_sessoes a partir dos totais somados."""
+        total_torneios, buy_in, ganho_total, lucro_liquido = totais
+        sessao = {
+            "data_torneio": datetime.strptime(dia, "%Y-%m-%d").date(),
+            "buy_in": buy_in,
+            "ganho_total": ganho_total,
+            "lucro_liquido": lucro_liquido,
+            "roi": (lucro_liquido / buy_in) * 100 if buy_in else 0,
+            "total_torneios": total_torneios
+        }
+        if agrupar_por == 'tipo':
+            sessao["nome_tipo"] = grupo
+        return sessao
+
+    # Escritas
+
+    def insert_torneio_async(self, data_torneio: str, id_conta: int, id_tipo_torneio: int,
+                             buy_in: float, ganho_total: float, hora_inicio: Optional[str] = None,
+                             id_externo: Optional[str] = None) -> Future:
+        """Enfileira a inserção na fila de escrita do shard da conta."""
+        return self._shard(id_conta).insert_torneio_async(data_torneio, id_conta, id_tipo_torneio,
+                                                          buy_in, ganho_total, hora_inicio, id_externo)
+
+    def insert_torneios_lote(self, torneios: Iterable[Tuple]) -> int:
+        """Insere vários torneios, com um lote por shard gravado em paralelo."""
+        por_conta = defaultdict(list)
+        for torneio in torneios:
+            por_conta[torneio[1]].append(torneio)
+
+        futuros = [self._pool.submit(self._shard(id_conta).insert_torneios_lote, lote)
+                   for id_conta, lote in por_conta.items()]
+        return sum(futuro.result() for futuro in futuros)
+
+    def update_torneio_async(self, id_torneio: int, data_torneio: str, id_conta: int, id_tipo_torneio: int,
+                             buy_in: float, ganho_total: float, hora_inicio: Optional[str] = None) -> Future:
+        """Atualiza no shard do torneio; trocar de conta move o torneio (mesmo id) para o shard da nova conta."""
+        origem = self._shard_do_torneio(id_torneio)
+        if origem is None:
+            ano = self.get_ano_arquivado(id_torneio)
+            if ano is not None:
+                return self._falha(erro_arquivado(id_torneio, ano))
+        destino = self._shard(id_conta)
+        if origem is None or origem is destino:
+            return destino.update_torneio_async(id_torneio, data_torneio, id_conta, id_tipo_torneio,
+                                                buy_in, ganho_total, hora_inicio)
+
+        conn = origem.get_connection()
+        row = conn.execute("SELECT hora_inicio, id_externo FROM torneios WHERE id_torneio = ?", (id_torneio,)).fetchone()
+        conn.close()
+        hora_atual, id_externo = row if row else (None, None)
+        if hora_inicio is None:
+            hora_inicio = hora_atual
+
+        # Primeiro grava no destino: uma falha no meio deixa o torneio duplicado, nunca perdido
+        destino._fila_escrita().executar(lambda cursor: cursor.execute(f'''
+            INSERT OR REPLACE INTO torneios ({COLUNAS_COPIA}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (id_torneio, data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total, hora_inicio, id_externo))).result()
+        return origem.delete_torneio_async(id_torneio)
+
+    def delete_torneio_async(self, id_torneio: int) -> Future:
+        """Enfileira a exclusão no shard do torneio."""
+        shard = self._shard_do_torneio(id_torneio)
+        if shard is None:
+            ano = self.get_ano_arquivado(id_torneio)
+            if ano is not None:
+                return self._falha(erro_arquivado(id_torneio, ano))
+            futuro = Future()
+            futuro.set_result(0)
+            return futuro
+        return shard.delete_torneio_async(id_torneio)
+
+    @staticmethod
+    def _falha(erro: Exception) -> Future:
+        futuro = Future()
+        futuro.set_exception(erro)
+        return futuro
+
+    def get_ano_arquivado(self, id_torneio: int) -> Optional[int]:
+        """Ano arquivado que guarda o torneio, procurando nos arquivos de todos os shards."""
+        anos = [ano for ano in self._em_paralelo(lambda shard: shard.get_ano_arquivado(id_torneio)) if ano is not None]
+        return anos[0] if anos else None
+
+    # Duplicados: a chave natural inclui a conta, então cada shard resolve os seus
+
+    def get_torneios_duplicados(self) -> Dict:
+        """Torneios repetidos pela chave natural, somando os shards."""
+        partes = self._em_paralelo(lambda shard: shard.get_torneios_duplicados())
+        return {chave: sum(parte[chave] for parte in partes) for chave in ("grupos", "excedentes")}
+
+    def mesclar_torneios_duplicados(self) -> int:
+        """Mescla os duplicados de cada shard em paralelo. Retorna o total removido."""
+        return sum(self._em_paralelo(lambda shard: shard.mesclar_torneios_duplicados()))
+
+    # Arquivo anual e backup, conta a conta
+
+    def _diretorio_arquivo(self, id_conta: int, diretorio: Optional[str] = None) -> str:
+        return os.path.join(diretorio or os.path.join(self.diretorio_shards, 'arquivo'), f"conta_{id_conta}")
+
+    def get_arquivos_anuais(self) -> List[Dict]:
+        """Anos arquivados, somando os arquivos de todas as contas (caminho é o diretório dos arquivos)."""
+        por_ano = {}
+        for parte in self._em_paralelo(lambda shard: shard.get_arquivos_anuais()):
+            for arquivo in parte:
+                atual = por_ano.setdefault(arquivo["ano"], {
+                    "ano": arquivo["ano"],
+                    "caminho": os.path.join(self.diretorio_shards, 'arquivo'),
+                    "data_min": arquivo["data_min"],
+                    "data_max": arquivo["data_max"],
+                    "total_torneios": 0
+                })
+                atual["data_min"] = min(atual["data_min"], arquivo["data_min"])
+                atual["data_max"] = max(atual["data_max"], arquivo["data_max"])
+                atual["total_torneios"] += arquivo["total_torneios"]
+        return [por_ano[ano] for ano in sorted(por_ano)]
+
+    def get_anos_arquivaveis(self) -> List[int]:
+        """Anos encerrados com torneios em algum shard."""
+        return sorted(set().union(*self._em_paralelo(lambda shard: shard.get_anos_arquivaveis())))
+
+    def arquivar_ano(self, ano: int, diretorio: Optional[str] = None) -> int:
+        """Arquiva o ano em todos os shards (um arquivo por conta). Retorna o total movido."""
+        return sum(shard.arquivar_ano(ano, self._diretorio_arquivo(id_conta, diretorio))
+                   for id_conta, shard in self._todos_shards())
+
+    def desarquivar_ano(self, ano: int) -> int:
+        """Desarquiva o ano nos shards em que ele foi arquivado."""
+        return sum(shard.desarquivar_ano(ano) for _, shard in self._todos_shards()
+                   if any(arquivo["ano"] == ano for arquivo in shard.get_arquivos_anuais()))
+
+    def backup_database(self, backup_path: str) -> bool:
+        """Copia o banco principal e, ao lado dele, a pasta de shards."""
+        if not super().backup_database(backup_path):
+            return False
+        try:
+            shutil.copytree(self.diretorio_shards, f"{backup_path}_shards", dirs_exist_ok=True,
+                            ignore=shutil.ignore_patterns('arquivo'))
+            return True
+        except Exception as e:
+            print(f"Erro ao fazer backup dos shards: {e}")
+            return False
@@ -0,0 +1,267 @@
+import json
+import logging
+import logging.handlers
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional
+
+LIMITE_LENTO_MS = float(os.environ.get('POKER_SQL_LENTO_MS', '100'))
+
+SQL_LOG_DIR = os.environ.get(
+    'POKER_SQL_LOG_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
+)
+
+# Só vale a pena pedir o plano destes comandos
+COMANDOS_COM_PLANO = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Comandos de transação que o sqlite3 emite sozinho, fora do execute de quem chamou
+CONTROLE_TRANSACAO = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+
+def normalizar(sql: str) -> str:
+    """Formato da consulta: literais viram ?, listas (?, ?, ...) viram (?...) e espaços são unificados."""
+    sql = re.sub(r"--[^\n]*", " ", sql)
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    sql = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?...)", sql)
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+class SQLTracer:
+    """Tempo de cada comando SQL, agregado por formato, com log das consultas lentas.
+
+    As conexões criadas com ConexaoRastreada medem execute e fetch de cada
+    comando e, pelo set_trace_callback, guardam o SQL expandido que o SQLite
+    realmente executou (parâmetros já substituídos). Todo comando soma no
+    formato normalizado (filtros diferentes geram formatos diferentes);
+    comandos acima de `limite_ms` vão para um log rotativo com parâmetros e
+    EXPLAIN QUERY PLAN.
+    """
+
+    def __init__(self, limite_ms: float = LIMITE_LENTO_MS, diretorio: Optional[str] = SQL_LOG_DIR,
+                 max_bytes: int = 1024 * 1024, arquivos: int = 5):
+        self.limite_ms = limite_ms
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self.arquivos = arquivos
+
+        # formato -> [contagem, segundos, maior, lentas]
+        self._formatos = {}
+        self._lock = threading.Lock()
+        self._logger = None
+
+    def registrar(self, conn: sqlite3.Connection, sql: str, parametros, duracao: float,
+                  expandido: Optional[str] = None, linhas: int = 0):
+        """Soma um comando no seu formato; se lento, grava no log com o plano."""
+        formato = normalizar(sql)
+        lento = duracao * 1000 >= self.limite_ms
+        with self._lock:
+            agregado = self._formatos.get(formato)
+            if agregado is None:
+                agregado = self._formatos[formato] = [0, 0.0, 0.0, 0]
+            agregado[0] += 1
+            agregado[1] += duracao
+            agregado[2] = max(agregado[2], duracao)
+            if lento:
+                agregado[3] += 1
+
+        if lento:
+            self._log().warning(json.dumps({
+                'ms': round(duracao * 1000, 2),
+                'linhas': linhas,
+                'formato': formato,
+                'sql': sql.strip(),
+                'parametros': parametros if isinstance(parametros, dict) else list(parametros or ()),
+                'expandido': expandido,
+                'plano': self.plano(conn, sql, parametros)
+            }, ensure_ascii=False, default=str))
+
+    def plano(self, conn: sqlite3.Connection, sql: str, parametros) -> List[str]:
+        """EXPLAIN QUERY PLAN do comando, com a indentação da árvore."""
+        if not sql.lstrip().upper().startswith(COMANDOS_COM_PLANO):
+            return []
+        try:
+            linhas = conn.cursor(sqlite3.Cursor).execute(f"EXPLAIN QUERY PLAN {sql}", parametros or ()).fetchall()
+        except sqlite3.Error as e:
+            return [f"(sem plano: {e})"]
+
+        profundidade = {0: -1}
+        plano = []
+        for id_no, pai, _, detalhe in linhas:
+            profundidade[id_no] = profundidade.get(pai, -1) + 1
+            plano.append('  ' * profundidade[id_no] + detalhe)
+        return plano
+
+    def resumo(self, limite: Optional[int] = None) -> List[Dict]:
+        """Formatos por tempo total, do maior para o menor."""
+        with self._lock:
+            itens = [(formato, list(agregado)) for formato, agregado in self._formatos.items()]
+        itens.sort(key=lambda item: item[1][1], reverse=True)
+        return [
+            {
+                'formato': formato,
+                'contagem': contagem,
+                'total_ms': segundos * 1000,
+                'media_ms': segundos * 1000 / contagem,
+                'maior_ms': maior * 1000,
+                'lentas': lentas
+            }
+            for formato, (contagem, segundos, maior, lentas) in itens[:limite]
+        ]
+
+    def limpar(self):
+        with self._lock:
+            self._formatos.clear()
+
+    def _log(self) -> logging.Logger:
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    logger = logging.getLogger(f'poker.sql_lento.{id(self)}')
+                    logger.propagate = False
+                    if self.diretorio:
+                        os.makedirs(self.diretorio, exist_ok=True)
+                        handler = logging.handlers.RotatingFileHandler(
+                            os.path.join(self.diretorio, 'sql_lento.log'),
+                            maxBytes=self.max_bytes, backupCount=self.arquivos, encoding='utf-8'
+                        )
+                        handler.setFormatter(logging.Formatter('%(asctime)s %(process)d %(message)s'))
+                        logger.addHandler(handler)
+                    else:
+                        logger.addHandler(logging.NullHandler())
+                    self._logger = logger
+        return self._logger
+
+
+rastreador = SQLTracer()
+
+
+class CursorRastreado(sqlite3.Cursor):
+    """Cursor que mede o comando atual do execute até o fim das linhas (ou o próximo execute)."""
+
+    _sql = None
+
+    def _iniciar(self, sql: str, parametros):
+        self._encerrar()
+        self._sql = sql
+        self._parametros = parametros
+        self._duracao = 0.0
+        self._linhas = 0
+        self.connection.expandido = None
+
+    def _encerrar(self):
+        if self._sql is None:
+            return
+        sql, self._sql = self._sql, None
+        expandido, self.connection.expandido = self.connection.expandido, None
+        rastreador.registrar(self.connection, sql, self._parametros, self._duracao, expandido, self._linhas)
+
+    def _medir(self, funcao, *args):
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args)
+        finally:
+            if self._sql is not None:
+                self._duracao += time.perf_counter() - inicio
+
+    def execute(self, sql, parametros=()):
+        self._iniciar(sql, parametros)
+        return self._medir(super().execute, sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        self._iniciar(sql, ())
+
+        # Conta as linhas e guarda a primeira (para o plano) sem materializar geradores
+        def acompanhar():
+            for parametros in sequencia:
+                if not self._linhas:
+                    self._parametros = parametros
+                self._linhas += 1
+                yield parametros
+
+        resultado = self._medir(super().executemany, sql, acompanhar())
+        self._encerrar()
+        return resultado
+
+    def executescript(self, script):
+        self._iniciar(script, ())
+        resultado = self._medir(super().executescript, script)
+        self._encerrar()
+        return resultado
+
+    def fetchone(self):
+        linha = self._medir(super().fetchone)
+        if linha is None:
+            self._encerrar()
+        else:
+            self._linhas += 1
+        return linha
+
+    def fetchmany(self, size=None):
+        linhas = self._medir(super().fetchmany, size if size is not None else self.arraysize)
+        self._linhas += len(linhas)
+        if not linhas:
+            self._encerrar()
+        return linhas
+
+    def fetchall(self):
+        linhas = self._medir(super().fetchall)
+        self._linhas += len(linhas)
+        self._encerrar()
+        return linhas
+
+    def __next__(self):
+        try:
+            linha = self._medir(super().__next__)
+        except StopIteration:
+            self._encerrar()
+            raise
+        self._linhas += 1
+        return linha
+
+    def close(self):
+        self._encerrar()
+        super().close()
+
+
+class ConexaoRastreada(sqlite3.Connection):
+    """Conexão (use como factory de sqlite3.connect) cujos comandos passam pelo rastreador."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.expandido = None
+        self._cursores = weakref.WeakSet()
+        self.set_trace_callback(self._rastrear)
+
+    def _rastrear(self, sql: str):
+        # Só o primeiro comando depois do execute: as linhas seguintes de um
+        # executemany e os comandos de triggers não são guardados
+        if self.expandido is None and not sql.lstrip().upper().startswith(CONTROLE_TRANSACAO):
+            self.expandido = sql
+
+    def cursor(self, factory=None):
+        cursor = super().cursor(factory or CursorRastreado)
+        if isinstance(cursor, CursorRastreado):
+            self._cursores.add(cursor)
+        return cursor
+
+    # Os atalhos da conexão criam o cursor em C, sem passar por cursor()
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        return self.cursor().executemany(sql, sequencia)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+    def close(self):
+        # Comandos cujas linhas não foram lidas até o fim são registrados agora
+        for cursor in list(self._cursores):
+            cursor._encerrar()
+        super().close()
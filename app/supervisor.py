@@ -0,0 +1,167 @@
+import subprocess
+import threading
+import time
+import urllib.request
+from typing import List, Optional, Dict
+
+class StreamlitSupervisor:
+    """Inicia o Streamlit, aguarda o health check e reinicia com backoff se ele cair."""
+
+    def __init__(self, cmd: List[str], cwd: Optional[str] = None,
+                 health_url: str = 'http://localhost:8501/_stcore/health',
+                 intervalo_verificacao: float = 5.0,
+                 falhas_maximas: int = 3,
+                 backoff_inicial: float = 1.0,
+                 backoff_maximo: float = 60.0,
+                 tempo_estavel: float = 30.0,
+                 prazo_inicializacao: float = 120.0):
+        self.cmd = cmd
+        self.cwd = cwd
+        self.health_url = health_url
+        self.intervalo_verificacao = intervalo_verificacao
+        self.falhas_maximas = falhas_maximas
+        self.backoff_inicial = backoff_inicial
+        self.backoff_maximo = backoff_maximo
+        self.tempo_estavel = tempo_estavel
+        self.prazo_inicializacao = prazo_inicializacao
+
+        self.processo = None
+        self.estado = 'parado'
+        self.reinicios = 0
+        self.ultimo_codigo_saida = None
+        self.inicio_processo = None
+        self.pronto_em = None
+
+        self._pronto = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Inicia a supervisão em uma thread daemon."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name='streamlit-supervisor', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Para a supervisão e encerra o processo do Streamlit."""
+        self._parar.set()
+        self._encerrar_processo(timeout)
+        if self._thread:
+            self._thread.join(timeout)
+        self._pronto.clear()
+        self.estado = 'parado'
+
+    def aguardar_pronto(self, timeout: Optional[float] = None) -> bool:
+        """Bloqueia até o Streamlit responder ao health check (ou até o timeout)."""
+        return self._pronto.wait(timeout)
+
+    def verificar_saude(self, timeout: float = 1.0) -> bool:
+        """Consulta o endpoint de health do Streamlit."""
+        try:
+            with urllib.request.urlopen(self.health_url, timeout=timeout) as resposta:
+                return resposta.status == 200
+        except Exception:
+            return False
+
+    def status(self) -> Dict:
+        """Estado real do processo filho, para o /health."""
+        with self._lock:
+            processo = self.processo
+            vivo = processo is not None and processo.poll() is None
+            return {
+                'estado': self.estado,
+                'pronto': self._pronto.is_set(),
+                'pid': processo.pid if vivo else None,
+                'uptime_segundos': round(time.time() - self.inicio_processo, 1) if vivo and self.inicio_processo else 0,
+                'reinicios': self.reinicios,
+                'ultimo_codigo_saida': self.ultimo_codigo_saida
+            }
+
+    def _executar(self):
+        backoff = self.backoff_inicial
+
+        while not self._parar.is_set():
+            iniciado = self._iniciar_processo()
+            codigo = self._monitorar() if iniciado else None
+
+            if self._parar.is_set():
+                break
+
+            with self._lock:
+                self._pronto.clear()
+                self.ultimo_codigo_saida = codigo
+                tempo_vivo = time.time() - self.inicio_processo
+                self.estado = 'reiniciando'
+                self.reinicios += 1
+
+            # Processo que ficou de pé por um tempo reseta o backoff
+            if tempo_vivo >= self.tempo_estavel:
+                backoff = self.backoff_inicial
+
+            if iniciado:
+                print(f"Streamlit encerrou (código {codigo}); reiniciando em {backoff:.1f}s")
+            else:
+                print(f"Nova tentativa de iniciar o Streamlit em {backoff:.1f}s")
+            self._parar.wait(backoff)
+            backoff = min(backoff * 2, self.backoff_maximo)
+
+    def _iniciar_processo(self) -> bool:
+        """Sobe o processo; se não conseguir, retorna False e entra no mesmo backoff de uma queda."""
+        with self._lock:
+            self._pronto.clear()
+            self.estado = 'iniciando'
+            self.inicio_processo = time.time()
+            try:
+                self.processo = subprocess.Popen(self.cmd, cwd=self.cwd)
+            except Exception as e:
+                self.processo = None
+                print(f"Erro ao iniciar o Streamlit: {e}")
+                return False
+        print(f"Streamlit iniciado (pid {self.processo.pid})")
+        return True
+
+    def _monitorar(self) -> Optional[int]:
+        """Acompanha o processo até ele sair ou ficar sem responder. Retorna o código de saída."""
+        falhas = 0
+        while not self._parar.is_set():
+            # Antes de ficar pronto, verifica com mais frequência
+            intervalo = 0.2 if not self._pronto.is_set() else self.intervalo_verificacao
+            try:
+                return self.processo.wait(timeout=intervalo)
+            except subprocess.TimeoutExpired:
+                pass
+
+            if self.verificar_saude():
+                falhas = 0
+                if not self._pronto.is_set():
+                    with self._lock:
+                        self.estado = 'pronto'
+                        self.pronto_em = time.time()
+                    self._pronto.set()
+                    print(f"Streamlit pronto em {self.pronto_em - self.inicio_processo:.1f}s")
+            elif self._pronto.is_set():
+                falhas += 1
+                if falhas >= self.falhas_maximas:
+                    print("Streamlit não responde ao health check; encerrando para reiniciar")
+                    self._encerrar_processo()
+                    return self.processo.poll()
+            elif time.time() - self.inicio_processo >= self.prazo_inicializacao:
+                # Processo vivo que nunca fica pronto também é falha
+                print(f"Streamlit não ficou pronto em {self.prazo_inicializacao:.0f}s; encerrando para reiniciar")
+                self._encerrar_processo()
+                return self.processo.poll()
+        return None
+
+    def _encerrar_processo(self, timeout: float = 10.0):
+        processo = self.processo
+        if processo is None or processo.poll() is not None:
+            return
+        processo.terminate()
+        try:
+            processo.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+            processo.wait()
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Union
+from pandas.io.formats.style import Styler
+
+from tournament_set import TournamentSet, as_dataframe
+from metrics import instrumentar
+
+# Cores consistentes para valores positivos, negativos e neutros
+ESTILO_POSITIVO = 'background-color: #e8f5e8; color: #2d5a2d; font-weight: bold'
+ESTILO_NEGATIVO = 'background-color: #ffeaea; color: #a94442; font-weight: bold'
+ESTILO_NEUTRO = 'color: #333'
+
+COLUNAS_RECENTES = {
+    'data_torneio': 'Data',
+    'nome_conta': 'Conta',
+    'nome_tipo': 'Tipo',
+    'buy_in': 'Buy-in (R$)',
+    'ganho_total': 'Ganho (R$)',
+    'lucro_liquido': 'Lucro (R$)',
+    'roi': 'ROI (%)'
+}
+
+COLUNAS_CENARIOS = {
+    'nome': 'Cenário',
+    'total_torneios': 'Torneios',
+    'total_investido': 'Investido (R$)',
+    'lucro_liquido': 'Lucro (R$)',
+    'roi': 'ROI (%)',
+    'itm_percentage': 'ITM (%)',
+    'maior_downswing': 'Maior Downswing (R$)'
+}
+
+@instrumentar('tabelas')
+class PokerTables:
+
+    @staticmethod
+    def recent_tournaments_page(torneios: Union[TournamentSet, List[Dict]], pagina: int = 1,
+                                itens_por_pagina: int = 20) -> Styler:
+        """Página da tabela de torneios recentes: fatia antes de converter, formatar e colorir."""
+        inicio = (pagina - 1) * itens_por_pagina
+        df = as_dataframe(torneios[inicio:inicio + itens_por_pagina])
+
+        if df.empty:
+            df = pd.DataFrame(columns=list(COLUNAS_RECENTES))
+        df = df[list(COLUNAS_RECENTES)].rename(columns=COLUNAS_RECENTES)
+
+        return PokerTables.style_numeric_table(
+            df,
+            moeda=['Buy-in (R$)', 'Ganho (R$)', 'Lucro (R$)'],
+            percentual=['ROI (%)'],
+            colorir=['Lucro (R$)', 'ROI (%)']
+        )
+
+    @staticmethod
+    def scenario_comparison(resultados: List[Dict]) -> Styler:
+        """Tabela de comparação dos cenários (PokerScenarios.avaliar), com a diferença de lucro e ROI para o primeiro."""
+        df = pd.DataFrame(resultados, columns=list(COLUNAS_CENARIOS)).rename(columns=COLUNAS_CENARIOS)
+        if not df.empty:
+            df['Δ Lucro (R$)'] = df['Lucro (R$)'] - df['Lucro (R$)'].iloc[0]
+            df['Δ ROI (p.p.)'] = df['ROI (%)'] - df['ROI (%)'].iloc[0]
+        else:
+            df['Δ Lucro (R$)'] = df['Δ ROI (p.p.)'] = pd.Series(dtype=float)
+
+        return PokerTables.style_numeric_table(
+            df,
+            moeda=['Investido (R$)', 'Lucro (R$)', 'Maior Downswing (R$)', 'Δ Lucro (R$)'],
+            percentual=['ROI (%)', 'ITM (%)', 'Δ ROI (p.p.)'],
+            colorir=['Lucro (R$)', 'ROI (%)', 'Δ Lucro (R$)', 'Δ ROI (p.p.)']
+        )
+
+    @staticmethod
+    def style_numeric_table(df: pd.DataFrame, moeda: List[str], percentual: List[str],
+                            colorir: List[str]) -> Styler:
+        """Formata colunas numéricas só na exibição e colore pelo sinal dos próprios números."""
+        formatos = {coluna: "R$ {:.2f}" for coluna in moeda}
+        formatos.update({coluna: "{:.1f}%" for coluna in percentual})
+
+        return df.style.format(formatos).apply(PokerTables._cores_por_sinal, subset=colorir)
+
+    @staticmethod
+    def _cores_por_sinal(coluna: pd.Series) -> np.ndarray:
+        valores = coluna.to_numpy(dtype=float)
+        return np.select([valores > 0, valores < 0], [ESTILO_POSITIVO, ESTILO_NEGATIVO], ESTILO_NEUTRO)
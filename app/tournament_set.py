@@ -0,0 +1,224 @@
+from collections.abc import Mapping, Sequence
+from typing import List, Dict, Iterable, Iterator, Optional, Union
+import numpy as np
+import pandas as pd
+
+COLUNAS = ('id_torneio', 'data_torneio', 'nome_conta', 'nome_tipo', 'buy_in',
+           'ganho_total', 'lucro_liquido', 'roi', 'hora_inicio')
+
+class TournamentRow(Mapping):
+    """Visão de um torneio compatível com o dicionário retornado por get_torneios."""
+
+    __slots__ = ('_conjunto', '_indice')
+
+    def __init__(self, conjunto: 'TournamentSet', indice: int):
+        self._conjunto = conjunto
+        self._indice = indice
+
+    def __getitem__(self, chave: str):
+        c = self._conjunto
+        i = self._indice
+        if chave == 'id_torneio':
+            return int(c.ids[i])
+        if chave == 'data_torneio':
+            return str(np.datetime64(int(c.dias[i]), 'D'))
+        if chave == 'nome_conta':
+            return c.nomes_contas[c.codigos_conta[i]]
+        if chave == 'nome_tipo':
+            return c.nomes_tipos[c.codigos_tipo[i]]
+        if chave == 'buy_in':
+            return float(c.buy_in[i])
+        if chave == 'ganho_total':
+            return float(c.ganho_total[i])
+        if chave == 'lucro_liquido':
+            return float(c.ganho_total[i] - c.buy_in[i])
+        if chave == 'roi':
+            buy_in = float(c.buy_in[i])
+            return ((float(c.ganho_total[i]) - buy_in) / buy_in) * 100 if buy_in > 0 else 0
+        if chave == 'hora_inicio':
+            minutos = int(c.minutos_inicio[i])
+            return None if minutos < 0 else f"{minutos // 60:02d}:{minutos % 60:02d}"
+        raise KeyError(chave)
+
+    def __iter__(self):
+        return iter(COLUNAS)
+
+    def __len__(self):
+        return len(COLUNAS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class TournamentSet(Sequence):
+    """Coleção de torneios em arrays tipados (colunar).
+
+    Substitui List[Dict] com uma fração da memória: ids em int64 (cabem as faixas
+    dos shards), dias em int32, conta e tipo em uint8 (índices em nomes_contas/
+    nomes_tipos), valores em float64. Fatias são visões sem cópia; índices
+    inteiros retornam TournamentRow, compatível com dict.
+    """
+
+    def __init__(self, ids: np.ndarray, dias: np.ndarray, codigos_conta: np.ndarray,
+                 codigos_tipo: np.ndarray, buy_in: np.ndarray, ganho_total: np.ndarray,
+                 minutos_inicio: np.ndarray, nomes_contas: List[str], nomes_tipos: List[str]):
+        self.ids = ids
+        self.dias = dias
+        self.codigos_conta = codigos_conta
+        self.codigos_tipo = codigos_tipo
+        self.buy_in = buy_in
+        self.ganho_total = ganho_total
+        self.minutos_inicio = minutos_inicio
+        self.nomes_contas = nomes_contas
+        self.nomes_tipos = nomes_tipos
+
+    @classmethod
+    def empty(cls) -> 'TournamentSet':
+        """Cria um conjunto vazio."""
+        return cls.from_tuples([])
+
+    @classmethod
+    def from_tuples(cls, rows: Iterable[tuple]) -> 'TournamentSet':
+        """Cria o conjunto a partir de tuplas na ordem das colunas de get_torneios."""
+        nomes_contas, nomes_tipos = [], []
+        codigo_conta, codigo_tipo = {}, {}
+        ids, dias, contas, tipos, buy_ins, ganhos, minutos = [], [], [], [], [], [], []
+
+        for row in rows:
+            id_torneio, data_torneio, nome_conta, nome_tipo, buy_in, ganho_total = row[:6]
+            hora_inicio = row[8] if len(row) > 8 else None
+
+            if nome_conta not in codigo_conta:
+                codigo_conta[nome_conta] = len(nomes_contas)
+                nomes_contas.append(nome_conta)
+            if nome_tipo not in codigo_tipo:
+                codigo_tipo[nome_tipo] = len(nomes_tipos)
+                nomes_tipos.append(nome_tipo)
+
+            ids.append(id_torneio)
+            dias.append(data_torneio[:10])
+            contas.append(codigo_conta[nome_conta])
+            tipos.append(codigo_tipo[nome_tipo])
+            buy_ins.append(buy_in)
+            ganhos.append(ganho_total)
+            minutos.append(int(hora_inicio[:2]) * 60 + int(hora_inicio[3:5]) if hora_inicio else -1)
+
+        if len(nomes_contas) > 256 or len(nomes_tipos) > 256:
+            raise ValueError("TournamentSet suporta no máximo 256 contas e 256 tipos de torneio")
+
+        return cls(
+            np.array(ids, dtype=np.int64),
+            np.array(dias, dtype='datetime64[D]').astype(np.int32),
+            np.array(contas, dtype=np.uint8),
+            np.array(tipos, dtype=np.uint8),
+            np.array(buy_ins, dtype=np.float64),
+            np.array(ganhos, dtype=np.float64),
+            np.array(minutos, dtype=np.int16),
+            nomes_contas,
+            nomes_tipos
+        )
+
+    @classmethod
+    def from_rows(cls, torneios: List[Dict]) -> 'TournamentSet':
+        """Cria o conjunto a partir de dicionários no formato de get_torneios."""
+        return cls.from_tuples(
+            (t['id_torneio'], t['data_torneio'], t['nome_conta'], t['nome_tipo'],
+             t['buy_in'], t['ganho_total'], None, None, t.get('hora_inicio'))
+            for t in torneios
+        )
+
+    def _com_indices(self, indices: Union[slice, np.ndarray]) -> 'TournamentSet':
+        return TournamentSet(
+            self.ids[indices], self.dias[indices], self.codigos_conta[indices],
+            self.codigos_tipo[indices], self.buy_in[indices], self.ganho_total[indices],
+            self.minutos_inicio[indices], self.nomes_contas, self.nomes_tipos
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, chave):
+        if isinstance(chave, slice):
+            # Fatias de arrays numpy são visões: nenhuma cópia de dados
+            return self._com_indices(chave)
+        if isinstance(chave, np.ndarray):
+            return self._com_indices(chave)
+        if chave < 0:
+            chave += len(self)
+        if not 0 <= chave < len(self):
+            raise IndexError("índice fora do intervalo")
+        return TournamentRow(self, chave)
+
+    def filter(self, mascara: np.ndarray) -> 'TournamentSet':
+        """Retorna os torneios onde a máscara booleana é verdadeira."""
+        return self._com_indices(np.asarray(mascara, dtype=bool))
+
+    def sort_by_date(self) -> 'TournamentSet':
+        """Retorna o conjunto ordenado por data (id desempata)."""
+        return self._com_indices(np.lexsort((self.ids, self.dias)))
+
+    def codigo_conta(self, nome_conta: str) -> Optional[int]:
+        """Código uint8 de uma conta, ou None se ela não aparece no conjunto."""
+        return self.nomes_contas.index(nome_conta) if nome_conta in self.nomes_contas else None
+
+    def codigo_tipo(self, nome_tipo: str) -> Optional[int]:
+        """Código uint8 de um tipo de torneio, ou None se ele não aparece no conjunto."""
+        return self.nomes_tipos.index(nome_tipo) if nome_tipo in self.nomes_tipos else None
+
+    @property
+    def datas(self) -> np.ndarray:
+        """Datas como datetime64[D]."""
+        return self.dias.astype('datetime64[D]')
+
+    @property
+    def lucro_liquido(self) -> np.ndarray:
+        return self.ganho_total - self.buy_in
+
+    @property
+    def roi(self) -> np.ndarray:
+        return np.divide((self.ganho_total - self.buy_in) * 100, self.buy_in,
+                         out=np.zeros(len(self)), where=self.buy_in > 0)
+
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos arrays de colunas."""
+        return sum(a.nbytes for a in (self.ids, self.dias, self.codigos_conta, self.codigos_tipo,
+                                      self.buy_in, self.ganho_total, self.minutos_inicio))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Converte para DataFrame com as mesmas colunas de pd.DataFrame(get_torneios())."""
+        horas = np.where(
+            self.minutos_inicio >= 0,
+            np.char.add(
+                np.char.add(np.char.zfill((self.minutos_inicio // 60).astype(str), 2), ':'),
+                np.char.zfill((self.minutos_inicio % 60).astype(str), 2)
+            ),
+            None
+        ) if len(self) else np.array([], dtype=object)
+        return pd.DataFrame({
+            'id_torneio': self.ids,
+            'data_torneio': self.datas.astype(str),
+            'nome_conta': pd.Categorical.from_codes(self.codigos_conta, self.nomes_contas),
+            'nome_tipo': pd.Categorical.from_codes(self.codigos_tipo, self.nomes_tipos),
+            'buy_in': self.buy_in,
+            'ganho_total': self.ganho_total,
+            'lucro_liquido': self.lucro_liquido,
+            'roi': self.roi,
+            'hora_inicio': horas
+        }, columns=list(COLUNAS))
+
+    def iter_dicts(self, tamanho_lote: int = 4096) -> Iterator[Dict]:
+        """Itera dicionários por lote, sem materializar a lista inteira."""
+        for inicio in range(0, len(self), tamanho_lote):
+            yield from self[inicio:inicio + tamanho_lote].to_dicts()
+
+    def to_dicts(self) -> List[Dict]:
+        """Converte para a lista de dicionários usada pelos chamadores antigos."""
+        return self.to_dataframe().astype({'nome_conta': object, 'nome_tipo': object}).to_dict('records')
+
+
+def as_dataframe(torneios: Union[TournamentSet, List[Dict]]) -> pd.DataFrame:
+    """DataFrame de torneios, usando as colunas diretamente quando for um TournamentSet."""
+    if isinstance(torneios, TournamentSet):
+        return torneios.to_dataframe()
+    return pd.DataFrame(torneios)
@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+from tournament_set import TournamentSet
+
+MAGICO = b'PKSNAP01'
+
+# Cada coluna começa num múltiplo disto, para as visões numpy ficarem alinhadas
+ALINHAMENTO = 64
+
+COLUNAS = (
+    ('ids', '<i8'),
+    ('dias', '<i4'),
+    ('codigos_conta', 'u1'),
+    ('codigos_tipo', 'u1'),
+    ('buy_in', '<f8'),
+    ('ganho_total', '<f8'),
+    ('minutos_inicio', '<i2'),
+)
+
+
+def _alinhar(posicao: int) -> int:
+    return -(-posicao // ALINHAMENTO) * ALINHAMENTO
+
+
+def _dias(data) -> int:
+    return int(np.datetime64(str(data)[:10], 'D').astype(np.int64))
+
+
+class TournamentSnapshot:
+    """Histórico completo de torneios num arquivo binário aberto com np.memmap.
+
+    O arquivo tem um cabeçalho JSON (versão dos dados do banco que ele reflete,
+    nomes de contas e tipos, posição de cada coluna) seguido das colunas do
+    TournamentSet. Cada processo mapeia o arquivo em vez de consultar o
+    histórico: as páginas vêm do cache do sistema operacional, compartilhadas
+    entre processos, e nada é copiado até um filtro criar um subconjunto.
+    Quando a versão do banco muda, quem perceber primeiro refaz o arquivo e o
+    troca atomicamente; quem mapeou o anterior continua lendo dele.
+    """
+
+    def __init__(self, db, caminho: Optional[str] = None):
+        self.db = db
+        self.caminho = caminho or os.path.join(os.path.dirname(os.path.abspath(db.db_path)), 'snapshot', 'torneios.bin')
+        self.reconstrucoes = 0
+        self.mapeamentos = 0
+
+        self._conjunto = None
+        self._versao = None
+        self._lock = threading.Lock()
+
+    def obter(self) -> TournamentSet:
+        """Histórico completo, na ordem de get_torneios, na versão atual do banco."""
+        versao = self.db.get_versao_dados()
+        with self._lock:
+            if self._versao != versao and not self._mapear(versao):
+                self._gravar(versao)
+            return self._conjunto
+
+    def filtrar(self, id_conta: Optional[int] = None,
+                id_tipo_torneio: Optional[int] = None,
+                data_inicio: Optional[str] = None,
+                data_fim: Optional[str] = None) -> TournamentSet:
+        """Mesmo resultado de get_torneios_set, filtrando o snapshot com máscaras."""
+        conjunto = self.obter()
+        mascara = np.ones(len(conjunto), dtype=bool)
+
+        if id_conta:
+            nome = next((c['nome'] for c in self.db.get_contas() if c['id'] == id_conta), None)
+            codigo = conjunto.codigo_conta(nome)
+            if codigo is None:
+                return TournamentSet.empty()
+            mascara &= conjunto.codigos_conta == codigo
+
+        if id_tipo_torneio:
+            nome = next((t['nome'] for t in self.db.get_tipos_torneio() if t['id'] == id_tipo_torneio), None)
+            codigo = conjunto.codigo_tipo(nome)
+            if codigo is None:
+                return TournamentSet.empty()
+            mascara &= conjunto.codigos_tipo == codigo
+
+        if data_inicio:
+            mascara &= conjunto.dias >= _dias(data_inicio)
+
+        if data_fim:
+            mascara &= conjunto.dias <= _dias(data_fim)
+
+        if mascara.all():
+            return conjunto  # Sem cópia: as colunas continuam sendo o arquivo mapeado
+        return conjunto.filter(mascara)
+
+    def _mapear(self, versao: int) -> bool:
+        """Mapeia o arquivo em disco se ele refletir a versão pedida do banco."""
+        try:
+            with open(self.caminho, 'rb') as f:
+                if f.read(len(MAGICO)) != MAGICO:
+                    return False
+                tamanho = int.from_bytes(f.read(8), 'little')
+                cabecalho = json.loads(f.read(tamanho))
+                if cabecalho['versao'] != versao or cabecalho['origem'] != os.path.abspath(self.db.db_path):
+                    return False
+
+                # O mapeamento usa o arquivo já aberto: uma troca concorrente não o afeta
+                linhas = cabecalho['linhas']
+                bruto = np.memmap(f, dtype=np.uint8, mode='r') if linhas else None
+        except (OSError, ValueError, KeyError):
+            return False
+
+        inicio = _alinhar(len(MAGICO) + 8 + tamanho)
+        colunas = {}
+        for nome, tipo in COLUNAS:
+            if linhas:
+                posicao = inicio + cabecalho['posicoes'][nome]
+                colunas[nome] = np.asarray(bruto[posicao:posicao + linhas * np.dtype(tipo).itemsize].view(tipo))
+            else:
+                colunas[nome] = np.empty(0, dtype=tipo)
+
+        self._conjunto = TournamentSet(nomes_contas=cabecalho['nomes_contas'],
+                                       nomes_tipos=cabecalho['nomes_tipos'], **colunas)
+        self._versao = versao
+        self.mapeamentos += 1
+        return True
+
+    def _gravar(self, versao: int):
+        """Consulta o histórico, grava o arquivo (troca atômica) e passa a usá-lo."""
+        conjunto = TournamentSet.from_tuples(self.db._consultar_torneios())
+
+        posicoes, posicao = {}, 0
+        for nome, tipo in COLUNAS:
+            posicao = _alinhar(posicao)
+            posicoes[nome] = posicao
+            posicao += len(conjunto) * np.dtype(tipo).itemsize
+
+        cabecalho = json.dumps({
+            'versao': versao,
+            'origem': os.path.abspath(self.db.db_path),
+            'linhas': len(conjunto),
+            'nomes_contas': conjunto.nomes_contas,
+            'nomes_tipos': conjunto.nomes_tipos,
+            'posicoes': posicoes
+        }).encode('utf-8')
+
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        temporario = f"{self.caminho}.{os.getpid()}.{threading.get_ident()}"
+        with open(temporario, 'wb') as f:
+            f.write(MAGICO)
+            f.write(len(cabecalho).to_bytes(8, 'little'))
+            f.write(cabecalho)
+            inicio = _alinhar(f.tell())
+            for nome, tipo in COLUNAS:
+                f.write(b'\0' * (inicio + posicoes[nome] - f.tell()))
+                f.write(np.ascontiguousarray(getattr(conjunto, nome), dtype=tipo).tobytes())
+        os.replace(temporario, self.caminho)
+        self.reconstrucoes += 1
+
+        # Outro processo pode ter trocado o arquivo nesse meio tempo: fica com o conjunto consultado
+        if not self._mapear(versao):
+            self._conjunto, self._versao = conjunto, versao
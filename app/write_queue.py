@@ -0,0 +1,185 @@
+import atexit
+import queue
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from metrics import registry
+
+_PARAR = object()
+
+def erro_de_lock(erro: Exception) -> bool:
+    """Indica se o erro é de contenção (banco ocupado/travado por outra conexão)."""
+    mensagem = str(erro).lower()
+    return isinstance(erro, sqlite3.OperationalError) and ('locked' in mensagem or 'busy' in mensagem)
+
+
+class SQLiteWriteQueue:
+    """Thread única de escrita com group commit.
+
+    A thread é dona da conexão de escrita e consome uma fila de operações.
+    Operações que chegam enquanto a anterior está gravando são agrupadas na
+    mesma transação (até `max_lote`), cada uma em seu próprio SAVEPOINT: o erro
+    de uma operação desfaz só ela. Contenção com outros processos é tratada com
+    busy timeout e novas tentativas com backoff; quem enfileira recebe um Future.
+    `ao_commit` é chamado após cada commit, antes de os Futures serem resolvidos.
+    """
+
+    def __init__(self, db_path: str, timeout_ocupado: float = 5.0, max_lote: int = 256,
+                 tentativas: int = 5, backoff_inicial: float = 0.05,
+                 ao_commit: Optional[Callable[[], None]] = None,
+                 fabrica_conexao: type = sqlite3.Connection):
+        self.db_path = db_path
+        self.fabrica_conexao = fabrica_conexao
+        self.ao_commit = ao_commit
+        self.timeout_ocupado = timeout_ocupado
+        self.max_lote = max_lote
+        self.tentativas = tentativas
+        self.backoff_inicial = backoff_inicial
+
+        self.transacoes = 0
+        self.operacoes = 0
+        self.retentativas = 0
+
+        self._fila = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.parar)
+
+    def executar(self, operacao: Callable[[sqlite3.Cursor], Any]) -> Future:
+        """Enfileira `operacao(cursor)`; o Future resolve com o retorno dela após o commit."""
+        futuro = Future()
+        self._iniciar()
+        self._fila.put((operacao, futuro))
+        return futuro
+
+    def parar(self, timeout: float = 10.0):
+        """Grava o que já está na fila e encerra a thread."""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._fila.put(_PARAR)
+        thread.join(timeout)
+        with self._lock:
+            self._thread = None
+
+    def _iniciar(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._executar, name='sqlite-escrita', daemon=True)
+            self._thread.start()
+
+    def _conectar(self) -> sqlite3.Connection:
+        # isolation_level=None: as transações são controladas explicitamente
+        return sqlite3.connect(self.db_path, timeout=self.timeout_ocupado, isolation_level=None,
+                               factory=self.fabrica_conexao)
+
+    def _executar(self):
+        conn = self._conectar()
+        try:
+            while True:
+                item = self._fila.get()
+                if item is _PARAR:
+                    return
+                lote = [item]
+                parar = False
+                # Tudo o que chegou enquanto a transação anterior gravava entra no mesmo commit
+                while len(lote) < self.max_lote:
+                    try:
+                        item = self._fila.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _PARAR:
+                        parar = True
+                        break
+                    lote.append(item)
+
+                try:
+                    self._gravar_lote(conn, lote)
+                except Exception as e:
+                    # Erro fora do previsto (ex.: ROLLBACK falhando): a thread segue viva,
+                    # com uma conexão nova, e ninguém fica esperando um Future para sempre
+                    self._falhar(lote, e)
+                    conn.close()
+                    conn = self._conectar()
+                except BaseException as e:
+                    self._falhar(lote, e)
+                    raise
+                if parar:
+                    return
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _falhar(lote: List[Tuple[Callable, Future]], erro: BaseException):
+        """Resolve com `erro` os Futures do lote que ainda não foram resolvidos."""
+        registry.contar_erro('escrita', 'commit')
+        for _, futuro in lote:
+            if not futuro.done():
+                futuro.set_exception(erro)
+
+    def _gravar_lote(self, conn: sqlite3.Connection, lote: List[Tuple[Callable, Future]]):
+        lote = [(operacao, futuro) for operacao, futuro in lote if futuro.set_running_or_notify_cancel()]
+        if not lote:
+            return
+
+        backoff = self.backoff_inicial
+        inicio = time.perf_counter()
+        for tentativa in range(self.tentativas):
+            try:
+                resultados = self._transacao(conn, lote)
+                break
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                if not erro_de_lock(e) or tentativa == self.tentativas - 1:
+                    for _, futuro in lote:
+                        futuro.set_exception(e)
+                    registry.contar_erro('escrita', 'commit')
+                    return
+                self.retentativas += 1
+                time.sleep(backoff * (1 + random.random()))
+                backoff *= 2
+
+        self.transacoes += 1
+        self.operacoes += len(lote)
+        registry.observar('escrita', 'commit', time.perf_counter() - inicio)
+        registry.contar_linhas('escrita', 'commit', len(lote))
+        if self.ao_commit is not None:
+            try:
+                self.ao_commit()
+            except Exception as e:
+                # O lote já foi gravado: o erro do callback não vira falha das operações
+                print(f"Erro após gravar lote: {e}")
+                registry.contar_erro('escrita', 'ao_commit')
+
+        for (_, futuro), (sucesso, valor) in zip(lote, resultados):
+            if sucesso:
+                futuro.set_result(valor)
+            else:
+                futuro.set_exception(valor)
+
+    def _transacao(self, conn: sqlite3.Connection, lote: List[Tuple[Callable, Future]]) -> List[Tuple[bool, Any]]:
+        """Executa o lote numa transação; erros de lock sobem para nova tentativa do lote inteiro."""
+        resultados = []
+        cursor = conn.cursor()
+        # IMMEDIATE reserva a escrita já no início: a espera pelo lock fica no busy timeout
+        cursor.execute("BEGIN IMMEDIATE")
+        for operacao, _ in lote:
+            cursor.execute("SAVEPOINT operacao")
+            try:
+                resultados.append((True, operacao(cursor)))
+                cursor.execute("RELEASE operacao")
+            except Exception as e:
+                if erro_de_lock(e):
+                    raise
+                cursor.execute("ROLLBACK TO operacao")
+                cursor.execute("RELEASE operacao")
+                resultados.append((False, e))
+        cursor.execute("COMMIT")
+        return resultados
@@ -0,0 +1,155 @@
+"""Conferência do estado analítico incremental contra o recálculo completo.
+
+Sobre um banco sintético, mantém estados de PokerAnalyticsCache para alguns
+filtros e reproduz uma sequência de escritas como o dashboard as faz:
+- inserções no fim da linha do tempo (inclusive no mesmo dia), aplicadas com
+  registrar_insercao e a versão dos dados logo após a escrita;
+- inserções retroativas, que descartam o estado;
+- edições seguidas de invalidar(), como no formulário de edição;
+- exclusões por outra conexão, sem avisar o cache (só a versão dos dados muda).
+
+Após cada escrita, o estado de cada filtro é comparado com PokerCalculations
+por verificar(); qualquer divergência encerra o script com erro. Também relata
+o tempo da atualização incremental vs a reconstrução do estado.
+
+Uso:
+    python benchmarks/bench_analytics_state.py [--linhas 3000] [--escritas 200] [--diretorio DIR]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault('POKER_METRICS_DIR', '')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from dataset import popular_banco, BUY_INS
+from database import PokerDatabase
+from analytics import PokerAnalyticsCache, PokerAnalyticsState
+from calculations import PokerCalculations
+
+
+def filtros(db: PokerDatabase) -> list:
+    """Chaves no formato do dashboard: (id_conta, id_tipo, data_inicio, data_fim)."""
+    conta = db.get_contas()[0]['id']
+    tipo = db.get_tipos_torneio()[0]['id']
+    return [
+        (None, None, None, None),
+        (conta, None, None, None),
+        (None, tipo, None, None),
+        (None, None, '2024-01-01', None),
+        (conta, None, '2024-06-01', '2025-06-30'),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=3000)
+    parser.add_argument("--escritas", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--diretorio", help="onde guardar o banco sintético (recriado a cada execução)")
+    args = parser.parse_args()
+
+    diretorio = args.diretorio or tempfile.mkdtemp(prefix='poker_estado_')
+    os.makedirs(diretorio, exist_ok=True)
+    db_path = os.path.join(diretorio, f'torneios_{args.linhas}.db')
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db = popular_banco(db_path, args.linhas, seed=args.seed)
+    # Outra conexão (outro processo/sessão) que escreve sem passar pelo cache
+    outro = PokerDatabase(db_path)
+
+    # Mesmo dia: o estado segue (data, id); get_torneios só ordena por data DESC
+    estado = PokerAnalyticsState.from_torneios(db.get_torneios_set())
+    pela_consulta = PokerCalculations.calculate_variance_and_downswing(db.get_torneios())['maior_downswing']
+    print(f"{args.linhas} torneios (seed {args.seed})")
+    print(f"Maior downswing, ordem (data, id):        R$ {estado.calculate_variance_and_downswing()['maior_downswing']:.2f}")
+    print(f"Maior downswing, ordem de get_torneios:   R$ {pela_consulta:.2f}")
+
+    rng = random.Random(args.seed)
+    contas = [conta['id'] for conta in db.get_contas()]
+    tipos = [tipo['id'] for tipo in db.get_tipos_torneio()]
+    chaves = filtros(db)
+    cache = PokerAnalyticsCache()
+    contagem = {'fim': 0, 'retroativa': 0, 'edição': 0, 'exclusão': 0}
+    incrementais = reconstrucoes = 0
+    tempo_incremental = tempo_reconstrucao = 0.0
+    divergencias = []
+
+    def conferir(escrita: int, operacao: str):
+        nonlocal incrementais, reconstrucoes, tempo_reconstrucao
+        versao = db.get_versao_dados()
+        for chave in chaves:
+            torneios = db.get_torneios_set(*chave)
+            incremental = chave in cache._estados and cache._estados[chave][0] == versao
+            inicio = time.perf_counter()
+            estado = cache.obter(chave, torneios, versao)
+            if incremental:
+                incrementais += 1
+            else:
+                reconstrucoes += 1
+                tempo_reconstrucao += time.perf_counter() - inicio
+            for divergencia in estado.verificar(torneios):
+                divergencias.append(f"escrita {escrita} ({operacao}), filtro {chave}: {divergencia}")
+
+    conferir(0, 'inicial')
+    for escrita in range(1, args.escritas + 1):
+        torneios = db.get_torneios_set()
+        ids, ultima = torneios.ids, str(torneios.datas.max())
+        sorteio = rng.random()
+
+        if sorteio < 0.15:
+            operacao = 'edição'
+            id_torneio = int(rng.choice(ids))
+            data = (date(2023, 1, 1) + timedelta(days=rng.randrange(3 * 365))).isoformat()
+            buy_in = float(rng.choice(BUY_INS))
+            db.update_torneio(id_torneio, data, rng.choice(contas), rng.choice(tipos),
+                              buy_in, round(buy_in * rng.choice([0, 0, 0, 1.5, 4, 30]), 2))
+            cache.invalidar()
+        elif sorteio < 0.3:
+            operacao = 'exclusão'
+            outro.delete_torneio(int(rng.choice(ids)))
+        else:
+            if sorteio < 0.45:
+                operacao = 'retroativa'
+                data = (date.fromisoformat(ultima) - timedelta(days=rng.randint(1, 400))).isoformat()
+            else:
+                operacao = 'fim'
+                data = (date.fromisoformat(ultima) + timedelta(days=rng.choice([0, 0, 1, 2]))).isoformat()
+            id_conta, id_tipo = rng.choice(contas), rng.choice(tipos)
+            buy_in = float(rng.choice(BUY_INS))
+            ganho_total = round(buy_in * rng.choice([0, 0, 0, 0, 1.5, 4, 30]), 2)
+            if db.insert_torneio_async(data, id_conta, id_tipo, buy_in, ganho_total).result() is None:
+                continue
+            # Como o formulário de inserção: sem id, com a versão logo após a escrita
+            versao = db.get_versao_dados()
+            inicio = time.perf_counter()
+            cache.registrar_insercao({'data_torneio': data, 'buy_in': buy_in, 'ganho_total': ganho_total},
+                                     id_conta, id_tipo, versao)
+            if operacao == 'fim':
+                tempo_incremental += time.perf_counter() - inicio
+
+        contagem[operacao] += 1
+        conferir(escrita, operacao)
+
+    print(f"Escritas: {', '.join(f'{quantidade} {nome}' for nome, quantidade in contagem.items())}")
+    print(f"Leituras do estado: {incrementais} incrementais, {reconstrucoes} reconstruções")
+    if contagem['fim']:
+        print(f"registrar_insercao: {tempo_incremental / contagem['fim'] * 1e6:10.1f} us por inserção")
+    if reconstrucoes:
+        print(f"from_torneios:      {tempo_reconstrucao / reconstrucoes * 1e6:10.1f} us por reconstrução")
+
+    if divergencias:
+        print("\n".join(divergencias[:20]))
+        raise SystemExit(f"{len(divergencias)} divergências entre o estado incremental e o recálculo")
+    if not incrementais:
+        raise SystemExit("Nenhuma leitura usou o estado incremental")
+    print("Sem divergências")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark do snapshot colunar (PokerColumnarStore) contra as consultas SQL.
+
+Para cada tamanho de banco sintético, mede as consultas analíticas no
+PokerDatabase comum e com colunar=True, confere que os resultados são
+iguais (a menos da ordem de soma em ponto flutuante) e relata o tempo de
+montar o snapshot, de recarregá-lo do disco e de anexar um delta de 1000
+inserções.
+
+Uso:
+    python benchmarks/bench_columnar.py [--linhas 100000 1000000] [--repeticoes 5] [--diretorio DIR]
+"""
+import argparse
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('POKER_METRICS_DIR', '')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from dataset import popular_banco
+from database import PokerDatabase
+
+CONSULTAS = {
+    'estatisticas_gerais': lambda db: db.get_estatisticas_gerais(),
+    'estatisticas_conta_ano': lambda db: db.get_estatisticas_gerais(2, '2024-01-01', '2024-12-31'),
+    'estatisticas_por_tipo': lambda db: db.get_estatisticas_por_tipo(),
+    'resumo_mensal': lambda db: db.get_resumo_mensal(),
+    'performance_semanal': lambda db: db.get_performance_por_periodo('weekly'),
+    'performance_mensal': lambda db: db.get_performance_por_periodo('monthly'),
+    'cubo_mes_conta_tipo': lambda db: db.get_cubo(('mes', 'conta', 'tipo')),
+}
+
+
+def iguais(esperado, obtido) -> bool:
+    if isinstance(esperado, float) or isinstance(obtido, float):
+        return esperado == obtido or math.isclose(esperado, obtido, rel_tol=1e-9, abs_tol=1e-9)
+    if isinstance(esperado, dict):
+        return esperado.keys() == obtido.keys() and all(iguais(esperado[k], obtido[k]) for k in esperado)
+    if isinstance(esperado, list):
+        return len(esperado) == len(obtido) and all(iguais(e, o) for e, o in zip(esperado, obtido))
+    return esperado == obtido
+
+
+def medir(consulta, db, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        consulta(db)
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--diretorio", help="onde guardar os bancos sintéticos (reaproveitados entre execuções)")
+    args = parser.parse_args()
+
+    diretorio = args.diretorio or tempfile.mkdtemp(prefix='poker_colunar_')
+    os.makedirs(diretorio, exist_ok=True)
+
+    for linhas in args.linhas:
+        origem = os.path.join(diretorio, f'torneios_{linhas}.db')
+        if not os.path.exists(origem):
+            popular_banco(origem, linhas, seed=args.seed)
+
+        # Cópia de trabalho: o delta de inserções não altera o banco reaproveitado
+        db_path = os.path.join(diretorio, 'trabalho', f'torneios_{linhas}.db')
+        shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+        os.makedirs(os.path.dirname(db_path))
+        shutil.copy(origem, db_path)
+
+        sql = PokerDatabase(db_path)
+        colunar = PokerDatabase(db_path, colunar=True)
+        if colunar.colunar is None:
+            print("pyarrow não instalado: nada a comparar")
+            return
+
+        inicio = time.perf_counter()
+        colunar.colunar.atualizar()
+        montagem = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        PokerDatabase(db_path, colunar=True).colunar.atualizar()
+        recarga = time.perf_counter() - inicio
+
+        print(f"\n{linhas} torneios: snapshot montado em {montagem:.2f}s, recarregado do disco em {recarga:.2f}s")
+        print(f"{'consulta':<26}{'SQL (ms)':>10}{'colunar (ms)':>14}{'iguais':>8}")
+        for nome, consulta in CONSULTAS.items():
+            ok = iguais(consulta(sql), consulta(colunar))
+            print(f"{nome:<26}{medir(consulta, sql, args.repeticoes):>10.1f}"
+                  f"{medir(consulta, colunar, args.repeticoes):>14.1f}{'sim' if ok else 'NÃO':>8}")
+
+        colunar.insert_torneios_lote([('2026-01-15', 1, 1, 11.0, 0.0, '20:00')] * 1000)
+        inicio = time.perf_counter()
+        colunar.colunar.atualizar()
+        print(f"Delta de 1000 inserções anexado em {(time.perf_counter() - inicio) * 1000:.1f} ms "
+              f"({colunar.colunar.deltas_aplicados} delta, {colunar.colunar.reconstrucoes} reconstrução)")
+
+
+if __name__ == "__main__":
+    main()
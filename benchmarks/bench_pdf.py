@@ -0,0 +1,90 @@
+"""Benchmark do PDF de histórico completo (PokerExport.export_to_pdf_completo).
+
+Para cada tamanho de banco sintético, gera o relatório num processo novo e
+relata o tempo total, o tempo por 10 mil torneios, páginas, tamanho do
+arquivo e o pico de memória residente do processo. Com o streaming do banco
+em blocos, o tempo deve crescer linearmente e a memória bem abaixo disso.
+
+Uso:
+    python benchmarks/bench_pdf.py [--linhas 10000 50000 100000] [--linhas-por-tabela 500] [--saida pdf.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('POKER_METRICS_DIR', '')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from dataset import popular_banco
+
+
+def gerar(db_path: str, pdf_path: str, linhas_por_tabela: int) -> dict:
+    """Gera o relatório (em processo próprio, para o pico de memória ser só dele)."""
+    from database import PokerDatabase
+    from export import PokerExport
+    import reportlab.platypus  # noqa: F401  (import fora da medição)
+
+    db = PokerDatabase(db_path)
+    memoria_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    PokerExport.export_to_pdf_completo(db, pdf_path, linhas_por_tabela=linhas_por_tabela)
+    segundos = time.perf_counter() - inicio
+
+    with open(pdf_path, 'rb') as f:
+        paginas = len(re.findall(rb'/Type /Page\b', f.read()))
+
+    return {
+        'segundos': segundos,
+        'paginas': paginas,
+        'arquivo_mb': os.path.getsize(pdf_path) / 1e6,
+        # ru_maxrss é em KB no Linux
+        'pico_memoria_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'memoria_inicial_mb': memoria_inicial / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs='+', default=[10000, 50000, 100000])
+    parser.add_argument("--linhas-por-tabela", type=int, default=500, help="linhas por bloco de LongTable")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--diretorio", help="onde guardar os bancos sintéticos (reaproveitados entre execuções)")
+    parser.add_argument("--saida", help="arquivo JSON com o resultado")
+    args = parser.parse_args()
+
+    diretorio = args.diretorio or tempfile.mkdtemp(prefix='poker_pdf_')
+    os.makedirs(diretorio, exist_ok=True)
+    contexto = multiprocessing.get_context('spawn')
+
+    resultados = []
+    for linhas in args.linhas:
+        db_path = os.path.join(diretorio, f'torneios_{linhas}.db')
+        if not os.path.exists(db_path):
+            popular_banco(db_path, linhas, seed=args.seed)
+
+        with contexto.Pool(1) as pool:
+            resultado = pool.apply(gerar, (db_path, os.path.join(diretorio, f'historico_{linhas}.pdf'),
+                                           args.linhas_por_tabela))
+        resultado['linhas'] = linhas
+        resultado['segundos_por_10k'] = resultado['segundos'] / linhas * 10000
+        resultados.append(resultado)
+        print(f"{linhas:>8} torneios: {resultado['segundos']:7.1f}s "
+              f"({resultado['segundos_por_10k']:.2f}s por 10k), {resultado['paginas']} páginas, "
+              f"{resultado['arquivo_mb']:.1f} MB, pico de memória {resultado['pico_memoria_mb']:.0f} MB "
+              f"(antes do build {resultado['memoria_inicial_mb']:.0f} MB)")
+
+    if args.saida:
+        with open(args.saida, 'w') as f:
+            json.dump({'linhas_por_tabela': args.linhas_por_tabela, 'resultados': resultados},
+                      f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark dos cenários "e se": avaliação vetorizada (PokerScenarios) vs um cenário por vez.
+
+Para cada tamanho de banco sintético, avalia um lote de cenários (tipos
+excluídos, faixa de buy-in, contas excluídas, stake multiplicada) de duas formas:
+- um por vez: filtra o TournamentSet e reconstrói o PokerAnalyticsState de
+  cada cenário, o caminho que a tela percorre ao trocar os filtros;
+- vetorizado: PokerScenarios.avaliar com todos os cenários numa passada.
+
+Confere que ROI, ITM, lucro e maior downswing batem (a menos da ordem de soma
+em ponto flutuante). O caminho um por vez não tem stake multiplicada: esses
+cenários só entram no tempo do vetorizado.
+
+Uso:
+    python benchmarks/bench_scenarios.py [--linhas 100000 1000000] [--diretorio DIR]
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('POKER_METRICS_DIR', '')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from dataset import popular_banco
+from database import PokerDatabase
+from analytics import PokerAnalyticsState
+from scenarios import PokerScenarios
+
+
+def cenarios(torneios) -> list:
+    lista = [{'nome': 'Atual'}]
+    lista += [{'nome': f"Sem {tipo}", 'excluir_tipos': [tipo]} for tipo in torneios.nomes_tipos]
+    lista += [{'nome': 'Buy-in até R$ 50', 'buy_in_max': 50}]
+    lista += [{'nome': f"Sem {conta}", 'excluir_contas': [conta]} for conta in torneios.nomes_contas[:3]]
+    return lista
+
+
+def um_por_vez(motor: PokerScenarios, cenario: dict) -> dict:
+    """Mesmas métricas filtrando o conjunto e refazendo o estado analítico do cenário."""
+    estado = PokerAnalyticsState.from_torneios(motor.torneios.filter(motor.mascara(cenario)))
+    estatisticas = estado.get_estatisticas()
+    return {
+        'roi': estatisticas['roi_geral'],
+        'itm_percentage': estatisticas['itm_percentage'],
+        'lucro_liquido': estatisticas['lucro_liquido'],
+        'maior_downswing': estado.calculate_variance_and_downswing()['maior_downswing']
+    }
+
+
+def iguais(esperado: dict, obtido: dict) -> bool:
+    return all(math.isclose(esperado[chave], obtido[chave], rel_tol=1e-9, abs_tol=1e-6) for chave in esperado)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--diretorio", help="onde guardar os bancos sintéticos (reaproveitados entre execuções)")
+    args = parser.parse_args()
+
+    diretorio = args.diretorio or tempfile.mkdtemp(prefix='poker_cenarios_')
+    os.makedirs(diretorio, exist_ok=True)
+
+    for linhas in args.linhas:
+        db_path = os.path.join(diretorio, f'torneios_{linhas}.db')
+        if not os.path.exists(db_path):
+            popular_banco(db_path, linhas, seed=args.seed)
+
+        torneios = PokerDatabase(db_path).get_torneios_set()
+        lista = cenarios(torneios)
+        com_stake = lista + [{'nome': f"{tipo} com stake dobrada", 'multiplicadores': {tipo: 2}}
+                             for tipo in torneios.nomes_tipos]
+
+        inicio = time.perf_counter()
+        motor = PokerScenarios(torneios)
+        preparo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        esperados = [um_por_vez(motor, cenario) for cenario in lista]
+        sequencial = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        obtidos = motor.avaliar(lista)
+        vetorizado = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        motor.avaliar(com_stake)
+        vetorizado_stake = time.perf_counter() - inicio
+
+        ok = all(iguais(e, o) for e, o in zip(esperados, obtidos))
+        print(f"\n{linhas} torneios, {len(lista)} cenários (preparo dos arrays: {preparo * 1000:.1f} ms)")
+        print(f"{'um por vez':<34}{sequencial * 1000:>12.1f} ms")
+        print(f"{'vetorizado':<34}{vetorizado * 1000:>12.1f} ms   iguais: {'sim' if ok else 'NÃO'}")
+        print(f"{f'vetorizado + {len(com_stake) - len(lista)} com stake':<34}{vetorizado_stake * 1000:>12.1f} ms")
+        print(f"Maior downswing do cenário atual: R$ {obtidos[0]['maior_downswing']:.2f} "
+              f"(ROI {obtidos[0]['roi']:.2f}%, {obtidos[0]['total_torneios']} torneios)")
+
+
+if __name__ == "__main__":
+    main()
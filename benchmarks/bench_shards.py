@@ -0,0 +1,103 @@
+"""Benchmark dos shards por conta: PokerDatabase vs ShardedPokerDatabase.
+
+Com os mesmos torneios sintéticos nos dois formatos, mede:
+- importações concorrentes: uma thread por conta grava lotes de torneios ao
+  mesmo tempo (no banco único todas passam pela mesma fila de escrita; com
+  shards, cada conta tem a sua);
+- consultas sem filtro de conta (estatísticas gerais, por tipo, resumo mensal
+  e sessões diárias), que nos shards rodam em paralelo e são somadas.
+
+O ganho das consultas depende do número de núcleos: com um só, o custo de
+juntar os parciais aparece sem a compensação do paralelismo.
+
+Uso:
+    python benchmarks/bench_shards.py [--linhas 100000] [--lotes 20] [--tamanho-lote 200] [--repeticoes 5]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('POKER_METRICS_DIR', '')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from dataset import popular_banco
+from database import PokerDatabase
+from sharding import ShardedPokerDatabase
+
+CONSULTAS = {
+    'estatisticas_gerais': lambda db: db.get_estatisticas_gerais(),
+    'estatisticas_por_tipo': lambda db: db.get_estatisticas_por_tipo(),
+    'resumo_mensal': lambda db: db.get_resumo_mensal(),
+    'sessoes_diarias': lambda db: db.get_melhores_piores_sessoes(5),
+}
+
+
+def importar(db: PokerDatabase, contas: list, lotes: int, tamanho_lote: int) -> float:
+    """Uma thread por conta gravando lotes ao mesmo tempo; retorna os segundos."""
+    barreira = threading.Barrier(len(contas))
+
+    def trabalhador(id_conta):
+        lote = [('2026-01-15', id_conta, 1, 11.0, 0.0, '20:00')] * tamanho_lote
+        barreira.wait()
+        for _ in range(lotes):
+            db.insert_torneios_lote(lote)
+
+    grupo = [threading.Thread(target=trabalhador, args=(id_conta,)) for id_conta in contas]
+    inicio = time.perf_counter()
+    for thread in grupo:
+        thread.start()
+    for thread in grupo:
+        thread.join()
+    return time.perf_counter() - inicio
+
+
+def medir(consulta, db, repeticoes: int) -> float:
+    consulta(db)  # aquece o cache de páginas
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        consulta(db)
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--lotes", type=int, default=20, help="lotes por conta na importação concorrente")
+    parser.add_argument("--tamanho-lote", type=int, default=200)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='poker_shards_')
+    unico_path = os.path.join(diretorio, 'unico.db')
+    popular_banco(unico_path, args.linhas, seed=args.seed)
+    shutil.copy(unico_path, os.path.join(diretorio, 'principal.db'))
+
+    unico = PokerDatabase(unico_path)
+    inicio = time.perf_counter()
+    sharded = ShardedPokerDatabase(os.path.join(diretorio, 'principal.db'))
+    print(f"Migração de {args.linhas} torneios para os shards: {time.perf_counter() - inicio:.2f}s "
+          f"(núcleos: {os.cpu_count()})")
+
+    print(f"\n{'consulta sem filtro de conta':<28}{'único (ms)':>12}{'shards (ms)':>13}")
+    for nome, consulta in CONSULTAS.items():
+        print(f"{nome:<28}{medir(consulta, unico, args.repeticoes):>12.1f}"
+              f"{medir(consulta, sharded, args.repeticoes):>13.1f}")
+
+    contas = [conta['id'] for conta in unico.get_contas()]
+    total = len(contas) * args.lotes * args.tamanho_lote
+    print(f"\nImportação concorrente: {len(contas)} contas x {args.lotes} lotes de {args.tamanho_lote} ({total} torneios)")
+    for nome, db in (('único', unico), ('shards', sharded)):
+        segundos = importar(db, contas, args.lotes, args.tamanho_lote)
+        print(f"{nome:<8}{segundos:>8.2f}s {total / segundos:>10.0f} torneios/s")
+
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark da carga do histórico num processo novo: consulta SQL vs snapshot mapeado.
+
+Para cada tamanho de banco sintético, abre processos novos (spawn) que
+carregam o histórico completo e um recorte filtrado com get_torneios_set:
+- sql: PokerDatabase comum, consulta e materializa o TournamentSet;
+- snapshot frio: snapshot_binario=True sem arquivo (consulta e grava);
+- snapshot quente: snapshot_binario=True com o arquivo já gravado (só mapeia).
+
+Relata o tempo até o histórico estar disponível e o pico de memória do processo.
+
+Uso:
+    python benchmarks/bench_snapshot.py [--linhas 100000 1000000] [--diretorio DIR]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('POKER_METRICS_DIR', '')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from dataset import popular_banco
+
+
+def carregar(db_path: str, snapshot_binario: bool) -> dict:
+    """Carga do histórico num processo recém-criado."""
+    from database import PokerDatabase
+
+    memoria_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    db = PokerDatabase(db_path, snapshot_binario=snapshot_binario)
+    torneios = db.get_torneios_set()
+    historico = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    db.get_torneios_set(id_conta=2, data_inicio='2024-01-01', data_fim='2024-12-31')
+    filtrado = time.perf_counter() - inicio
+
+    return {
+        'linhas': len(torneios),
+        'historico_ms': historico * 1000,
+        'filtrado_ms': filtrado * 1000,
+        # ru_maxrss é em KB no Linux
+        'memoria_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memoria_inicial) / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--diretorio", help="onde guardar os bancos sintéticos (reaproveitados entre execuções)")
+    args = parser.parse_args()
+
+    diretorio = args.diretorio or tempfile.mkdtemp(prefix='poker_snapshot_')
+    os.makedirs(diretorio, exist_ok=True)
+    contexto = multiprocessing.get_context('spawn')
+
+    for linhas in args.linhas:
+        db_path = os.path.join(diretorio, f'torneios_{linhas}.db')
+        if not os.path.exists(db_path):
+            popular_banco(db_path, linhas, seed=args.seed)
+        shutil.rmtree(os.path.join(diretorio, 'snapshot'), ignore_errors=True)
+
+        print(f"\n{linhas} torneios")
+        print(f"{'modo':<18}{'histórico (ms)':>16}{'filtrado (ms)':>15}{'memória (MB)':>14}")
+        for nome, snapshot_binario in (('sql', False), ('snapshot frio', True), ('snapshot quente', True)):
+            with contexto.Pool(1) as pool:
+                r = pool.apply(carregar, (db_path, snapshot_binario))
+            print(f"{nome:<18}{r['historico_ms']:>16.1f}{r['filtrado_ms']:>15.1f}{r['memoria_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
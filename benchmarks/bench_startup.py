@@ -0,0 +1,154 @@
+"""Benchmark de inicialização: imports do dashboard (-X importtime) e primeiro render.
+
+Mede, em processos novos:
+- a fase de imports do app_final.py, com o tempo total de -X importtime e os
+  módulos de topo mais caros;
+- o tempo do lançamento do processo até o fim do primeiro rerun do dashboard
+  (AppTest sobre um banco sintético);
+- se as dependências pesadas de uso raro (reportlab, openpyxl, plotly.express)
+  continuam fora da inicialização.
+
+Uso:
+    python benchmarks/bench_startup.py [--repeticoes 5] [--linhas 10000] [--saida startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'app')
+
+sys.path.insert(0, APP_DIR)
+
+# Mesmos imports do topo do app_final.py
+IMPORTS_APP = """
+import streamlit as st
+import streamlit.components.v1 as components
+import pandas as pd
+from database import PokerDatabase
+from sharding import ShardedPokerDatabase
+from plotting import PokerPlotting
+from export import PokerExport
+from downloads import PokerDownloads
+from analytics import PokerAnalyticsCache
+from cache_warmer import PokerViewCache, PokerCacheWarmer
+from tables import PokerTables
+from profiling import RerunProfiler
+"""
+
+# Só devem ser carregados quando a funcionalidade for usada
+DEFERIDOS = ('reportlab', 'openpyxl', 'plotly.express')
+
+PRIMEIRO_RENDER = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=300)
+at.run()
+print(json.dumps({{
+    'excecoes': [str(e.value) for e in at.exception],
+    'carregados': [m for m in {deferidos!r} if m in sys.modules]
+}}))
+"""
+
+
+def _ambiente():
+    ambiente = dict(os.environ, POKER_METRICS_DIR='', PYTHONPATH=APP_DIR)
+    ambiente.pop('PYTHONDONTWRITEBYTECODE', None)
+    return ambiente
+
+
+def medir_imports() -> dict:
+    """Roda os imports do app com -X importtime num processo novo."""
+    inicio = time.perf_counter()
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', IMPORTS_APP + f"\nimport sys\nprint([m for m in {DEFERIDOS!r} if m in sys.modules])"],
+        cwd=APP_DIR, env=_ambiente(), capture_output=True, text=True, check=True
+    )
+    parede = time.perf_counter() - inicio
+
+    total_us = 0
+    topo = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, cumulativo, nome = linha[len('import time:'):].split('|')
+        total_us += int(proprio)
+        # Módulos de topo não têm indentação no nome
+        if not nome[1:].startswith(' '):
+            topo.append((nome.strip(), int(cumulativo)))
+
+    topo.sort(key=lambda item: item[1], reverse=True)
+    return {
+        'parede_segundos': parede,
+        'importtime_segundos': total_us / 1e6,
+        'mais_caros': [{'modulo': nome, 'cumulativo_ms': us / 1000} for nome, us in topo[:15]],
+        'deferidos_carregados': json.loads(processo.stdout.strip().splitlines()[-1].replace("'", '"'))
+    }
+
+
+def medir_primeiro_render(diretorio: str) -> dict:
+    """Do lançamento do processo até o fim do primeiro rerun do dashboard."""
+    codigo = PRIMEIRO_RENDER.format(app=os.path.join(APP_DIR, 'app_final.py'), deferidos=DEFERIDOS)
+    inicio = time.perf_counter()
+    processo = subprocess.run(
+        [sys.executable, '-c', codigo],
+        cwd=diretorio, env=_ambiente(), capture_output=True, text=True, check=True
+    )
+    resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+    resultado['parede_segundos'] = time.perf_counter() - inicio
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--linhas", type=int, default=10000, help="torneios no banco do primeiro render")
+    parser.add_argument("--saida", help="arquivo JSON com o resultado")
+    args = parser.parse_args()
+
+    from dataset import popular_banco
+
+    # O dashboard abre poker_dashboard.db no diretório corrente
+    diretorio = tempfile.mkdtemp(prefix='poker_startup_')
+    popular_banco(os.path.join(diretorio, 'poker_dashboard.db'), args.linhas)
+
+    # Primeira execução só aquece o cache de bytecode e do sistema de arquivos
+    medir_imports()
+    imports = [medir_imports() for _ in range(args.repeticoes)]
+    renders = [medir_primeiro_render(diretorio) for _ in range(args.repeticoes)]
+
+    relatorio = {
+        'repeticoes': args.repeticoes,
+        'linhas': args.linhas,
+        'imports_parede_mediana_segundos': statistics.median(i['parede_segundos'] for i in imports),
+        'importtime_mediana_segundos': statistics.median(i['importtime_segundos'] for i in imports),
+        'primeiro_render_mediana_segundos': statistics.median(r['parede_segundos'] for r in renders),
+        'mais_caros': imports[-1]['mais_caros'],
+        'deferidos_carregados_na_inicializacao': imports[-1]['deferidos_carregados'],
+        'deferidos_carregados_no_primeiro_render': renders[-1]['carregados'],
+        'excecoes_primeiro_render': renders[-1]['excecoes']
+    }
+
+    print(f"Imports do app:       {relatorio['imports_parede_mediana_segundos'] * 1000:8.0f} ms "
+          f"(importtime {relatorio['importtime_mediana_segundos'] * 1000:.0f} ms)")
+    print(f"Até o primeiro render: {relatorio['primeiro_render_mediana_segundos'] * 1000:7.0f} ms "
+          f"({args.linhas} torneios)")
+    print("Módulos de topo mais caros:")
+    for item in relatorio['mais_caros']:
+        print(f"  {item['modulo']:<40} {item['cumulativo_ms']:8.1f} ms")
+    print(f"Dependências pesadas carregadas na inicialização: "
+          f"{relatorio['deferidos_carregados_na_inicializacao'] or 'nenhuma'}; "
+          f"no primeiro render: {relatorio['deferidos_carregados_no_primeiro_render'] or 'nenhuma'}")
+
+    if args.saida:
+        with open(args.saida, 'w') as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
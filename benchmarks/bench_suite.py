@@ -0,0 +1,283 @@
+"""Benchmark de todos os métodos públicos de PokerDatabase, PokerCalculations,
+PokerPlotting, PokerExport e PokerTables sobre bancos sintéticos (benchmarks/dataset.py).
+
+Os bancos gerados ficam em cache no diretório de trabalho (mesmo seed e tamanho
+reaproveitam o arquivo). Escritas rodam numa cópia, para não alterar as leituras.
+Um método cujo tempo estimado para a próxima escala passa de --orcamento
+segundos é pulado nas escalas seguintes.
+
+Uso:
+    python benchmarks/bench_suite.py [--linhas 10000 100000 1000000] [--saida resultados.json]
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime
+
+# Sem snapshots de métricas em disco durante o benchmark
+os.environ.setdefault('POKER_METRICS_DIR', '')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from database import PokerDatabase
+from calculations import PokerCalculations
+from plotting import PokerPlotting
+from export import PokerExport
+from tables import PokerTables
+from scenarios import PokerScenarios
+from dataset import popular_banco
+
+CLASSES = (PokerDatabase, PokerCalculations, PokerPlotting, PokerExport, PokerTables)
+
+# Métodos de ciclo de vida que não fazem sentido medir isoladamente
+IGNORADOS = {'PokerDatabase.get_connection'}
+
+
+def metodos_publicos():
+    """Nomes 'Classe.metodo' de todos os métodos públicos das classes medidas."""
+    nomes = []
+    for cls in CLASSES:
+        for nome, atributo in vars(cls).items():
+            if nome.startswith('_'):
+                continue
+            if isinstance(atributo, (staticmethod, classmethod)) or inspect.isfunction(atributo):
+                nomes.append(f"{cls.__name__}.{nome}")
+    return [nome for nome in nomes if nome not in IGNORADOS]
+
+
+def casos(ctx):
+    """Chamadas de cada método com argumentos realistas para o contexto da escala."""
+    db, escrita = ctx['db'], ctx['db_escrita']
+    torneios, lista = ctx['torneios'], ctx['lista']
+    estatisticas, por_tipo = ctx['estatisticas'], ctx['estatisticas_por_tipo']
+    saida = ctx['diretorio_saida']
+    primeiro = lista[0]
+
+    return {
+        # Leituras
+        'PokerDatabase.get_versao_dados': lambda: db.get_versao_dados(),
+        'PokerDatabase.get_alteracoes': lambda: db.get_alteracoes(str(max(db.get_versao_dados() - 1000, 0))),
+        'PokerDatabase.get_contas': lambda: db.get_contas(),
+        'PokerDatabase.get_tipos_torneio': lambda: db.get_tipos_torneio(),
+        'PokerDatabase.get_torneios': lambda: db.get_torneios(),
+        'PokerDatabase.get_torneios_set': lambda: db.get_torneios_set(),
+        'PokerDatabase.iter_torneios': lambda: sum(1 for _ in db.iter_torneios()),
+        'PokerDatabase.get_resumo_mensal': lambda: db.get_resumo_mensal(),
+        'PokerDatabase.get_estatisticas_gerais': lambda: db.get_estatisticas_gerais(),
+        'PokerDatabase.get_estatisticas_por_tipo': lambda: db.get_estatisticas_por_tipo(),
+        'PokerDatabase.get_melhores_piores_sessoes': lambda: db.get_melhores_piores_sessoes(),
+        'PokerDatabase.get_performance_por_periodo': lambda: db.get_performance_por_periodo(),
+        'PokerDatabase.get_cubo': lambda: db.get_cubo(),
+        'PokerDatabase.get_torneios_duplicados': lambda: db.get_torneios_duplicados(),
+        # Escritas (na cópia)
+        'PokerDatabase.init_database': lambda: escrita.init_database(),
+        'PokerDatabase.insert_initial_data': lambda: escrita.insert_initial_data(),
+        'PokerDatabase.insert_torneio': lambda: escrita.insert_torneio('2024-06-01', 1, 1, 11.0, 0.0, '20:00'),
+        'PokerDatabase.insert_torneios_lote': lambda: escrita.insert_torneios_lote(
+            [('2024-06-01', 1, 1, 11.0, 0.0, '20:00')] * 1000
+        ),
+        'PokerDatabase.update_torneio': lambda: escrita.update_torneio(
+            primeiro['id_torneio'], primeiro['data_torneio'], 1, 1, 11.0, 25.0
+        ),
+        'PokerDatabase.delete_torneio': lambda: escrita.delete_torneio(primeiro['id_torneio']),
+        # Versões pela fila de escrita: a medida inclui a espera pelo Future
+        'PokerDatabase.insert_torneio_async': lambda: escrita.insert_torneio_async(
+            '2024-06-01', 1, 1, 11.0, 0.0, '20:00'
+        ).result(),
+        'PokerDatabase.update_torneio_async': lambda: escrita.update_torneio_async(
+            primeiro['id_torneio'], primeiro['data_torneio'], 1, 1, 11.0, 25.0
+        ).result(),
+        'PokerDatabase.delete_torneio_async': lambda: escrita.delete_torneio_async(primeiro['id_torneio']).result(),
+        'PokerDatabase.mesclar_torneios_duplicados': lambda: escrita.mesclar_torneios_duplicados(),
+        'PokerDatabase.get_arquivos_anuais': lambda: db.get_arquivos_anuais(),
+        'PokerDatabase.get_anos_arquivaveis': lambda: db.get_anos_arquivaveis(),
+        'PokerDatabase.get_ano_arquivado': lambda: db.get_ano_arquivado(primeiro['id_torneio']),
+        # Arquivar e desarquivar em par, para o caso ser repetível
+        'PokerDatabase.arquivar_ano': lambda: (escrita.arquivar_ano(ctx['ano_antigo'], saida), escrita.desarquivar_ano(ctx['ano_antigo'])),
+        'PokerDatabase.desarquivar_ano': lambda: (escrita.arquivar_ano(ctx['ano_antigo'], saida), escrita.desarquivar_ano(ctx['ano_antigo'])),
+        'PokerDatabase.backup_database': lambda: escrita.backup_database(os.path.join(saida, 'backup.db')),
+        # Cálculos
+        'PokerCalculations.calculate_roi': lambda: PokerCalculations.calculate_roi(25.0, 11.0),
+        'PokerCalculations.calculate_lucro_liquido': lambda: PokerCalculations.calculate_lucro_liquido(25.0, 11.0),
+        'PokerCalculations.calculate_itm_percentage': lambda: PokerCalculations.calculate_itm_percentage(torneios),
+        'PokerCalculations.calculate_abi': lambda: PokerCalculations.calculate_abi(torneios),
+        'PokerCalculations.get_roi_evolution': lambda: PokerCalculations.get_roi_evolution(torneios),
+        'PokerCalculations.get_performance_by_period': lambda: PokerCalculations.get_performance_by_period(torneios),
+        'PokerCalculations.get_rolling_metrics': lambda: PokerCalculations.get_rolling_metrics(torneios),
+        'PokerCalculations.select_extreme_sessions': lambda: PokerCalculations.select_extreme_sessions(ctx['sessoes']),
+        'PokerCalculations.get_best_and_worst_sessions': lambda: PokerCalculations.get_best_and_worst_sessions(torneios),
+        'PokerCalculations.calculate_variance_and_downswing': lambda: PokerCalculations.calculate_variance_and_downswing(torneios),
+        'PokerCalculations.get_hourly_performance': lambda: PokerCalculations.get_hourly_performance(torneios),
+        'PokerCalculations.calculate_bankroll_management': lambda: PokerCalculations.calculate_bankroll_management(torneios),
+        # Gráficos
+        'PokerPlotting.create_roi_evolution_chart': lambda: PokerPlotting.create_roi_evolution_chart(torneios),
+        'PokerPlotting.create_profit_by_tournament_type_chart': lambda: PokerPlotting.create_profit_by_tournament_type_chart(por_tipo),
+        'PokerPlotting.create_tournament_distribution_pie_chart': lambda: PokerPlotting.create_tournament_distribution_pie_chart(por_tipo),
+        'PokerPlotting.create_monthly_performance_chart': lambda: PokerPlotting.create_monthly_performance_chart(torneios),
+        'PokerPlotting.create_account_comparison_chart': lambda: PokerPlotting.create_account_comparison_chart(db, ctx['contas']),
+        'PokerPlotting.create_bankroll_evolution_chart': lambda: PokerPlotting.create_bankroll_evolution_chart(torneios),
+        'PokerPlotting.create_rolling_metrics_chart': lambda: PokerPlotting.create_rolling_metrics_chart(torneios),
+        'PokerPlotting.create_rerun_waterfall_chart': lambda: PokerPlotting.create_rerun_waterfall_chart(ctx['spans']),
+        # Tabelas (a renderização do Styler entra na medida)
+        'PokerTables.recent_tournaments_page': lambda: PokerTables.recent_tournaments_page(torneios, 1).to_html(),
+        'PokerTables.style_numeric_table': lambda: PokerTables.style_numeric_table(
+            ctx['pagina_recentes'], ['Buy-in (R$)', 'Ganho (R$)', 'Lucro (R$)'], ['ROI (%)'], ['Lucro (R$)', 'ROI (%)']
+        ).to_html(),
+        'PokerTables.scenario_comparison': lambda: PokerTables.scenario_comparison(ctx['cenarios']).to_html(),
+        # Exportação
+        'PokerExport.export_to_csv': lambda: PokerExport.export_to_csv(torneios, os.path.join(saida, 'torneios.csv')),
+        'PokerExport.export_to_excel': lambda: PokerExport.export_to_excel(
+            torneios, estatisticas, por_tipo, os.path.join(saida, 'dashboard.xlsx')
+        ),
+        'PokerExport.export_to_pdf': lambda: PokerExport.export_to_pdf(
+            torneios, estatisticas, por_tipo, os.path.join(saida, 'relatorio.pdf')
+        ),
+        'PokerExport.export_to_pdf_completo': lambda: PokerExport.export_to_pdf_completo(
+            db, os.path.join(saida, 'historico.pdf')
+        ),
+        'PokerExport.create_backup': lambda: PokerExport.create_backup(db.db_path, os.path.join(saida, 'backups')),
+        'PokerExport.get_download_link': lambda: PokerExport.get_download_link(ctx['arquivo_csv']),
+        'PokerExport.cleanup_old_files': lambda: PokerExport.cleanup_old_files(os.path.join(saida, 'backups'))
+    }
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    """Tempo por chamada (mínimo e mediana). Chamadas rápidas são agrupadas como no timeit."""
+    inicio = time.perf_counter()
+    funcao()
+    primeira = time.perf_counter() - inicio
+
+    if primeira < 0.01:
+        temporizador = timeit.Timer(funcao)
+        numero, _ = temporizador.autorange()
+        tempos = [t / numero for t in temporizador.repeat(repeat=repeticoes, number=numero)]
+    else:
+        tempos = [primeira]
+        for _ in range(repeticoes - 1):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+
+    return {
+        'minimo_segundos': min(tempos),
+        'mediana_segundos': statistics.median(tempos),
+        'repeticoes': len(tempos)
+    }
+
+
+def preparar(linhas: int, seed: int, diretorio: str) -> dict:
+    """Gera (ou reaproveita) o banco da escala e monta os argumentos dos casos."""
+    db_path = os.path.join(diretorio, f"poker_{linhas}_{seed}.db")
+    geracao = None
+    if not os.path.exists(db_path):
+        inicio = time.perf_counter()
+        popular_banco(db_path, linhas, seed=seed)
+        geracao = time.perf_counter() - inicio
+    db = PokerDatabase(db_path)
+
+    diretorio_saida = tempfile.mkdtemp(prefix=f"bench_{linhas}_", dir=diretorio)
+    copia = os.path.join(diretorio_saida, 'escrita.db')
+    shutil.copy2(db_path, copia)
+
+    torneios = db.get_torneios_set()
+    lista = db.get_torneios()
+    estatisticas = db.get_estatisticas_gerais()
+    por_tipo = db.get_estatisticas_por_tipo()
+    arquivo_csv = PokerExport.export_to_csv(torneios, os.path.join(diretorio_saida, 'link.csv'))
+
+    return {
+        'db': db,
+        'db_escrita': PokerDatabase(copia),
+        'torneios': torneios,
+        'lista': lista,
+        'estatisticas': estatisticas,
+        'estatisticas_por_tipo': por_tipo,
+        'contas': db.get_contas(),
+        'sessoes': PokerCalculations.get_best_and_worst_sessions(torneios, limit=len(torneios))['melhores'],
+        'spans': [{'secao': f"Seção {i}", 'inicio_ms': i * 10.0, 'duracao_ms': 10.0, 'linhas': None} for i in range(20)],
+        'arquivo_csv': arquivo_csv,
+        'ano_antigo': int(min(t['data_torneio'] for t in lista)[:4]),
+        'pagina_recentes': PokerTables.recent_tournaments_page(torneios, 1).data,
+        'cenarios': PokerScenarios(torneios).avaliar(
+            [{'nome': 'Atual'}] + [{'nome': f"Sem {tipo}", 'excluir_tipos': [tipo]} for tipo in torneios.nomes_tipos]
+        ),
+        'diretorio_saida': diretorio_saida,
+        'geracao_segundos': geracao
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--orcamento", type=float, default=60.0,
+                        help="segundos por chamada acima dos quais o método é pulado nas escalas maiores")
+    parser.add_argument("--metodos", nargs='*', help="mede apenas métodos cujo nome contém um destes trechos")
+    parser.add_argument("--diretorio", default=os.path.join(tempfile.gettempdir(), 'poker_bench'))
+    parser.add_argument("--saida", default="bench_resultados.json")
+    args = parser.parse_args()
+
+    os.makedirs(args.diretorio, exist_ok=True)
+    nomes = metodos_publicos()
+    if args.metodos:
+        nomes = [n for n in nomes if any(trecho in n for trecho in args.metodos)]
+
+    resultados = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'plataforma': platform.platform(),
+        'escalas': {}
+    }
+    ultimo = {}  # nome -> (linhas, mediana) da última escala medida
+
+    for linhas in sorted(args.linhas):
+        print(f"== {linhas} torneios")
+        ctx = preparar(linhas, args.seed, args.diretorio)
+        chamadas = casos(ctx)
+
+        sem_caso = [n for n in nomes if n not in chamadas]
+        if sem_caso:
+            raise SystemExit(f"Métodos públicos sem caso de benchmark: {', '.join(sem_caso)}")
+
+        metodos = {}
+        for nome in nomes:
+            anterior = ultimo.get(nome)
+            if anterior and anterior[1] * linhas / anterior[0] > args.orcamento:
+                metodos[nome] = {'pulado': True, 'motivo': f"estimativa acima de {args.orcamento:.0f}s"}
+                print(f"  {nome:<58} pulado")
+                continue
+            try:
+                medida = medir(chamadas[nome], args.repeticoes)
+            except Exception as e:
+                metodos[nome] = {'erro': f"{type(e).__name__}: {e}"}
+                print(f"  {nome:<58} erro: {e}")
+                continue
+            metodos[nome] = medida
+            ultimo[nome] = (linhas, medida['mediana_segundos'])
+            print(f"  {nome:<58} {medida['mediana_segundos'] * 1000:>12.3f} ms")
+
+        resultados['escalas'][str(linhas)] = {
+            'geracao_segundos': ctx['geracao_segundos'],
+            'metodos': metodos
+        }
+        shutil.rmtree(ctx['diretorio_saida'], ignore_errors=True)
+
+    with open(args.saida, 'w') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"Resultados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
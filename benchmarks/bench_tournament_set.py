@@ -0,0 +1,69 @@
+"""Benchmark de memória: List[Dict] (get_torneios) vs TournamentSet (arrays tipados).
+
+Uso:
+    python benchmarks/bench_tournament_set.py [--linhas 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from tournament_set import TournamentSet
+
+CONTAS = ["PKagente", "I´Dr.t", "JiNRiuk", "Blackk_killer", "I´mDrFIsh", "kaiojen"]
+TIPOS = ["Mystery", "Battle", "Plus", "Reentry", "Freeze", "Bounty"]
+
+
+def gerar_tuplas(linhas: int):
+    """Gera linhas no formato cru de _consultar_torneios."""
+    rng = random.Random(42)
+    inicio = date(2023, 1, 1)
+    for i in range(linhas):
+        buy_in = rng.choice([5.0, 10.0, 22.0, 55.0, 109.0])
+        ganho_total = buy_in * rng.choice([0, 0, 0, 0, 1.5, 3, 12])
+        yield (
+            i + 1,
+            (inicio + timedelta(days=rng.randint(0, 1000))).isoformat(),
+            rng.choice(CONTAS),
+            rng.choice(TIPOS),
+            buy_in,
+            ganho_total,
+            ganho_total - buy_in,
+            ((ganho_total - buy_in) / buy_in) * 100,
+            None
+        )
+
+
+def medir(construir):
+    tracemalloc.start()
+    objeto = construir()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objeto, atual
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100000)
+    args = parser.parse_args()
+
+    tuplas = list(gerar_tuplas(args.linhas))
+
+    chaves = ("id_torneio", "data_torneio", "nome_conta", "nome_tipo", "buy_in",
+              "ganho_total", "lucro_liquido", "roi", "hora_inicio")
+    _, bytes_dicts = medir(lambda: [dict(zip(chaves, row)) for row in tuplas])
+    conjunto, bytes_set = medir(lambda: TournamentSet.from_tuples(tuplas))
+
+    print(f"Linhas:                 {args.linhas}")
+    print(f"List[Dict]:             {bytes_dicts / 1024 / 1024:8.2f} MiB ({bytes_dicts / args.linhas:6.1f} B/linha)")
+    print(f"TournamentSet:          {bytes_set / 1024 / 1024:8.2f} MiB ({bytes_set / args.linhas:6.1f} B/linha)")
+    print(f"  arrays de colunas:    {conjunto.nbytes / 1024 / 1024:8.2f} MiB")
+    print(f"Redução:                {bytes_dicts / max(bytes_set, 1):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
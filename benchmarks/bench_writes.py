@@ -0,0 +1,105 @@
+"""Benchmark de escritas concorrentes: conexão por chamada vs fila de escrita.
+
+N threads inserem M torneios cada, ao mesmo tempo, no mesmo arquivo SQLite:
+- direto: cada inserção abre sua conexão e faz seu próprio commit (como o
+  insert_torneio fazia antes da fila de escrita);
+- fila: PokerDatabase.insert_torneio, que passa pela thread única de escrita
+  com group commit.
+
+Relata inserções por segundo, erros de lock e, na fila, quantas transações
+foram necessárias.
+
+Uso:
+    python benchmarks/bench_writes.py [--threads 32] [--insercoes 50] [--timeout-ocupado 5]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('POKER_METRICS_DIR', '')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from database import PokerDatabase
+from write_queue import erro_de_lock
+
+TORNEIO = ('2024-06-01', 1, 1, 11.0, 0.0, '20:00')
+
+
+def inserir_direto(db_path: str, timeout_ocupado: float):
+    conn = sqlite3.connect(db_path, timeout=timeout_ocupado)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO torneios (data_torneio, id_conta, id_tipo_torneio, buy_in, ganho_total, hora_inicio)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', TORNEIO)
+    conn.commit()
+    conn.close()
+
+
+def rodar(threads: int, insercoes: int, inserir) -> dict:
+    """Dispara as threads juntas e conta sucessos e erros."""
+    barreira = threading.Barrier(threads)
+    contagem = {'ok': 0, 'lock': 0, 'outros': 0}
+    lock = threading.Lock()
+
+    def trabalhador():
+        barreira.wait()
+        for _ in range(insercoes):
+            try:
+                inserir()
+                resultado = 'ok'
+            except Exception as e:
+                resultado = 'lock' if erro_de_lock(e) else 'outros'
+            with lock:
+                contagem[resultado] += 1
+
+    grupo = [threading.Thread(target=trabalhador) for _ in range(threads)]
+    inicio = time.perf_counter()
+    for thread in grupo:
+        thread.start()
+    for thread in grupo:
+        thread.join()
+    contagem['segundos'] = time.perf_counter() - inicio
+    contagem['por_segundo'] = contagem['ok'] / contagem['segundos']
+    return contagem
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--insercoes", type=int, default=50, help="inserções por thread")
+    parser.add_argument("--timeout-ocupado", type=float, default=5.0,
+                        help="busy timeout das conexões diretas (5s é o padrão do sqlite3)")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='poker_escritas_')
+
+    db_direto = PokerDatabase(os.path.join(diretorio, 'direto.db'))
+    direto = rodar(args.threads, args.insercoes, lambda: inserir_direto(db_direto.db_path, args.timeout_ocupado))
+
+    db_fila = PokerDatabase(os.path.join(diretorio, 'fila.db'))
+
+    def inserir_fila():
+        # insert_torneio só devolve bool; o Future expõe o erro para a contagem
+        db_fila.insert_torneio_async(*TORNEIO).result()
+
+    fila = rodar(args.threads, args.insercoes, inserir_fila)
+    escritor = db_fila._fila_escrita()
+
+    total = args.threads * args.insercoes
+    print(f"{args.threads} threads x {args.insercoes} inserções ({total} no total)")
+    print(f"{'modo':<8}{'ins/s':>10}{'segundos':>10}{'ok':>8}{'lock':>8}{'outros':>8}")
+    for nome, r in (('direto', direto), ('fila', fila)):
+        print(f"{nome:<8}{r['por_segundo']:>10.0f}{r['segundos']:>10.2f}{r['ok']:>8}{r['lock']:>8}{r['outros']:>8}")
+    print(f"Fila: {escritor.operacoes} operações em {escritor.transacoes} transações "
+          f"({escritor.operacoes / max(escritor.transacoes, 1):.1f} por commit), "
+          f"{escritor.retentativas} novas tentativas")
+
+
+if __name__ == "__main__":
+    main()
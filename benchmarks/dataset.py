@@ -0,0 +1,124 @@
+"""Gerador determinístico de torneios sintéticos para benchmarks.
+
+Distribui N torneios pelas contas e tipos iniciais do banco, com buy-ins nos
+valores usuais de cada conta e prêmios de cauda pesada (a maioria não entra
+no dinheiro; poucos torneios pagam centenas de buy-ins).
+
+Uso:
+    python benchmarks/dataset.py --linhas 100000 --saida /tmp/poker_100k.db [--seed 42]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from database import PokerDatabase
+
+# Buy-ins usuais (R$), do micro ao high stakes
+BUY_INS = np.array([1.1, 2.2, 5.5, 11.0, 22.0, 33.0, 55.0, 109.0, 215.0, 530.0])
+
+# Chance de ITM por tipo; tipos com bounty premiam com mais frequência (e menos)
+ITM_POR_TIPO = {"Mystery": 0.24, "Bounty": 0.22, "Battle": 0.16, "Plus": 0.15, "Reentry": 0.14, "Freeze": 0.15}
+ITM_PADRAO = 0.15
+
+# Cauda do prêmio em buy-ins: 1.3 + Lomax(alfa), limitado a MULTIPLICADOR_MAXIMO
+ALFA_PREMIO = 1.25
+MULTIPLICADOR_MAXIMO = 1500.0
+
+
+def gerar_torneios(linhas: int, id_contas: List[int], id_tipos: List[int], nomes_tipos: Optional[List[str]] = None,
+                   seed: int = 42, data_inicio: Optional[date] = None, dias: int = 3 * 365,
+                   tamanho_lote: int = 100000) -> Iterator[Tuple]:
+    """Gera tuplas no formato de insert_torneios_lote, em ordem de data.
+
+    O mesmo seed sempre produz os mesmos torneios.
+    """
+    rng = np.random.default_rng(seed)
+    data_inicio = data_inicio or date(2023, 1, 1)
+
+    # Volume e stake preferido de cada conta
+    peso_contas = rng.dirichlet(np.full(len(id_contas), 2.0))
+    stake_contas = rng.integers(1, len(BUY_INS) - 3, size=len(id_contas))
+    peso_tipos = rng.dirichlet(np.full(len(id_tipos), 3.0))
+    chance_itm = np.array([ITM_POR_TIPO.get(nome, ITM_PADRAO) for nome in nomes_tipos]
+                          if nomes_tipos else [ITM_PADRAO] * len(id_tipos))
+
+    contas = rng.choice(len(id_contas), size=linhas, p=peso_contas)
+    tipos = rng.choice(len(id_tipos), size=linhas, p=peso_tipos)
+    desvio_stake = np.rint(rng.normal(0, 1.0, size=linhas)).astype(np.int64)
+    buy_ins = BUY_INS[np.clip(stake_contas[contas] + desvio_stake, 0, len(BUY_INS) - 1)]
+
+    itm = rng.random(linhas) < chance_itm[tipos]
+    multiplicadores = np.minimum(1.3 + rng.pareto(ALFA_PREMIO, size=linhas), MULTIPLICADOR_MAXIMO)
+    ganhos = np.where(itm, np.round(buy_ins * multiplicadores, 2), 0.0)
+
+    dias_torneio = np.sort(rng.integers(0, dias, size=linhas))
+
+    # 80% com horário; grades de 15 minutos concentradas à noite
+    com_horario = rng.random(linhas) < 0.8
+    minutos = (np.rint(rng.normal(20 * 60, 180, size=linhas) / 15) * 15).astype(np.int64) % (24 * 60)
+
+    for inicio in range(0, linhas, tamanho_lote):
+        fim = min(inicio + tamanho_lote, linhas)
+        for i in range(inicio, fim):
+            yield (
+                (data_inicio + timedelta(days=int(dias_torneio[i]))).isoformat(),
+                id_contas[contas[i]],
+                id_tipos[tipos[i]],
+                float(buy_ins[i]),
+                float(ganhos[i]),
+                f"{minutos[i] // 60:02d}:{minutos[i] % 60:02d}" if com_horario[i] else None
+            )
+
+
+def popular_banco(db_path: str, linhas: int, seed: int = 42, **kwargs) -> PokerDatabase:
+    """Cria (ou completa) um banco com `linhas` torneios sintéticos."""
+    db = PokerDatabase(db_path)
+    contas = db.get_contas()
+    tipos = db.get_tipos_torneio()
+
+    # Ordem estável pelos ids, independente da ordenação por nome de get_contas
+    contas.sort(key=lambda c: c['id'])
+    tipos.sort(key=lambda t: t['id'])
+
+    torneios = gerar_torneios(
+        linhas,
+        [c['id'] for c in contas],
+        [t['id'] for t in tipos],
+        [t['nome'] for t in tipos],
+        seed=seed,
+        **kwargs
+    )
+    db.insert_torneios_lote(torneios)
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--saida", required=True, help="arquivo SQLite a criar")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dias", type=int, default=3 * 365, help="período coberto pelos torneios")
+    args = parser.parse_args()
+
+    if os.path.exists(args.saida):
+        parser.error(f"{args.saida} já existe")
+
+    inicio = time.perf_counter()
+    db = popular_banco(args.saida, args.linhas, seed=args.seed, dias=args.dias)
+    duracao = time.perf_counter() - inicio
+
+    estatisticas = db.get_estatisticas_gerais()
+    print(f"{estatisticas['total_torneios']} torneios em {duracao:.1f}s -> {args.saida}")
+    print(f"Investido: R$ {estatisticas['total_investido']:.2f} | ITM: {estatisticas['itm_percentage']:.1f}% "
+          f"| ROI: {estatisticas['roi_geral']:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Teste de carga: K sessões simultâneas do dashboard sobre o mesmo arquivo SQLite.
+
+Cada sessão é um AppTest do Streamlit em seu próprio processo (o AppTest não
+é seguro entre threads), todos abrindo o mesmo banco sintético. Diferente de
+um servidor real, as sessões não compartilham st.cache_resource e não
+disputam o GIL. As sessões alternam entre mudanças de filtro, paginação,
+inserções e exportações; cada interação é um rerun completo do script.
+
+Relata latência p50/p95/p99 dos reruns (geral e por ação) e erros de
+contenção de lock ("database is locked"), separados dos demais erros.
+
+Uso:
+    python benchmarks/load_test.py [--sessoes 8] [--acoes 20] [--linhas 50000] [--saida carga.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+os.environ.setdefault('POKER_METRICS_DIR', '')
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+sys.path.insert(0, APP_DIR)
+
+from streamlit.testing.v1 import AppTest
+
+from dataset import popular_banco
+
+# Peso de cada ação no sorteio
+ACOES = {
+    'filtro': 4,
+    'paginacao': 3,
+    'insercao': 2,
+    'exportacao': 1
+}
+
+MENSAGEM_LOCK = 'database is locked'
+
+
+class ContadorLocks:
+    """Saída padrão que conta mensagens de lock impressas pelo PokerDatabase.
+
+    Os métodos de escrita capturam a exceção e só imprimem o erro, então a
+    contenção não chega ao script como exceção.
+    """
+
+    def __init__(self, saida):
+        self.saida = saida
+        self.locks = 0
+        self._lock = threading.Lock()
+
+    def write(self, texto):
+        if MENSAGEM_LOCK in texto:
+            with self._lock:
+                self.locks += 1
+        return self.saida.write(texto)
+
+    def flush(self):
+        self.saida.flush()
+
+
+def _por_rotulo(elementos, rotulo):
+    return next(e for e in elementos if e.label == rotulo)
+
+
+def executar_acao(at: AppTest, acao: str, rng: random.Random):
+    """Aplica uma interação na sessão e faz o rerun."""
+    if acao == 'filtro':
+        rotulo = rng.choice(["Conta", "Tipo de Torneio", "Período"])
+        # "Tipo de Torneio" também rotula o formulário de inserção; os filtros vêm depois
+        selectbox = [s for s in at.sidebar.selectbox if s.label == rotulo][-1]
+        opcoes = [o for o in selectbox.options if o != "Personalizado"]
+        selectbox.select(rng.choice(opcoes))
+    elif acao == 'paginacao':
+        paginas = [n for n in at.number_input if n.key == "pagina_torneios"]
+        if paginas:
+            total_paginas = int(re.search(r"de (\d+)", paginas[0].label).group(1))
+            paginas[0].set_value(rng.randint(1, total_paginas))
+    elif acao == 'insercao':
+        _por_rotulo(at.sidebar.selectbox, "Conta Utilizada").select_index(rng.randrange(6))
+        _por_rotulo(at.sidebar.selectbox, "Tipo de Torneio").select_index(rng.randrange(6))
+        buy_in = rng.choice([5.5, 11.0, 22.0, 55.0])
+        _por_rotulo(at.sidebar.number_input, "Buy-in (R$)").set_value(buy_in)
+        _por_rotulo(at.sidebar.number_input, "Ganho Total (R$)").set_value(rng.choice([0.0, 0.0, 0.0, buy_in * 4]))
+        _por_rotulo(at.sidebar.button, "💾 Salvar Torneio").click()
+    elif acao == 'exportacao':
+        _por_rotulo(at.sidebar.button, "📊 CSV").click()
+    at.run()
+
+
+def sessao(diretorio: str, indice: int, acoes: int, seed: int, timeout: float) -> dict:
+    """Uma sessão do dashboard (em processo próprio): carga inicial e `acoes` interações sorteadas."""
+    # O dashboard abre poker_dashboard.db no diretório corrente
+    os.chdir(diretorio)
+    contador = ContadorLocks(sys.stdout)
+    sys.stdout = contador
+
+    rng = random.Random(seed + indice)
+    medidas = []
+    erros = []
+
+    at = AppTest.from_file(os.path.join(APP_DIR, 'app_final.py'), default_timeout=timeout)
+    sequencia = ['carga_inicial'] + rng.choices(list(ACOES), weights=list(ACOES.values()), k=acoes)
+
+    for acao in sequencia:
+        inicio = time.perf_counter()
+        try:
+            if acao == 'carga_inicial':
+                at.run()
+            else:
+                executar_acao(at, acao, rng)
+        except Exception as e:
+            erros.append((acao, f"{type(e).__name__}: {e}"))
+            continue
+        medidas.append((acao, time.perf_counter() - inicio))
+        erros += [(acao, str(e.value)) for e in at.exception]
+        erros += [(acao, e.value) for e in at.error]
+
+    sys.stdout = contador.saida
+    return {'medidas': medidas, 'erros': erros, 'locks': contador.locks}
+
+
+def percentis(duracoes) -> dict:
+    if not duracoes:
+        return {}
+    valores = np.array(duracoes) * 1000
+    return {
+        'reruns': len(valores),
+        'p50_ms': float(np.percentile(valores, 50)),
+        'p95_ms': float(np.percentile(valores, 95)),
+        'p99_ms': float(np.percentile(valores, 99)),
+        'max_ms': float(valores.max())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessoes", type=int, default=8, help="sessões simultâneas (K)")
+    parser.add_argument("--acoes", type=int, default=20, help="interações por sessão")
+    parser.add_argument("--linhas", type=int, default=50000, help="torneios no banco sintético")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=120.0, help="tempo máximo de um rerun (s)")
+    parser.add_argument("--saida", help="arquivo JSON com o resultado")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='poker_carga_')
+    inicio = time.perf_counter()
+    popular_banco(os.path.join(diretorio, 'poker_dashboard.db'), args.linhas, seed=args.seed)
+    print(f"Banco sintético com {args.linhas} torneios em {time.perf_counter() - inicio:.1f}s ({diretorio})")
+
+    inicio = time.perf_counter()
+    with multiprocessing.get_context('spawn').Pool(args.sessoes) as pool:
+        sessoes = pool.starmap(sessao, [
+            (diretorio, i, args.acoes, args.seed, args.timeout) for i in range(args.sessoes)
+        ])
+    duracao = time.perf_counter() - inicio
+
+    resultados = {
+        'medidas': [m for s in sessoes for m in s['medidas']],
+        'erros': [e for s in sessoes for e in s['erros']]
+    }
+    locks_impressos = sum(s['locks'] for s in sessoes)
+
+    por_acao = defaultdict(list)
+    for acao, segundos in resultados['medidas']:
+        por_acao[acao].append(segundos)
+
+    erros_lock = locks_impressos + sum(1 for _, mensagem in resultados['erros'] if MENSAGEM_LOCK in mensagem)
+    outros_erros = [e for e in resultados['erros'] if MENSAGEM_LOCK not in e[1]]
+
+    relatorio = {
+        'sessoes': args.sessoes,
+        'acoes_por_sessao': args.acoes,
+        'linhas': args.linhas,
+        'duracao_segundos': duracao,
+        'reruns_por_segundo': len(resultados['medidas']) / duracao if duracao else 0,
+        'geral': percentis([s for _, s in resultados['medidas']]),
+        'por_acao': {acao: percentis(valores) for acao, valores in sorted(por_acao.items())},
+        'erros_lock': erros_lock,
+        'outros_erros': len(outros_erros),
+        'exemplos_erros': sorted({f"{acao}: {mensagem}" for acao, mensagem in outros_erros})[:10]
+    }
+
+    print(f"\n{args.sessoes} sessões x {args.acoes} ações em {duracao:.1f}s "
+          f"({relatorio['reruns_por_segundo']:.1f} reruns/s)")
+    print(f"{'ação':<15}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for acao, p in [('geral', relatorio['geral'])] + list(relatorio['por_acao'].items()):
+        print(f"{acao:<15}{p['reruns']:>8}{p['p50_ms']:>10.0f}{p['p95_ms']:>10.0f}{p['p99_ms']:>10.0f}")
+    print(f"Erros de lock: {erros_lock} | outros erros: {len(outros_erros)}")
+    for exemplo in relatorio['exemplos_erros']:
+        print(f"  {exemplo}")
+
+    if args.saida:
+        with open(args.saida, 'w') as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()